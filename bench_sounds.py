@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Sound Generator Benchmarks
+Times every hook and synthesis primitive - see synth/bench.py
+Usage: python3 bench_sounds.py [--save baseline.json] [--compare baseline.json]
+"""
+
+import sys
+
+from synth.bench import main
+
+if __name__ == '__main__':
+    sys.exit(main())
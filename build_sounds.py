@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Sound Suite Builder
+Renders every theme's hooks concurrently - see synth/build.py
+Usage: python3 build_sounds.py [--jobs N] [--theme NAME ...]
+"""
+
+import sys
+
+from synth.build import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -20,13 +20,11 @@ fi
 echo "✅ ffmpeg found: $(ffmpeg -version | head -n1)"
 echo ""
 
-# Directories to process
+# Directories to process. The generated suites (retro-terminal, drift, void)
+# are resampled at render time instead: python3 build_sounds.py --export 22050
 DIRS=(
     "."
     "prompt3style"
-    "retro-terminal"
-    "drift"
-    "void"
 )
 
 # Sound files to process
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Golden File Check
+Compares every rendered hook with its stored reference - see synth/golden.py
+Usage: python3 golden_sounds.py [--theme NAME ...] [--update]
+"""
+
+import sys
+
+from synth.golden import main
+
+if __name__ == '__main__':
+    sys.exit(main())
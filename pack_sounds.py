@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Sound Bank Packer
+Packs every suite's rendered hooks into one memory-mappable file - see synth/bank.py
+Usage: python3 pack_sounds.py [-o sounds.bank] [--suite NAME=DIR ...]
+"""
+
+import sys
+
+from synth.bank import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Hook Player
+Asks the running sound daemon to play one hook - see synth/client.py
+Usage: python3 play_hook.py HOOK
+"""
+
+import sys
+
+from synth.client import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+Quick Hook Player
+Plays a hook's pre-rendered WAV with minimal startup - see synth/play.py
+Usage: python3 play_sound.py HOOK [SUITE] [--player NAME]
+"""
+
+import sys
+
+from synth.play import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+"""
+Sound Daemon
+Keeps a suite's hook sounds in memory and plays them on request - see synth/daemon.py
+Usage: python3 sound_daemon.py [--suite DIR | --theme NAME] [--backend auto|aplay|paplay|null|file]
+       python3 sound_daemon.py --theme void --offline 0:tool_start 0.05:notification --output mix.wav
+"""
+
+import sys
+
+from synth.daemon import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Synth - shared synthesis engine for the Claude Code sound generators
+Oscillators, envelopes, mixers and writers that work on whole NumPy buffers
+
+Samples are float64 arrays in the range -1.0..1.0; conversion to 16-bit
+PCM only happens in the writer. Block-streaming versions of the primitives
+live in synth.stream for renders too long to hold in memory. The names
+below are imported from their modules on first use, so importing a light
+submodule does not pull in the synthesis stack.
+"""
+
+import importlib
+
+# Public name -> submodule defining it. They are imported on first access, so
+# that light modules such as synth.client and synth.play start without NumPy.
+_EXPORTS = {
+    **dict.fromkeys(['sine_wave', 'square_wave', 'silence', 'sample_times', 'partials'], 'oscillators'),
+    **dict.fromkeys(['Oscillator', 'wavetable', 'WAVEFORMS'], 'wavetable'),
+    **dict.fromkeys(['white_noise', 'gaussian_noise', 'seed_noise', 'uniform', 'flutter'], 'noise'),
+    **dict.fromkeys(['IIRFilter', 'OnePole', 'Biquad', 'StateVariable', 'one_pole_lowpass', 'lowpass', 'highpass',
+                     'bandpass'], 'filters'),
+    **dict.fromkeys(['apply_fade', 'apply_decay', 'apply_adsr', 'apply_falloff', 'apply_tremolo', 'apply_envelope',
+                     'fade_curve', 'decay_curve', 'adsr_curve', 'falloff_curve', 'tremolo_curve'], 'envelopes'),
+    **dict.fromkeys(['Timeline', 'mix', 'concat'], 'mixing'),
+    **dict.fromkeys(['save_wav', 'save_wav_stream', 'to_pcm16', 'to_pcm24', 'to_float32', 'WavStreamWriter',
+                     'SAMPLE_FORMATS'], 'wavio'),
+}
+
+DEFAULT_SAMPLE_RATE = 44100
+
+__all__ = [
+    'DEFAULT_SAMPLE_RATE',
+    'sine_wave',
+    'square_wave',
+    'silence',
+    'sample_times',
+    'partials',
+    'Oscillator',
+    'wavetable',
+    'WAVEFORMS',
+    'white_noise',
+    'gaussian_noise',
+    'seed_noise',
+    'uniform',
+    'flutter',
+    'IIRFilter',
+    'OnePole',
+    'Biquad',
+    'StateVariable',
+    'one_pole_lowpass',
+    'lowpass',
+    'highpass',
+    'bandpass',
+    'apply_fade',
+    'apply_decay',
+    'apply_adsr',
+    'apply_falloff',
+    'apply_tremolo',
+    'apply_envelope',
+    'fade_curve',
+    'decay_curve',
+    'adsr_curve',
+    'falloff_curve',
+    'tremolo_curve',
+    'Timeline',
+    'mix',
+    'concat',
+    'save_wav',
+    'save_wav_stream',
+    'WavStreamWriter',
+    'to_pcm16',
+    'to_pcm24',
+    'to_float32',
+    'SAMPLE_FORMATS',
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module('.' + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
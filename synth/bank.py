@@ -0,0 +1,209 @@
+"""
+Sound Bank
+Every hook of every suite, variants included, packed into one memory-mapped file
+
+A bank is a 16-byte header (magic, version, entry count), a fixed-size
+index entry per sound (suite, hook, sample rate, sample format, data
+offset, frame count) and the sounds' raw little-endian PCM, each starting
+on a 64-byte boundary. The reader maps the file once and hands out
+memoryviews and NumPy arrays that point straight into the mapping, so a
+player can start up or switch suites without opening another file or
+copying samples. A hook's variants (synth.variation) are packed next to
+it under their file names, <hook>-NN.
+"""
+
+import argparse
+import glob
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+from .paths import HOOK_NAMES, ROOT, SUITES, VARIATIONS_DIR
+from .wavio import SAMPLE_FORMATS, read_wav, to_pcm
+
+MAGIC = b'SNDBANK\0'
+VERSION = 1
+ALIGNMENT = 64
+
+_HEADER = struct.Struct('<8sII')
+_ENTRY = struct.Struct('<32s32sIBxxxQQ')
+
+# Sample formats a bank can hold, by their code in the index
+_FORMAT_CODES = {'pcm16': 1, 'float32': 3}
+_DTYPES = {'pcm16': '<i2', 'float32': '<f4'}
+
+DEFAULT_BANK = 'sounds.bank'
+
+Entry = namedtuple('Entry', ['suite', 'hook', 'sample_rate', 'format', 'offset', 'frames'])
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _name(text, what):
+    encoded = text.encode('utf-8')
+    if len(encoded) > 32:
+        raise ValueError(f'{what} name too long for a bank: {text!r}')
+    return encoded
+
+
+def _encode(samples, sample_format):
+    if sample_format == 'pcm16':
+        # Exact inverse of read_wav's scaling, so packed 16-bit WAVs keep every bit
+        scaled = np.clip(np.round(np.asarray(samples, dtype=np.float64) * 32768), -32768, 32767)
+        return memoryview(scaled.astype('<i2')).cast('B')
+    return to_pcm(samples, sample_format)
+
+
+def write_bank(path, sounds, sample_format='pcm16'):
+    """Pack sounds - a list of (suite, hook, samples, sample_rate) - into a bank file at path"""
+    if sample_format not in _FORMAT_CODES:
+        raise ValueError(f"banks hold {', '.join(_FORMAT_CODES)} samples, not {sample_format}")
+    payloads = [(suite, hook, rate, _encode(samples, sample_format)) for suite, hook, samples, rate in sounds]
+    seen = set()
+    for suite, hook, _, _ in payloads:
+        if (suite, hook) in seen:
+            raise ValueError(f'{suite}.{hook} is in the bank twice')
+        seen.add((suite, hook))
+
+    width = SAMPLE_FORMATS[sample_format]
+    offset = _aligned(_HEADER.size + _ENTRY.size * len(payloads))
+    index = []
+    for suite, hook, rate, data in payloads:
+        index.append(_ENTRY.pack(_name(suite, 'suite'), _name(hook, 'hook'), rate,
+                                 _FORMAT_CODES[sample_format], offset, len(data) // width))
+        offset = _aligned(offset + len(data))
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(payloads)))
+        f.write(b''.join(index))
+        for _, _, _, data in payloads:
+            f.write(b'\0' * (_aligned(f.tell()) - f.tell()))
+            f.write(data)
+    os.replace(temporary, path)
+    return len(payloads)
+
+
+def suite_sounds(suites, hooks=HOOK_NAMES):
+    """(suite, name, samples, sample_rate) for each <hook>.wav, and its variants, in the given {suite: directory}"""
+    sounds = []
+    for suite, directory in suites.items():
+        for hook in hooks:
+            path = os.path.join(directory, hook + '.wav')
+            if not os.path.exists(path):
+                continue
+            variants = glob.glob(os.path.join(glob.escape(directory), VARIATIONS_DIR, glob.escape(hook) + '-*.wav'))
+            for path in [path] + sorted(variants):
+                samples, rate = read_wav(path)
+                sounds.append((suite, os.path.splitext(os.path.basename(path))[0], samples, rate))
+    return sounds
+
+
+class SoundBank:
+    """Read-only view of a bank file; sounds are zero-copy slices of one mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not a sound bank')
+        if version != VERSION:
+            self.close()
+            raise ValueError(f'{path}: unsupported bank version {version}')
+        codes = {code: name for name, code in _FORMAT_CODES.items()}
+        self.entries = {}
+        for i in range(count):
+            suite, hook, rate, code, offset, frames = _ENTRY.unpack_from(self._map, _HEADER.size + i * _ENTRY.size)
+            entry = Entry(suite.rstrip(b'\0').decode('utf-8'), hook.rstrip(b'\0').decode('utf-8'),
+                          rate, codes[code], offset, frames)
+            self.entries[entry.suite, entry.hook] = entry
+
+    def suites(self):
+        """Suite names in the bank"""
+        return sorted({suite for suite, _ in self.entries})
+
+    def hooks(self, suite):
+        """Hooks of a suite, in the standard hook order"""
+        names = [hook for s, hook in self.entries if s == suite]
+        return sorted(names, key=lambda h: HOOK_NAMES.index(h) if h in HOOK_NAMES else len(HOOK_NAMES))
+
+    def entry(self, suite, hook):
+        try:
+            return self.entries[suite, hook]
+        except KeyError:
+            raise ValueError(f'no {suite}.{hook} in {self.path}')
+
+    def pcm(self, suite, hook):
+        """The raw sample bytes of a sound, as a memoryview into the mapping"""
+        entry = self.entry(suite, hook)
+        return self._view[entry.offset:entry.offset + entry.frames * SAMPLE_FORMATS[entry.format]]
+
+    def samples(self, suite, hook):
+        """A sound's samples as a read-only NumPy array over the mapping (int16 or float32)"""
+        entry = self.entry(suite, hook)
+        return np.frombuffer(self._map, dtype=_DTYPES[entry.format], count=entry.frames, offset=entry.offset)
+
+    def scale(self, suite, hook):
+        """Factor taking a sound's stored samples to floats in -1.0..1.0"""
+        return 1.0 / 32768 if self.entry(suite, hook).format == 'pcm16' else 1.0
+
+    def close(self):
+        """Unmap the file; if sample arrays are still alive, the mapping stays until they are freed"""
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _suite(text):
+    name, _, directory = text.partition('=')
+    if not directory:
+        raise argparse.ArgumentTypeError(f'expected NAME=DIR, got {text!r}')
+    return name, directory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pack rendered sound suites into one memory-mappable bank')
+    parser.add_argument('-o', '--output', default=DEFAULT_BANK, help=f'bank file (default: {DEFAULT_BANK})')
+    parser.add_argument('--suite', action='append', type=_suite, dest='suites', metavar='NAME=DIR',
+                        help='pack this suite directory (repeatable; default: every suite in the repository)')
+    parser.add_argument('--format', choices=sorted(_FORMAT_CODES), default='pcm16',
+                        help='sample format stored in the bank (default: pcm16)')
+    args = parser.parse_args(argv)
+
+    if args.suites:
+        suites = dict(args.suites)
+    else:
+        suites = {name: os.path.join(ROOT, directory) for name, directory in SUITES.items()}
+    try:
+        sounds = suite_sounds(suites)
+        if not sounds:
+            raise ValueError('no hook sounds found in ' + ', '.join(suites.values()))
+        count = write_bank(args.output, sounds, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+    with SoundBank(args.output) as bank:
+        summary = ', '.join(f'{suite} ({len(bank.hooks(suite))})' for suite in bank.suites())
+    print(f"✓ Packed {count} sounds into {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB): {summary}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Benchmarks
+Times every hook generator and the main synthesis primitives
+
+Primitives are rendered at several durations and sample rates; hooks are
+rendered as the themes define them. Each case reports the best wall time
+over several runs, output samples per second and peak traced memory, and
+primitives also report their cost in milliseconds per second of audio -
+the figure that decides, for instance, whether convolution reverb or the
+feedback delay network is affordable for a given room.
+Results can be saved as a JSON baseline and a later run compared against
+it to flag regressions. --startup instead measures the cold start of the
+quick hook player (see synth.startup).
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+
+from .additive import fm, partial_bank
+from .build import discover_themes, render_hook
+from .envelopes import apply_decay, apply_fade
+from .filters import one_pole_lowpass
+from .noise import DEFAULT_SEED, flutter, white_noise
+from .oscillators import partials, sine_wave
+from .paths import ROOT
+from .reverb import convolve_blocks, fdn, reverb, room_spectra
+from .startup import report as startup_report
+from .wavetable import Oscillator
+from .wavio import save_wav
+
+DEFAULT_DURATIONS = (0.1, 1.0, 10.0)
+DEFAULT_SAMPLE_RATES = (22050, 44100, 48000)
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+
+# audio_seconds is the duration of sound a case renders, when it is known
+Case = namedtuple('Case', ['name', 'setup', 'audio_seconds'], defaults=(None,))
+Result = namedtuple('Result', ['name', 'seconds', 'samples', 'samples_per_second', 'peak_bytes',
+                               'audio_seconds'], defaults=(None,))
+
+
+def _square(frequency, duration, sample_rate):
+    return Oscillator('square', sample_rate).render(frequency, duration)
+
+
+def _drone(frequency, duration, sample_rate):
+    return partials(frequency, duration, (1, 1.003, 0.997), (1, 0.8, 0.6), sample_rate)
+
+
+def _bank(count):
+    """A drone of count decaying harmonics from the batched partial bank"""
+    ratios = np.arange(1, count + 1)
+
+    def render(frequency, duration, sample_rate):
+        return partial_bank(frequency, duration, ratios, 1 / ratios, sample_rate, decays=3 / ratios)
+    return render
+
+
+def _shimmer(frequency, duration, sample_rate):
+    return fm(frequency, duration, (1, 2.01, 3.02, 4.03), (1, 0.5, 0.3, 0.2), (0, 0, 0, 1.41), (0.35, 0.5, 0.7, 2),
+              sample_rate, mod_hz=(15, 15, 15, 0), index_decays=(0, 0, 0, 0.15))
+
+
+def _streamed_reverb(signal, sample_rate):
+    blocks = (signal[i:i + 4096] for i in range(0, len(signal), 4096))
+    return np.concatenate(list(convolve_blocks(blocks, room_spectra(sample_rate))))
+
+
+def _signal(duration, sample_rate):
+    """Deterministic test signal for the effect and writer benchmarks"""
+    return np.random.default_rng(0).uniform(-0.5, 0.5, int(sample_rate * duration))
+
+
+def primitive_cases(durations=DEFAULT_DURATIONS, sample_rates=DEFAULT_SAMPLE_RATES, scratch_dir=None):
+    """Benchmark cases for the primitives, one per duration and sample rate
+
+    A case's setup prepares its input and returns a zero-argument callable
+    that performs the render and returns the number of samples produced.
+    """
+    scratch_dir = scratch_dir or tempfile.gettempdir()
+
+    def generator(func, *leading):
+        def setup(duration, sample_rate):
+            return lambda: len(func(*leading, duration, sample_rate))
+        return setup
+
+    def effect(func, *trailing):
+        def setup(duration, sample_rate):
+            signal = _signal(duration, sample_rate)
+            return lambda: len(func(signal, *trailing))
+        return setup
+
+    def room(func):
+        def setup(duration, sample_rate):
+            signal = _signal(duration, sample_rate)
+            return lambda: len(func(signal, sample_rate))
+        return setup
+
+    def writer(duration, sample_rate):
+        signal = _signal(duration, sample_rate)
+        path = os.path.join(scratch_dir, 'bench.wav')
+
+        def run():
+            save_wav(path, signal, sample_rate)
+            return len(signal)
+        return run
+
+    primitives = {
+        'sine_wave': generator(sine_wave, 440),
+        'oscillator.square': generator(_square, 440),
+        'partials': generator(_drone, 45),
+        'partial_bank.3': generator(_bank(3), 45),
+        'partial_bank.32': generator(_bank(32), 45),
+        'fm.4': generator(_shimmer, 440),
+        'white_noise': generator(white_noise),
+        'flutter': generator(flutter),
+        'one_pole_lowpass': effect(one_pole_lowpass, 0.15),
+        'apply_decay': effect(apply_decay, 0.97),
+        'apply_fade': effect(apply_fade),
+        'reverb.convolution': room(reverb),
+        'reverb.streaming': room(_streamed_reverb),
+        'reverb.fdn': room(fdn),
+        'save_wav': writer,
+    }
+
+    cases = []
+    for name, setup in primitives.items():
+        for sample_rate in sample_rates:
+            for duration in durations:
+                cases.append(Case(f'primitive:{name}@{sample_rate}Hz/{duration:g}s',
+                                  lambda setup=setup, d=duration, sr=sample_rate: setup(d, sr), duration))
+    return cases
+
+
+def hook_cases(scratch_dir):
+    """Benchmark cases rendering every hook of every theme into scratch_dir"""
+    cases = []
+    for theme in discover_themes():
+        os.makedirs(os.path.join(scratch_dir, theme.output_dir), exist_ok=True)
+        for hook in theme.hooks:
+            def setup(theme=theme, hook=hook):
+                path = os.path.join(scratch_dir, theme.output_dir, hook + '.wav')
+
+                def run():
+                    cwd = os.getcwd()
+                    os.chdir(scratch_dir)
+                    try:
+                        render_hook(theme, hook, DEFAULT_SEED)
+                    finally:
+                        os.chdir(cwd)
+                    return (os.path.getsize(path) - 44) // 2
+                return run
+            cases.append(Case(f'hook:{theme.name}.{hook}', setup))
+    return cases
+
+
+def run_case(case, repeat=DEFAULT_REPEAT):
+    """Time a case (best of repeat runs), then measure its peak memory in one traced run"""
+    run = case.setup()
+    best = float('inf')
+    samples = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        samples = run()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    rate = samples / best if best > 0 else float('inf')
+    return Result(case.name, best, samples, rate, peak, case.audio_seconds)
+
+
+def run_benchmarks(cases, repeat=DEFAULT_REPEAT, match=None):
+    """Run every case whose name contains match"""
+    return [run_case(case, repeat) for case in cases if not match or match in case.name]
+
+
+def to_json(results):
+    """Results plus the environment they were measured in"""
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {r.name: r._asdict() for r in results},
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return (name, baseline_seconds, seconds, ratio) for cases slower than 1 + threshold"""
+    regressions = []
+    previous = baseline.get('results', {})
+    for result in results:
+        if result.name not in previous:
+            continue
+        before = previous[result.name]['seconds']
+        ratio = result.seconds / before if before > 0 else float('inf')
+        if ratio > 1.0 + threshold:
+            regressions.append((result.name, before, result.seconds, ratio))
+    return regressions
+
+
+def cost_per_second(result):
+    """Milliseconds of compute per second of audio rendered, or None when the duration is unknown"""
+    if not result.audio_seconds:
+        return None
+    return result.seconds * 1000 / result.audio_seconds
+
+
+def format_table(results):
+    lines = [f"{'case':60s} {'time':>10s} {'samples/s':>12s} {'peak mem':>10s} {'ms/audio s':>11s}"]
+    for r in results:
+        cost = cost_per_second(r)
+        lines.append(f"{r.name:60s} {r.seconds * 1000:8.2f}ms {r.samples_per_second:12.3e} "
+                     f"{r.peak_bytes / 1024:8.0f}KB " + (f"{cost:11.2f}" if cost is not None else f"{'-':>11s}"))
+    return '\n'.join(lines)
+
+
+def _floats(text):
+    return tuple(float(v) for v in text.split(','))
+
+
+def _ints(text):
+    return tuple(int(v) for v in text.split(','))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the sound generators')
+    parser.add_argument('--durations', type=_floats, default=DEFAULT_DURATIONS,
+                        help='comma-separated primitive durations in seconds')
+    parser.add_argument('--rates', type=_ints, default=DEFAULT_SAMPLE_RATES,
+                        help='comma-separated primitive sample rates')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help='runs per case; the fastest is reported')
+    parser.add_argument('--match', help='only run cases whose name contains this')
+    parser.add_argument('--no-hooks', action='store_true', help='skip the hook renders')
+    parser.add_argument('--save', metavar='PATH', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='slowdown ratio above which a case is a regression (default: 0.25)')
+    parser.add_argument('--startup', metavar='HOOK', nargs='?', const='tool_complete',
+                        help='instead, time the cold start of play_sound.py against the audio player alone')
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        print(startup_report(args.startup))
+        return 0
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        cases = primitive_cases(args.durations, args.rates, scratch_dir)
+        if not args.no_hooks:
+            cases += hook_cases(scratch_dir)
+        results = run_benchmarks(cases, args.repeat, args.match)
+
+    print(format_table(results))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(to_json(results), f, indent=2)
+            f.write('\n')
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        if not regressions:
+            print(f"✓ No regressions against {args.compare}")
+            return 0
+        print(f"✗ {len(regressions)} regression(s) against {args.compare}:")
+        for name, before, after, ratio in regressions:
+            print(f"  {name}: {before * 1000:.2f}ms -> {after * 1000:.2f}ms ({ratio:.2f}x)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
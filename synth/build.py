@@ -0,0 +1,431 @@
+"""
+Suite Build
+Renders every hook of every theme across a process pool
+
+Themes are discovered from the spec files in themes/ (see synth.spec) and
+from any generate_<theme>_sounds.py script in the repository root that
+still defines its own generate_<hook>() functions and OUTPUT_DIR. Every
+hook's noise is seeded from (seed, theme, hook), and hooks whose
+fingerprint matches the build cache in their output directory are skipped.
+Spec themes render each hook once and write it to every --export target
+(sample rate and format). With --variations, each hook that declares
+variation ranges also gets its pool of seeded variants (see synth.variation)
+rendered in the same process pool and cached like any other file. Every
+written sound is measured (synth.loudness) - spec hooks on their float
+render, before the writer's clamp can hide clipping - and --normalize LUFS
+scales each spec hook towards a loudness target first; the measurements are
+kept in each suite's .loudness.json and reused while the file is unchanged.
+--profile records every rendered hook's stages (see synth.profiling), in
+the worker processes too, and writes them as a collapsed-stack file.
+"""
+
+import argparse
+import contextlib
+import functools
+import glob
+import importlib
+import io
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from . import loudness, profiling, sounds, spec as specs, variation
+from .cache import BuildCache, hook_fingerprint, plan_fingerprint
+from .export import export, parse_target, target_paths
+from .noise import DEFAULT_SEED, seed_noise
+from .paths import HOOK_NAMES, ROOT, SPEC_DIR, SPEC_EXTENSIONS
+
+# A theme is rendered from its spec file, or from its script module when spec is None
+Theme = namedtuple('Theme', ['name', 'module', 'output_dir', 'hooks', 'spec'], defaults=(None,))
+# variant is the index of a variation pool member, None for the hook's own files;
+# loudness is the synth.loudness.Loudness of the primary file
+HookResult = namedtuple('HookResult', ['theme', 'hook', 'output', 'seconds', 'cached', 'variant', 'loudness'],
+                        defaults=(None, None))
+
+
+def discover_themes(root=ROOT):
+    """Find every theme spec and every generate_<theme>_sounds.py script with hook generators"""
+    if root not in sys.path:
+        sys.path.insert(0, root)
+
+    themes = {}
+    for extension in SPEC_EXTENSIONS:
+        for path in glob.glob(os.path.join(root, SPEC_DIR, '*' + extension)):
+            spec = specs.load_spec(path)
+            unknown = sorted(set(spec['hooks']) - set(HOOK_NAMES))
+            if unknown:
+                raise ValueError(f'{path}: unknown hook(s) ' + ', '.join(unknown))
+            if spec['name'] in themes:
+                raise ValueError(f"{path}: theme {spec['name']!r} is defined twice")
+            hooks = tuple(h for h in HOOK_NAMES if h in spec['hooks'])
+            themes[spec['name']] = Theme(spec['name'], None, spec['output_dir'], hooks, path)
+
+    for path in glob.glob(os.path.join(root, 'generate_*_sounds.py')):
+        module_name = os.path.splitext(os.path.basename(path))[0]
+        module = importlib.import_module(module_name)
+        hooks = tuple(h for h in HOOK_NAMES if callable(getattr(module, 'generate_' + h, None)))
+        if not hooks:
+            continue
+        name = module_name[len('generate_'):-len('_sounds')]
+        if name in themes:
+            raise ValueError(f'{path}: theme {name!r} also has a spec file')
+        themes[name] = Theme(name, module_name, module.OUTPUT_DIR, hooks)
+    return [themes[name] for name in sorted(themes)]
+
+
+def write_hook(theme, hook, seed=DEFAULT_SEED, targets=None, normalize=None):
+    """Render one hook of a spec theme in memory and write it to every export target; returns its Loudness"""
+    spec = specs.load_spec(theme.spec)
+    with profiling.frame('render'):
+        samples = sounds.render_samples(theme.spec, hook, seed)
+    profiling.count(len(samples))
+    samples, level = _level(samples, spec['sample_rate'], normalize)
+    export(samples, spec['sample_rate'], targets or specs.default_targets(spec), theme.output_dir, hook)
+    message = spec['hooks'][hook].get('message')
+    print(f"✓ Generated {hook}.wav" + (f' - {message}' if message else ''))
+    return level
+
+
+def write_variant(theme, hook, index, seed=DEFAULT_SEED, targets=None, normalize=None):
+    """Render one variant of a spec hook and write it at the primary export target; returns its Loudness"""
+    spec = specs.load_spec(theme.spec)
+    with profiling.frame('render'):
+        samples = variation.render_variant(theme.spec, hook, index, seed)
+    profiling.count(len(samples))
+    samples, level = _level(samples, spec['sample_rate'], normalize)
+    name = variation.variant_name(hook, index)
+    export(samples, spec['sample_rate'], _variant_targets(spec, targets),
+           os.path.join(theme.output_dir, variation.VARIATIONS_DIR), name)
+    print(f"✓ Generated {variation.VARIATIONS_DIR}/{name}.wav")
+    return level
+
+
+def _level(samples, sample_rate, normalize):
+    """Measure a render and, given a target in LUFS, normalize it; returns (samples, Loudness)"""
+    with profiling.frame('measure'):
+        measured = loudness.measure(samples, sample_rate)
+        if normalize is None:
+            return samples, measured
+        samples, gain_db = loudness.normalize(samples, measured, normalize)
+        return samples, loudness.measure(samples, sample_rate)._replace(gain_db=gain_db)
+
+
+def _variant_targets(spec, targets):
+    return (targets or specs.default_targets(spec))[:1]
+
+
+def render_hook(theme, hook, seed=DEFAULT_SEED, targets=None, variant=None, normalize=None):
+    """Render one hook (or one variant of it) with its own noise stream, capturing what it prints
+
+    Returns (output, seconds, loudness).
+    """
+    if variant is not None:
+        render = functools.partial(write_variant, theme, hook, variant, seed, targets, normalize)
+    elif theme.spec is None:
+        module = importlib.import_module(theme.module)
+        render = getattr(module, 'generate_' + hook)
+        seed_noise(seed, theme.module, hook)
+    else:
+        render = functools.partial(write_hook, theme, hook, seed, targets, normalize)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        level = render()
+    seconds = time.perf_counter() - start
+    if theme.spec is None:
+        level, _ = loudness.analyze(output_paths(theme, hook)[0])
+    return output.getvalue(), seconds, level
+
+
+def _profiled_render(theme, hook, seed, targets, variant, normalize):
+    """render_hook() under a fresh profiler; returns (its result, the profiler's stats)"""
+    profiler = profiling.start()
+    try:
+        with profiler.frame(theme.name), profiler.frame(_cache_key(hook, variant)):
+            rendered = render_hook(theme, hook, seed, targets, variant, normalize)
+    finally:
+        profiling.stop()
+    return rendered, profiler.stats
+
+
+def fingerprint(theme, hook, seed=DEFAULT_SEED, targets=None, variant=None, normalize=None):
+    """Build-cache fingerprint of one hook of a theme, or of one of its variants"""
+    if theme.spec is None:
+        return hook_fingerprint(importlib.import_module(theme.module), hook, seed=seed)
+    spec = specs.load_spec(theme.spec)
+    if variant is not None:
+        plan, pitch = variation.compile_variant(spec, hook, variant, seed)
+        return plan_fingerprint(plan, seed, _variant_targets(spec, targets), (variant, pitch), normalize)
+    return plan_fingerprint(specs.compile_hook(spec, hook), seed, targets or specs.default_targets(spec),
+                            normalize=normalize)
+
+
+def output_paths(theme, hook, targets=None, variant=None):
+    """Files a build writes for one hook, or for one of its variants"""
+    if theme.spec is None:
+        return [os.path.join(theme.output_dir, hook + '.wav')]
+    spec = specs.load_spec(theme.spec)
+    if variant is not None:
+        return target_paths(os.path.join(theme.output_dir, variation.VARIATIONS_DIR),
+                            variation.variant_name(hook, variant), _variant_targets(spec, targets))
+    return target_paths(theme.output_dir, hook, targets or specs.default_targets(spec))
+
+
+def pool_sizes(theme, pool_size=None):
+    """{hook: pool size} of the hooks of a theme that declare variations"""
+    if theme.spec is None:
+        return {}
+    spec = specs.load_spec(theme.spec)
+    sizes = {hook: variation.pool_size(spec, hook, pool_size) for hook in theme.hooks}
+    return {hook: size for hook, size in sizes.items() if variation.variations(spec, hook) is not None}
+
+
+def _prune_variants(theme, cache, hook, size):
+    """Remove variant files (and their cache entries) beyond a hook's pool size"""
+    for index, path in variation.variant_files(theme.output_dir, hook).items():
+        if index >= size:
+            os.remove(path)
+            cache.entries.pop(f'{variation.VARIATIONS_DIR}/{variation.variant_name(hook, index)}', None)
+
+
+def build(themes, jobs=None, force=False, seed=DEFAULT_SEED, targets=None, variations=False, pool_size=None,
+          normalize=None, profiler=None):
+    """Render every stale hook of the given themes, returning results in theme/hook order
+
+    targets is a list of export Targets for spec themes (default: each spec's
+    "export" list); script themes always write their own WAV. With variations,
+    the extra members of each hook's variation pool (pool_size overriding the
+    spec's count) follow the hook in the results. normalize is a loudness
+    target in LUFS for spec themes. Given a synth.profiling Profiler, every
+    rendered hook is profiled and its stats merged into it.
+    """
+    caches = {}
+    fingerprints = {}
+    members = {}
+    tasks = []
+    for theme in themes:
+        if targets and theme.spec is None:
+            raise ValueError(f'{theme.name} is a script theme; export targets need a theme spec')
+        if normalize is not None and theme.spec is None:
+            raise ValueError(f'{theme.name} is a script theme; normalization needs a theme spec')
+        os.makedirs(theme.output_dir, exist_ok=True)
+        cache = caches[theme.name] = BuildCache(theme.output_dir)
+        sizes = pool_sizes(theme, pool_size) if variations else {}
+        for hook in theme.hooks:
+            members[theme.name, hook] = [None] + list(range(1, sizes.get(hook, 1)))
+            if variations:
+                _prune_variants(theme, cache, hook, sizes.get(hook, 1))
+            for variant in members[theme.name, hook]:
+                key = _cache_key(hook, variant)
+                digest = fingerprints[theme.name, key] = fingerprint(theme, hook, seed, targets, variant, normalize)
+                if force or not cache.is_fresh(key, digest, output_paths(theme, hook, targets, variant)):
+                    tasks.append((theme, hook, variant))
+
+    render = render_hook if profiler is None else _profiled_render
+    if jobs == 1 or len(tasks) <= 1:
+        rendered = [render(theme, hook, seed, targets, variant, normalize) for theme, hook, variant in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(render, theme, hook, seed, targets, variant, normalize)
+                       for theme, hook, variant in tasks]
+            rendered = [future.result() for future in futures]
+    if profiler is not None:
+        for _, stats in rendered:
+            profiler.merge(stats)
+        rendered = [result for result, _ in rendered]
+    rendered = dict(zip(((theme.name, _cache_key(hook, variant)) for theme, hook, variant in tasks), rendered))
+
+    results = []
+    for theme in themes:
+        cache = caches[theme.name]
+        levels = loudness.LoudnessCache(theme.output_dir)
+        for hook in theme.hooks:
+            for variant in members[theme.name, hook]:
+                key = _cache_key(hook, variant)
+                paths = output_paths(theme, hook, targets, variant)
+                if (theme.name, key) in rendered:
+                    output, seconds, level = rendered[theme.name, key]
+                    cache.record(key, fingerprints[theme.name, key], paths)
+                    levels.record(paths[0], level)
+                    results.append(HookResult(theme.name, hook, output, seconds, False, variant, level))
+                else:
+                    output = f"· Skipped {key}.wav (unchanged)\n"
+                    level, _ = loudness.analyze(paths[0], levels)
+                    results.append(HookResult(theme.name, hook, output, 0.0, True, variant, level))
+        cache.save()
+        levels.save()
+    return results
+
+
+def _cache_key(hook, variant):
+    if variant is None:
+        return hook
+    return f'{variation.VARIATIONS_DIR}/{variation.variant_name(hook, variant)}'
+
+
+def add_build_arguments(parser):
+    """Options shared by build_sounds.py and the individual generator scripts"""
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='re-render every hook, ignoring the build cache')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'base seed for hook noise; builds are byte-reproducible (default: {DEFAULT_SEED})')
+    parser.add_argument('--export', action='append', dest='targets', type=_export_target, metavar='RATE[:FORMAT]',
+                        help='write each hook at this sample rate and format (pcm16, pcm24, float32, flac, ogg); '
+                             'repeatable, the first is the primary file (default: the theme spec\'s "export" list)')
+    parser.add_argument('--variations', action='store_true',
+                        help='also render the variation pool of every hook that declares variation ranges')
+    parser.add_argument('--pool-size', type=int, metavar='N',
+                        help='sounds per variation pool, the canonical one included (default: each hook\'s "count")')
+    parser.add_argument('--normalize', type=float, metavar='LUFS', nargs='?', const=loudness.DEFAULT_TARGET,
+                        help=f'scale each spec hook towards this integrated loudness, peaks kept below '
+                             f'{loudness.DEFAULT_CEILING:g} dBFS (default target: {loudness.DEFAULT_TARGET:g})')
+    parser.add_argument('--levels', action='store_true',
+                        help='print the peak, RMS and loudness of every sound after building')
+    parser.add_argument('--profile', metavar='PATH', nargs='?', const=profiling.DEFAULT_PATH,
+                        help='time every stage of each rendered hook, print a summary and write collapsed stacks '
+                             f'for a flame graph to PATH (default: {profiling.DEFAULT_PATH}); '
+                             'combine with --force to profile unchanged hooks too')
+
+
+def _export_target(text):
+    try:
+        return parse_target(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _check_args(parser, args):
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.pool_size is not None and args.pool_size < 1:
+        parser.error('--pool-size must be at least 1')
+
+
+def _build(parser, themes, args):
+    """Build from parsed arguments; returns (results, Profiler or None)"""
+    profiler = profiling.Profiler() if args.profile else None
+    try:
+        results = build(themes, jobs=args.jobs, force=args.force, seed=args.seed, targets=args.targets,
+                        variations=args.variations, pool_size=args.pool_size, normalize=args.normalize,
+                        profiler=profiler)
+    except ValueError as e:
+        parser.error(str(e))
+    return results, profiler
+
+
+def _print_profile(profiler, path):
+    if not profiler.stats:
+        print("🔥 Nothing was rendered, so nothing was profiled (add --force to profile unchanged hooks)")
+        return
+    print(profiler.format_summary())
+    profiler.write(path)
+    print(f"\n🔥 Wrote {len(profiler.collapsed())} collapsed stacks to {path} (flamegraph.pl / speedscope)")
+    print()
+
+
+def run_theme(name, argv=None):
+    """Command-line entry point used by each generate_<theme>_sounds.py script"""
+    parser = argparse.ArgumentParser(description=f'Render the {name} sound suite')
+    add_build_arguments(parser)
+    args = parser.parse_args(argv)
+    _check_args(parser, args)
+
+    os.chdir(ROOT)
+    themes = [t for t in discover_themes() if t.name == name]
+    results, profiler = _build(parser, themes, args)
+    for result in results:
+        print(result.output, end='')
+    if profiler is not None:
+        print()
+        _print_profile(profiler, args.profile)
+    return results
+
+
+def _print_plan(parser, themes, name, seed):
+    theme_name, _, hook = name.partition('.')
+    theme = next((t for t in themes if t.name == theme_name), None)
+    if theme is None or hook not in theme.hooks:
+        parser.error(f'unknown hook: {name}')
+    if theme.spec is None:
+        parser.error(f'{theme_name} is a script theme; only spec themes have render plans')
+    print(specs.explain_hook(specs.load_spec(theme.spec), hook, seed))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render every sound suite in parallel')
+    add_build_arguments(parser)
+    parser.add_argument('--theme', action='append', dest='themes', metavar='NAME',
+                        help='only build this theme (repeatable)')
+    parser.add_argument('--plan', metavar='THEME.HOOK',
+                        help="print a spec hook's render plan and buffer allocations instead of building")
+    args = parser.parse_args(argv)
+    _check_args(parser, args)
+
+    os.chdir(ROOT)
+    themes = discover_themes()
+    if args.plan:
+        return _print_plan(parser, themes, args.plan, args.seed)
+    if args.themes:
+        unknown = set(args.themes) - {t.name for t in themes}
+        if unknown:
+            parser.error('unknown theme(s): ' + ', '.join(sorted(unknown)))
+        themes = [t for t in themes if t.name in args.themes]
+
+    print(f"Building {len(themes)} suite(s) with {args.jobs} job(s)...")
+    start = time.perf_counter()
+    results, profiler = _build(parser, themes, args)
+
+    current = None
+    for result in results:
+        if result.theme != current:
+            current = result.theme
+            print()
+            print(f"[{current}]")
+        print(result.output, end='')
+
+    rendered = sum(1 for r in results if not r.cached)
+    print()
+    if args.levels:
+        _print_levels(results)
+    if args.variations:
+        _print_pools(results)
+    if profiler is not None:
+        _print_profile(profiler, args.profile)
+    clipped = [r for r in results if r.loudness.clipped]
+    if clipped:
+        print(f"⚠ {sum(r.loudness.clipped for r in clipped)} clipped samples in "
+              + ', '.join(f'{r.theme}.{_cache_key(r.hook, r.variant)}' for r in clipped))
+    print(f"✨ Rendered {rendered} sounds ({len(results) - rendered} unchanged) "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+def _print_levels(results):
+    current = None
+    for result in results:
+        if result.theme != current:
+            current = result.theme
+            suite = [r.loudness.lufs for r in results if r.theme == current and r.loudness.lufs > loudness.FLOOR_DB]
+            print(f"[{current}] {min(suite):.1f} to {max(suite):.1f} LUFS" if suite else f"[{current}]")
+        print('  ' + loudness.format_row(_cache_key(result.hook, result.variant), result.loudness))
+    print()
+
+
+def _print_pools(results):
+    pools = {}
+    for result in results:
+        if result.variant is not None:
+            pools.setdefault((result.theme, result.hook), []).append(result)
+    for (theme, hook), members in pools.items():
+        rendered = [r for r in members if not r.cached]
+        print(f"🎲 {theme}.{hook}: pool of {len(members) + 1} ({len(rendered)} rendered "
+              f"in {sum(r.seconds for r in rendered):.2f}s)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
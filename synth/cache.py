@@ -0,0 +1,163 @@
+"""
+Build Cache
+Content-addressed fingerprints that let the builder skip unchanged hooks
+
+A script hook's fingerprint covers the source of its generate_<hook>
+function, the theme helpers, classes and constants it references
+(transitively), the synth modules any of them use, the sample rate and the
+random seed. A spec hook's fingerprint covers its compiled render plan
+(which already has voices, defaults and constants folded in), the engine
+modules and the seed; a variation pool member's adds its index and pitch
+offset, and a normalized hook's its loudness target. Each output directory
+keeps a manifest mapping hook -> fingerprint and the digests of the files
+written for it (one per export target).
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import types
+
+MANIFEST_NAME = '.build-cache.json'
+
+# Constant types whose repr is folded into a fingerprint
+_CONSTANT_TYPES = (int, float, str, bool, tuple, type(None))
+
+
+def _code_names(code):
+    """Global names referenced by a code object and any nested code objects"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _module_sources(module_name, seen):
+    """Yield (name, source) for a synth module and the synth modules it uses"""
+    if module_name in seen:
+        return
+    seen.add(module_name)
+    module = sys.modules[module_name]
+    yield module_name, inspect.getsource(module)
+    for value in vars(module).values():
+        dependency = getattr(value, '__module__', None)
+        if isinstance(value, types.ModuleType):
+            dependency = value.__name__
+        if dependency and dependency.split('.')[0] == 'synth':
+            yield from _module_sources(dependency, seen)
+
+
+def _dependencies(func, module, seen_names, seen_modules):
+    """Yield (kind, name, content) for everything func pulls from module globals"""
+    namespace = vars(module)
+    for name in sorted(_code_names(func.__code__)):
+        if name in seen_names or name not in namespace:
+            continue
+        seen_names.add(name)
+        value = namespace[name]
+        owner = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+        if isinstance(value, (types.FunctionType, type)) and owner == module.__name__:
+            if isinstance(value, type):
+                yield 'class', name, inspect.getsource(value)
+                methods = [v for v in vars(value).values() if isinstance(v, types.FunctionType)]
+            else:
+                yield 'function', name, inspect.getsource(value)
+                methods = [value]
+            for method in methods:
+                yield from _dependencies(method, module, seen_names, seen_modules)
+        elif isinstance(owner, str) and owner.startswith('synth.'):
+            yield from (('engine', m, src) for m, src in _module_sources(owner, seen_modules))
+        elif isinstance(value, _CONSTANT_TYPES):
+            yield 'constant', name, repr(value)
+
+
+def hook_fingerprint(module, hook, sample_rate=44100, seed=None):
+    """Hash everything that determines the audio a hook renders"""
+    func = getattr(module, 'generate_' + hook)
+    digest = hashlib.sha256()
+    parts = [('hook', hook, inspect.getsource(func)),
+             ('render', 'sample_rate', repr(sample_rate)),
+             ('render', 'seed', repr(seed))]
+    parts.extend(_dependencies(func, module, set(), set()))
+    for kind, name, content in parts:
+        digest.update(f'{kind}:{name}\0{content}\0'.encode())
+    return digest.hexdigest()
+
+
+def plan_fingerprint(plan, seed=None, targets=None, variant=None, normalize=None):
+    """Hash everything that determines the files a compiled spec hook renders
+
+    variant identifies one member of a variation pool (see synth.variation);
+    normalize is a loudness target (see synth.loudness).
+    """
+    digest = hashlib.sha256()
+    parts = [('plan', plan.hook, json.dumps(plan.steps, sort_keys=True)),
+             ('render', 'sample_rate', repr(plan.sample_rate)),
+             ('render', 'seed', repr(seed)),
+             ('render', 'noise_key', repr(plan.noise_key)),
+             ('render', 'targets', repr(targets))]
+    parts.extend(('engine', m, src) for m, src in _module_sources('synth.engine', set()))
+    parts.extend(('export', m, src) for m, src in _module_sources('synth.export', set()))
+    if variant is not None:
+        parts.append(('render', 'variant', repr(variant)))
+        parts.extend(('variation', m, src) for m, src in _module_sources('synth.variation', set()))
+    if normalize is not None:
+        parts.append(('render', 'normalize', repr(normalize)))
+        parts.extend(('loudness', m, src) for m, src in _module_sources('synth.loudness', set()))
+    for kind, name, content in parts:
+        digest.update(f'{kind}:{name}\0{content}\0'.encode())
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class BuildCache:
+    """Manifest of the fingerprints behind the files in one output directory"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def wav_path(self, hook):
+        return os.path.join(self.output_dir, hook + '.wav')
+
+    def _files(self, hook, paths):
+        paths = paths or [self.wav_path(hook)]
+        return {os.path.relpath(path, self.output_dir): path for path in paths}
+
+    def is_fresh(self, hook, fingerprint, paths=None):
+        """True if the hook's files (default: its WAV) exist and were rendered from this fingerprint"""
+        entry = self.entries.get(hook)
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return False
+        files = self._files(hook, paths)
+        if set(files) != set(entry.get('files', {})):
+            return False
+        try:
+            return all(file_digest(path) == entry['files'][name] for name, path in files.items())
+        except OSError:
+            return False
+
+    def record(self, hook, fingerprint, paths=None):
+        """Remember the fingerprint for the files (default: the WAV) just written for hook"""
+        self.entries[hook] = {
+            'fingerprint': fingerprint,
+            'files': {name: file_digest(path) for name, path in self._files(hook, paths).items()},
+        }
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+            f.write('\n')
@@ -0,0 +1,68 @@
+"""
+Sound Client
+Asks the resident sound daemon (synth.daemon) to play a hook
+
+Used from hook commands in place of forking a player per sound; it only
+needs the standard library so it starts quickly.
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+# Seconds to wait for the daemon before giving up
+TIMEOUT = 1.0
+
+
+def default_socket_path():
+    """Per-user socket path: $XDG_RUNTIME_DIR when set, else the temp directory"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(runtime_dir, f'claude-sounds-{os.getuid()}.sock')
+
+
+def request(line, socket_path=None, timeout=TIMEOUT):
+    """Send one request line to the daemon and return its reply line"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path or default_socket_path())
+        sock.sendall(line.encode('utf-8') + b'\n')
+        reply = sock.makefile('rb').readline()
+    return reply.decode('utf-8').rstrip('\n')
+
+
+def play(hook, socket_path=None, timeout=TIMEOUT):
+    """Ask the daemon to play a hook, stamping the request for end-to-end latency"""
+    return request(f'play {hook} {time.monotonic():.6f}', socket_path, timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play a hook sound through the sound daemon')
+    parser.add_argument('hook', help="hook to play, or 'stats', 'ping', 'shutdown' or 'switch SUITE'")
+    parser.add_argument('suite', nargs='?', help='suite to switch to (sound bank daemons only)')
+    parser.add_argument('--socket', default=default_socket_path(), help='Unix socket path')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.hook == 'switch':
+            if not args.suite:
+                parser.error('switch needs a suite name')
+            reply = request(f'switch {args.suite}', args.socket)
+        elif args.hook in ('stats', 'ping', 'shutdown'):
+            reply = request(args.hook, args.socket)
+        else:
+            reply = play(args.hook, args.socket)
+    except OSError as e:
+        print(f'sound daemon not reachable at {args.socket}: {e}', file=sys.stderr)
+        return 1
+    if reply.startswith('error'):
+        print(reply, file=sys.stderr)
+        return 1
+    if args.hook == 'stats':
+        print(reply)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
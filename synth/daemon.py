@@ -0,0 +1,615 @@
+"""
+Sound Daemon
+Resident hook player: preloaded sounds, a Unix socket and one audio output
+
+The daemon loads the ten hook sounds of a suite once - decoded from the
+suite's WAV files, or rendered in memory from a theme spec - converts them
+to the output rate and format, and keeps them resident. Hooks then ask it
+to play a sound over a Unix socket (see synth.client) instead of forking a
+player that re-opens and re-parses the file each time.
+
+Requests are lines of text: 'play HOOK [SENT]' queues a sound, answering
+'ok' or 'skipped' when the scheduler merged or dropped it (SENT is the
+client's time.monotonic(), for end-to-end latency), 'stats' returns
+latency, playback and scheduler counters as JSON, 'ping' answers 'ok' and
+'shutdown' stops the daemon. With a sound bank (synth.bank), 'switch
+SUITE' changes suite without touching another file. Hooks with a variation
+pool (synth.variation) play a different variant on each request, in turn
+or at random. Overlapping sounds are summed by one block mixer
+(synth.mixer) and streamed to an audio backend: a persistent aplay or
+paplay process fed raw PCM, sounddevice when installed, or the null and
+file backends for headless machines and tests. --offline mixes a list of
+timed hook events into a WAV file with the same mixer and scheduler
+instead of serving.
+"""
+
+import argparse
+import functools
+import json
+import os
+import queue
+import shutil
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from . import sounds as renderer
+from .bank import SoundBank
+from .client import default_socket_path
+from .mixer import DEFAULT_KNEE, MIX_BLOCK_SIZE, Mixer, parse_event, render_events
+from .paths import HOOK_NAMES
+from .resample import resample
+from .scheduler import DEFAULT_DUCK_GAIN, DEFAULT_MAX_VOICES, DEFAULT_WINDOW, POLICIES, Scheduler
+from .spec import load_spec
+from .variation import SELECT_MODES, Selector, pool_size, render_variant, variant_files, variant_names
+from .wavio import WavStreamWriter, read_wav, save_wav, to_pcm16
+
+try:
+    import sounddevice
+except ImportError:  # the sounddevice backend is optional
+    sounddevice = None
+
+DEFAULT_SAMPLE_RATE = 22050
+
+# Latency samples kept for the percentiles reported by 'stats'
+LATENCY_WINDOW = 1024
+
+# Seconds of mixed audio a real-time backend may be given ahead of playback
+LOOKAHEAD = 0.05
+
+# gain takes samples to -1.0..1.0 floats: 1/32768 for 16-bit samples mapped from a sound bank
+Sound = namedtuple('Sound', ['hook', 'samples', 'gain'], defaults=(1.0,))
+
+
+def load_suite(directory, sample_rate=DEFAULT_SAMPLE_RATE, hooks=HOOK_NAMES):
+    """Decode the suite's <hook>.wav files into resident Sounds at sample_rate"""
+    sounds = {}
+    for hook in hooks:
+        path = os.path.join(directory, hook + '.wav')
+        if not os.path.exists(path):
+            continue
+        samples, rate = read_wav(path)
+        sounds[hook] = _sound(hook, samples, rate, sample_rate)
+    if not sounds:
+        raise ValueError(f'no hook sounds in {directory}')
+    return sounds
+
+
+def load_theme(theme, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Render every hook of a theme spec in memory into resident Sounds at sample_rate"""
+    return {hook: _sound(hook, renderer.render_samples(theme, hook, sample_rate=sample_rate),
+                         sample_rate, sample_rate)
+            for hook in renderer.hooks(theme)}
+
+
+def load_pools(directory, sounds, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Variation pools of a suite directory: {hook: [its Sound, then each variant]} for hooks with variants"""
+    pools = {}
+    for hook, sound in sounds.items():
+        variants = [_sound(hook, *read_wav(path), sample_rate) for path in variant_files(directory, hook).values()]
+        if variants:
+            pools[hook] = [sound] + variants
+    return pools
+
+
+def render_pools(theme, sounds, sample_rate=DEFAULT_SAMPLE_RATE, size=None):
+    """Variation pools of a theme spec, rendered in memory like load_theme()"""
+    path = renderer.theme_path(theme)
+    spec = load_spec(path)
+    pools = {}
+    for hook, sound in sounds.items():
+        count = pool_size(spec, hook, size)
+        if count > 1:
+            variants = [render_variant(path, hook, i, sample_rate=sample_rate) for i in range(1, count)]
+            pools[hook] = [sound] + [_sound(hook, v, sample_rate, sample_rate) for v in variants]
+    return pools
+
+
+def load_bank(bank, suite, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Sounds of one suite of a synth.bank.SoundBank; at the bank's own rate they stay zero-copy"""
+    names = bank.hooks(suite)
+    variants = {name for hook in names for name in variant_names(names, hook).values()}
+    sounds = {hook: _bank_sound(bank, suite, hook, hook, sample_rate) for hook in names if hook not in variants}
+    if not sounds:
+        raise ValueError(f'no suite {suite!r} in {bank.path} (has {", ".join(bank.suites())})')
+    return sounds
+
+
+def load_bank_pools(bank, suite, sounds, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Variation pools packed in a bank for one suite, like load_pools()"""
+    names = bank.hooks(suite)
+    pools = {}
+    for hook, sound in sounds.items():
+        variants = [_bank_sound(bank, suite, name, hook, sample_rate) for name in variant_names(names, hook).values()]
+        if variants:
+            pools[hook] = [sound] + variants
+    return pools
+
+
+def _bank_sound(bank, suite, name, hook, sample_rate):
+    entry = bank.entry(suite, name)
+    samples, scale = bank.samples(suite, name), bank.scale(suite, name)
+    if entry.sample_rate == sample_rate:
+        return Sound(hook, samples, scale)
+    return _sound(hook, samples * scale, entry.sample_rate, sample_rate)
+
+
+def _load_bank_suite(bank, sample_rate, with_pools, suite):
+    """(sounds, variation pools) of one suite of a bank, for 'switch SUITE'"""
+    sounds = load_bank(bank, suite, sample_rate)
+    return sounds, load_bank_pools(bank, suite, sounds, sample_rate) if with_pools else {}
+
+
+def _sound(hook, samples, rate, sample_rate):
+    if rate != sample_rate:
+        samples = resample(samples, rate, sample_rate)
+    samples = np.ascontiguousarray(samples, dtype=np.float64)
+    samples.flags.writeable = False
+    return Sound(hook, samples)
+
+
+class NullBackend:
+    """Discards audio; counts the frames it was given"""
+
+    # Real-time backends consume audio at the sample rate, so the player paces itself to them
+    realtime = False
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.frames = 0
+
+    def write(self, block):
+        self.frames += len(block)
+
+    def close(self):
+        pass
+
+
+class FileBackend(NullBackend):
+    """Appends every mixed block to one WAV file"""
+
+    def __init__(self, sample_rate, path):
+        super().__init__(sample_rate)
+        self._writer = WavStreamWriter(path, sample_rate)
+
+    def write(self, block):
+        super().write(block)
+        self._writer.write(block)
+
+    def close(self):
+        self._writer.close()
+
+
+class _PCMBackend(NullBackend):
+    """Converts blocks to 16-bit PCM in preallocated buffers before output"""
+
+    realtime = True
+
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        self._pcm = np.empty(0, dtype='<i2')
+        self._scratch = np.empty(0)
+
+    def pcm(self, block):
+        if len(block) > len(self._pcm):
+            self._pcm = np.empty(len(block), dtype='<i2')
+            self._scratch = np.empty(len(block))
+        self.frames += len(block)
+        return memoryview(to_pcm16(block, out=self._pcm, scratch=self._scratch)).cast('B')
+
+
+class PipeBackend(_PCMBackend):
+    """Streams raw 16-bit PCM into one long-running player process"""
+
+    COMMANDS = {
+        'aplay': ['aplay', '-q', '-t', 'raw', '-f', 'S16_LE', '-c', '1', '-r', '{rate}', '-B', '100000'],
+        'paplay': ['paplay', '--raw', '--format=s16le', '--channels=1', '--rate={rate}', '--latency-msec=50'],
+    }
+
+    def __init__(self, sample_rate, player):
+        super().__init__(sample_rate)
+        command = [arg.format(rate=sample_rate) for arg in self.COMMANDS[player]]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, block):
+        self._process.stdin.write(self.pcm(block))
+        self._process.stdin.flush()
+
+    def close(self):
+        self._process.stdin.close()
+        self._process.wait()
+
+
+class SoundDeviceBackend(_PCMBackend):
+    """Plays through PortAudio via the optional sounddevice package"""
+
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        self._stream = sounddevice.RawOutputStream(samplerate=sample_rate, channels=1, dtype='int16')
+        self._stream.start()
+
+    def write(self, block):
+        self._stream.write(self.pcm(block))
+
+    def close(self):
+        self._stream.stop()
+        self._stream.close()
+
+
+def available_backends():
+    """Backends usable on this machine, best first"""
+    names = [player for player in PipeBackend.COMMANDS if shutil.which(player)]
+    if sounddevice is not None:
+        names.append('sounddevice')
+    return names + ['null', 'file']
+
+
+def open_backend(name, sample_rate, path=None):
+    """Create an audio backend by name ('auto' picks the first available)"""
+    if name == 'auto':
+        name = available_backends()[0]
+    if name == 'null':
+        return NullBackend(sample_rate)
+    if name == 'file':
+        if not path:
+            raise ValueError('the file backend needs an output path')
+        return FileBackend(sample_rate, path)
+    if name == 'sounddevice':
+        if sounddevice is None:
+            raise ValueError('the sounddevice backend needs the sounddevice package')
+        return SoundDeviceBackend(sample_rate)
+    if name in PipeBackend.COMMANDS:
+        if not shutil.which(name):
+            raise ValueError(f'{name} is not installed')
+        return PipeBackend(sample_rate, name)
+    raise ValueError(f"unknown backend {name!r} (choose from auto, {', '.join(available_backends())})")
+
+
+class LatencyStats:
+    """Running latency summary over the most recent measurements"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self._recent = np.zeros(window)
+
+    def record(self, seconds):
+        self._recent[self.count % len(self._recent)] = seconds
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def summary(self):
+        """Count, mean, p50, p95 and max in milliseconds"""
+        if not self.count:
+            return {'count': 0}
+        recent = self._recent[:min(self.count, len(self._recent))]
+        p50, p95 = np.percentile(recent, [50, 95])
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000,
+            'p50_ms': p50 * 1000,
+            'p95_ms': p95 * 1000,
+            'max_ms': self.worst * 1000,
+        }
+
+
+class Player:
+    """Mixes requested sounds on one worker thread and streams the blocks to a backend
+
+    Every active sound is summed by a synth.mixer.Mixer, so overlapping hooks
+    share one output stream. With a scheduler (synth.scheduler), each request
+    first becomes a voice or is merged or dropped, and the mixer follows the
+    voice's gain and cancellation. Latency is measured from the request to
+    the block carrying the sound's first sample.
+    """
+
+    def __init__(self, sounds, backend, scheduler=None, block_size=MIX_BLOCK_SIZE, knee=DEFAULT_KNEE,
+                 selector=None):
+        self.sounds = sounds
+        self.backend = backend
+        self.scheduler = scheduler
+        self.selector = selector
+        self.mixer = Mixer(block_size, knee)
+        self.played = 0
+        self.unknown = 0
+        self.latency = LatencyStats()
+        self.end_to_end = LatencyStats()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='sound-player', daemon=True)
+        self._thread.start()
+
+    def request(self, hook, received=None, sent=None):
+        """Queue a hook, returning whether it will play; received and sent are time.monotonic() stamps"""
+        if hook not in self.sounds:
+            self.unknown += 1
+            raise ValueError(f'unknown hook: {hook}')
+        received = received or time.monotonic()
+        with self._lock:
+            sound = self.sounds[hook]
+            if self.selector is not None and hook in self.selector.pools:
+                sound = self.selector.choose(hook)
+            voice = None
+            if self.scheduler is not None:
+                # The voice lasts as long as the variant that plays, not the canonical sound
+                voice = self.scheduler.submit(hook, received, len(sound.samples) / self.backend.sample_rate)
+                if voice is None:
+                    return False
+            self._pending += 1
+        self._queue.put((sound, voice, received, sent))
+        return True
+
+    def switch(self, sounds, pools=None):
+        """Replace the resident sounds (e.g. another suite) and their pools; sounds already playing finish"""
+        with self._lock:
+            self.sounds = sounds
+            if self.selector is not None:
+                self.selector.replace(pools or {})
+            if self.scheduler is not None:
+                self.scheduler.durations = {hook: len(s.samples) / self.backend.sample_rate
+                                            for hook, s in sounds.items()}
+
+    def _start(self, item):
+        sound, voice, received, sent = item
+        self.mixer.add(sound.samples, sound.gain, voice, (received, sent))
+        with self._lock:
+            self._pending -= 1
+
+    def _run(self):
+        block_seconds = self.mixer.block_size / self.backend.sample_rate
+        stream_start = streamed = None
+        while True:
+            if not self.mixer.active:
+                with self._idle:
+                    self._idle.notify_all()
+                stream_start = None
+                item = self._queue.get()
+                if item is None:
+                    break
+                self._start(item)
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    self._queue.put(None)
+                    break
+                self._start(item)
+
+            if self.scheduler is not None:
+                with self._lock:
+                    # Lifts the ducking of voices whose louder voice has ended
+                    self.scheduler.active()
+            block, started = self.mixer.render_block()
+            now = time.monotonic()
+            for received, sent in started:
+                self.latency.record(now - received)
+                if sent is not None:
+                    self.end_to_end.record(now - sent)
+            self.played += len(started)
+            self.backend.write(block)
+
+            if self.backend.realtime:
+                # Stay at most LOOKAHEAD ahead of the output so new sounds join quickly
+                if stream_start is None:
+                    stream_start, streamed = now, 0
+                streamed += 1
+                ahead = streamed * block_seconds - (time.monotonic() - stream_start)
+                if ahead > LOOKAHEAD:
+                    time.sleep(ahead - LOOKAHEAD)
+
+    def drain(self, timeout=None):
+        """Wait until every requested sound has been mixed to the end"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._pending and not self.mixer.active, timeout)
+
+    def stats(self):
+        stats = {
+            'played': self.played,
+            'unknown': self.unknown,
+            'frames': self.backend.frames,
+            'mixer': self.mixer.cpu_stats(),
+            'latency': self.latency.summary(),
+            'end_to_end': self.end_to_end.summary(),
+        }
+        if self.scheduler is not None:
+            stats['scheduler'] = dict(self.scheduler.counters)
+        if self.selector is not None:
+            stats['pools'] = self.selector.sizes()
+        return stats
+
+    def close(self):
+        """Finish the sounds already requested, then stop"""
+        self._queue.put(None)
+        self._thread.join()
+        self.backend.close()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            received = time.monotonic()
+            reply = self.server.dispatch(line.decode('utf-8', 'replace').split(), received)
+            self.wfile.write(reply.encode('utf-8') + b'\n')
+            if self.server.stopping:
+                break
+
+
+class SoundServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server answering play/stats/ping/shutdown requests for a Player
+
+    loader, if given, maps a suite name to its (sounds, variation pools) for
+    'switch SUITE'.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, player, loader=None):
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+        self.path = path
+        self.player = player
+        self.loader = loader
+        self.stopping = False
+
+    def dispatch(self, words, received):
+        """Run one request and return its reply line"""
+        if not words:
+            return 'error empty request'
+        command, args = words[0], words[1:]
+        if command == 'play' and args:
+            try:
+                sent = float(args[1]) if len(args) > 1 else None
+                playing = self.player.request(args[0], received, sent)
+            except ValueError as e:
+                return f'error {e}'
+            return 'ok' if playing else 'skipped'
+        if command == 'switch' and args and self.loader is not None:
+            try:
+                self.player.switch(*self.loader(args[0]))
+            except ValueError as e:
+                return f'error {e}'
+            return 'ok'
+        if command == 'stats':
+            return json.dumps(self.player.stats())
+        if command == 'ping':
+            return 'ok'
+        if command == 'shutdown':
+            self.stopping = True
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return 'ok'
+        return f'error unknown request: {" ".join(words)}'
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def _priorities(items):
+    priorities = {}
+    for item in items:
+        hook, _, value = item.partition('=')
+        try:
+            priorities[hook] = int(value)
+        except ValueError:
+            raise ValueError(f'bad --priority {item!r}, expected HOOK=N')
+    return priorities
+
+
+def _floats(sound):
+    """A sound's samples as -1.0..1.0 floats, applying its gain (bank sounds are raw 16-bit samples)"""
+    return sound.samples * sound.gain if sound.gain != 1.0 else sound.samples
+
+
+def _mix_offline(args, sounds, scheduler, selector):
+    events = [parse_event(text) for text in args.offline]
+    if selector is not None:
+        selector = Selector({hook: [_floats(s) for s in pool] for hook, pool in selector.pools.items()},
+                            selector.mode, args.seed)
+    samples, mixer = render_events(events, {hook: _floats(sound) for hook, sound in sounds.items()},
+                                   args.rate, scheduler, args.block_size, selector=selector)
+    save_wav(args.output, samples, args.rate)
+    cpu = mixer.cpu_stats()
+    block_us = args.block_size / args.rate * 1e6
+    print(f"✓ Mixed {len(events)} events into {args.output} ({len(samples) / args.rate:.2f}s)")
+    print(f"  {cpu['blocks']} blocks of {args.block_size}: mean {cpu['mean_us']:.1f}us, "
+          f"max {cpu['max_us']:.1f}us ({cpu['mean_us'] / block_us:.2%} of real time)")
+    print(f"  scheduler: {json.dumps(scheduler.counters)}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play hook sounds from a resident daemon')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--suite', metavar='DIR',
+                        help='directory holding the <hook>.wav files to preload, or with --bank the '
+                             'suite name (default: ., or the bank\'s "default" suite)')
+    source.add_argument('--theme', metavar='NAME', help='render a theme spec in memory instead of reading WAVs')
+    parser.add_argument('--bank', metavar='PATH', help='load suites from a sound bank (see pack_sounds.py)')
+    parser.add_argument('--socket', default=default_socket_path(), help='Unix socket path')
+    parser.add_argument('--backend', default='auto',
+                        help=f"audio output: auto, {', '.join(available_backends())} (default: auto)")
+    parser.add_argument('--output', metavar='PATH', help='WAV file written by the file backend')
+    parser.add_argument('--rate', type=int, default=DEFAULT_SAMPLE_RATE,
+                        help=f'output sample rate (default: {DEFAULT_SAMPLE_RATE})')
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW * 1000, metavar='MS',
+                        help=f'merge repeats of a hook within this many ms (default: {DEFAULT_WINDOW * 1000:g})')
+    parser.add_argument('--max-voices', type=int, default=DEFAULT_MAX_VOICES,
+                        help=f'most sounds playing at once (default: {DEFAULT_MAX_VOICES})')
+    parser.add_argument('--policy', choices=POLICIES, default='duck',
+                        help='what a higher-priority hook does to lower ones (default: duck)')
+    parser.add_argument('--duck-gain', type=float, default=DEFAULT_DUCK_GAIN,
+                        help=f'gain of ducked sounds (default: {DEFAULT_DUCK_GAIN})')
+    parser.add_argument('--priority', action='append', default=[], metavar='HOOK=N',
+                        help='override a hook\'s priority; higher wins (repeatable)')
+    parser.add_argument('--block-size', type=int, default=MIX_BLOCK_SIZE,
+                        help=f'mixer block size in samples (default: {MIX_BLOCK_SIZE})')
+    parser.add_argument('--select', choices=('none',) + SELECT_MODES, default='round-robin',
+                        help='how a variant is picked from a hook\'s variation pool; none plays only the '
+                             'canonical sound (default: round-robin)')
+    parser.add_argument('--seed', type=int, help='seed for --select random (default: unpredictable)')
+    parser.add_argument('--offline', nargs='+', metavar='SECONDS:HOOK',
+                        help='instead of serving, mix these hook events into the --output WAV and report '
+                             'the CPU time per block')
+    args = parser.parse_args(argv)
+    if args.offline and not args.output:
+        parser.error('--offline needs --output')
+    if args.bank and args.theme:
+        parser.error('--theme renders sounds itself; it cannot be combined with --bank')
+
+    loader = None
+    pools = {}
+    try:
+        start = time.perf_counter()
+        if args.bank:
+            bank = SoundBank(args.bank)
+            loader = functools.partial(_load_bank_suite, bank, args.rate, args.select != 'none')
+            sounds, pools = loader(args.suite or 'default')
+        elif args.theme:
+            sounds = load_theme(args.theme, args.rate)
+            if args.select != 'none':
+                pools = render_pools(args.theme, sounds, args.rate)
+        else:
+            sounds = load_suite(args.suite or '.', args.rate)
+            if args.select != 'none':
+                pools = load_pools(args.suite or '.', sounds, args.rate)
+        # Kept even without pools, so that switching to a suite with pools uses them
+        selector = Selector(pools, args.select, args.seed) if args.select != 'none' else None
+        durations = {hook: len(sound.samples) / args.rate for hook, sound in sounds.items()}
+        scheduler = Scheduler(durations, args.window / 1000, args.max_voices, args.policy, args.duck_gain,
+                              _priorities(args.priority))
+        if args.offline:
+            return _mix_offline(args, sounds, scheduler, selector)
+        backend = open_backend(args.backend, args.rate, args.output)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    player = Player(sounds, backend, scheduler, args.block_size, selector=selector)
+    variants = sum(len(pool) - 1 for pool in pools.values())
+    print(f"🔊 Loaded {len(sounds)} sounds" + (f" and {variants} variants" if variants else '') +
+          f" in {(time.perf_counter() - start) * 1000:.1f}ms ({type(backend).__name__}, {args.rate} Hz)")
+
+    server = SoundServer(args.socket, player, loader)
+    print(f"Listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        player.close()
+    print(json.dumps(player.stats(), indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
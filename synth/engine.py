@@ -0,0 +1,255 @@
+"""
+Render Engine
+Executes compiled render plans, one node operation per step
+
+Each node type a theme spec can use is listed in NODE_TYPES with its
+parameter defaults, required parameters and the kind of inputs it takes,
+and is implemented by one operation over whole buffers built from the
+synth primitives. A plan's steps are in dependency order, so execute()
+runs them front to back and drops every buffer after its last use.
+
+fuse() rewrites a plan so that chains of elementwise stages (gain,
+envelopes, decay, clamp, and the mix or sum feeding them) become a single
+'fused' step: a synth.stream pipeline written into one output buffer, so
+every stage is applied while a block is in cache. Buffers are only
+materialized at sources, stateful filters, timelines and the final output.
+The arithmetic per sample is unchanged, so fused and unfused plans render
+identical audio.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .additive import fm, partial_bank
+from .envelopes import adsr_curve, apply_envelope, decay_curve, fade_curve, falloff_curve, tremolo_curve
+from .filters import OnePole, bandpass, highpass, lowpass
+from .mixing import Timeline, concat, mix
+from .noise import flutter, white_noise
+from .oscillators import sine_wave
+from .profiling import current as _profiler
+from .reverb import reverb
+from .stream import buffer_blocks, clamp_blocks, collect, envelope_blocks, gain_blocks, mix_blocks, sum_blocks
+from .wavetable import Oscillator
+
+# params: defaults for optional parameters; required: parameters with no default;
+# inputs: None, 'input' (one node), 'inputs' (a list of nodes), 'parts' or 'tracks'
+NodeType = namedtuple('NodeType', ['params', 'required', 'inputs'])
+
+NODE_TYPES = {
+    # sources
+    'sine': NodeType({'amplitude': 0.5, 'ratio': 1.0}, ('frequency', 'duration'), None),
+    'oscillator': NodeType({'waveform': 'sine', 'amplitude': 0.5, 'frequency': None,
+                            'duration': None, 'notes': None}, (), None),
+    'partials': NodeType({'amplitude': 0.5, 'decays': None}, ('frequency', 'duration', 'ratios', 'weights'), None),
+    'fm': NodeType({'amplitude': 0.5, 'mod_hz': None, 'decays': None, 'index_decays': None},
+                   ('frequency', 'duration', 'ratios', 'weights', 'mod_ratios', 'indices'), None),
+    'noise': NodeType({'amplitude': 0.15}, ('duration',), None),
+    'flutter': NodeType({'low': 5.0, 'high': 15.0, 'amplitude': 0.1}, ('duration',), None),
+    # filters
+    'lowpass': NodeType({'cutoff_ratio': 0.1}, (), 'input'),
+    'filter': NodeType({'q': 0.7071}, ('mode', 'cutoff'), 'input'),
+    # envelopes and gain
+    'gain': NodeType({}, ('gain',), 'input'),
+    'clamp': NodeType({'limit': 1.0}, (), 'input'),
+    'fade': NodeType({'fade_in_ms': 50, 'fade_out_ms': 200, 'shape': 'linear'}, (), 'input'),
+    'decay': NodeType({'decay': 0.97, 'step': 100.0}, (), 'input'),
+    'adsr': NodeType({'attack_ms': 10, 'decay_ms': 50, 'sustain_level': 0.7, 'release_ms': 100}, (), 'input'),
+    'falloff': NodeType({'rate': 8.0}, (), 'input'),
+    'tremolo': NodeType({'offset': None}, ('rate', 'depth'), 'input'),
+    # space
+    'reverb': NodeType({'wet': 0.25, 'rt60': 1.2, 'damping': 0.3, 'predelay_ms': 10.0, 'tail': 0.0,
+                        'method': 'convolution'}, (), 'input'),
+    # combining
+    'mix': NodeType({}, (), 'inputs'),
+    'sum': NodeType({}, (), 'inputs'),
+    'concat': NodeType({}, (), 'inputs'),
+    'sequence': NodeType({}, (), 'parts'),
+    'timeline': NodeType({'ceiling': 1.0}, (), 'tracks'),
+}
+
+# Parameters that hold words rather than numbers
+STRING_PARAMS = frozenset({'waveform', 'shape', 'mode', 'method'})
+
+FILTER_MODES = {'lowpass': lowpass, 'highpass': highpass, 'bandpass': bandpass}
+
+# Gain curve of each envelope node for a buffer of n samples (cached in synth.envelopes)
+ENVELOPES = {
+    'fade': lambda p, n, sr: fade_curve(n, p['fade_in_ms'], p['fade_out_ms'], sr, p['shape']),
+    'decay': lambda p, n, sr: decay_curve(n, p['decay'], p['step']),
+    'adsr': lambda p, n, sr: adsr_curve(n, p['attack_ms'], p['decay_ms'], p['sustain_level'],
+                                        p['release_ms'], sr),
+    'falloff': lambda p, n, sr: falloff_curve(n, p['rate']),
+    'tremolo': lambda p, n, sr: tremolo_curve(n, p['rate'], p['depth'], p['offset'], sr),
+}
+
+# Operations computed sample by sample; the in-place ones transform a single input
+IN_PLACE = frozenset({'gain', 'clamp'}) | frozenset(ENVELOPES)
+ELEMENTWISE = IN_PLACE | {'mix', 'sum'}
+
+
+def _oscillator(p, inputs, sample_rate):
+    oscillator = Oscillator(p['waveform'], sample_rate)
+    if p['notes'] is not None:
+        return oscillator.render_notes(p['notes'], p['amplitude'])
+    return oscillator.render(p['frequency'], p['duration'], p['amplitude'])
+
+
+def _envelope(op):
+    return lambda p, inputs, sr: apply_envelope(inputs[0], ENVELOPES[op](p, len(inputs[0]), sr))
+
+
+def _sum(p, inputs, sample_rate):
+    total = inputs[0]
+    for samples in inputs[1:]:
+        total = total + samples
+    return total
+
+
+def _timeline(p, inputs, sample_rate):
+    timeline = Timeline(sample_rate)
+    for track in p['tracks']:
+        parts = [inputs[value] if kind == 'input' else value for kind, value in track['parts']]
+        timeline.sequence(*parts, at=track['at'], gain=track['gain'])
+    return timeline.render(p['ceiling'])
+
+
+def _stage_blocks(op, p, blocks, length, sample_rate):
+    """Apply an in-place stage to the block stream of a length-sample buffer"""
+    if op == 'gain':
+        return gain_blocks(blocks, p['gain'])
+    if op == 'clamp':
+        return clamp_blocks(blocks, p['limit'])
+    return envelope_blocks(blocks, ENVELOPES[op](p, length, sample_rate))
+
+
+def _fused(p, inputs, sample_rate):
+    """Run a chain of stages as one synth.stream pipeline written into a single output buffer"""
+    (op, params), stages = p['stages'][0], p['stages'][1:]
+    if op in ELEMENTWISE:
+        streams = [buffer_blocks(samples) for samples in inputs]
+        if op == 'mix':
+            blocks = mix_blocks(*streams)
+        elif op == 'sum':
+            blocks = sum_blocks(*streams)
+        else:
+            blocks = _stage_blocks(op, params, streams[0], len(inputs[0]), sample_rate)
+        out = np.empty(max(len(x) for x in inputs) if op == 'mix' else len(inputs[0]))
+    else:
+        out = OPS[op](params, inputs, sample_rate)
+        if not out.flags.writeable or any(np.may_share_memory(out, x) for x in inputs):
+            out = out.copy()
+        blocks = buffer_blocks(out)
+
+    for stage_op, stage_params in stages:
+        blocks = _stage_blocks(stage_op, stage_params, blocks, len(out), sample_rate)
+    return collect(blocks, out)
+
+
+OPS = {
+    'sine': lambda p, inputs, sr: sine_wave(p['frequency'] * p['ratio'], p['duration'], sr, p['amplitude']),
+    'oscillator': _oscillator,
+    'partials': lambda p, inputs, sr: partial_bank(p['frequency'], p['duration'], p['ratios'], p['weights'],
+                                                   sr, p['amplitude'], p['decays']),
+    'fm': lambda p, inputs, sr: fm(p['frequency'], p['duration'], p['ratios'], p['weights'], p['mod_ratios'],
+                                   p['indices'], sr, p['amplitude'], p['mod_hz'], p['decays'], p['index_decays']),
+    'noise': lambda p, inputs, sr: white_noise(p['duration'], sr, p['amplitude']),
+    'flutter': lambda p, inputs, sr: flutter(p['duration'], sr, p['amplitude'], p['low'], p['high']),
+    'lowpass': lambda p, inputs, sr: OnePole(p['cutoff_ratio']).process(inputs[0]),
+    'filter': lambda p, inputs, sr: FILTER_MODES[p['mode']](inputs[0], p['cutoff'], p['q'], sr),
+    'gain': lambda p, inputs, sr: apply_envelope(inputs[0], p['gain']),
+    'clamp': lambda p, inputs, sr: np.clip(inputs[0], -p['limit'], p['limit']),
+    'fade': _envelope('fade'),
+    'decay': _envelope('decay'),
+    'adsr': _envelope('adsr'),
+    'falloff': _envelope('falloff'),
+    'tremolo': _envelope('tremolo'),
+    'reverb': lambda p, inputs, sr: reverb(inputs[0], sr, p['wet'], p['rt60'], p['damping'], p['predelay_ms'],
+                                           p['tail'], p['method']),
+    'mix': lambda p, inputs, sr: mix(*inputs),
+    'sum': _sum,
+    'concat': lambda p, inputs, sr: concat(*inputs),
+    'timeline': _timeline,
+    'fused': _fused,
+}
+
+
+def fuse(plan):
+    """Merge each in-place stage into the step producing its input when nothing else reads that step"""
+    readers = [0] * len(plan.steps)
+    for step in plan.steps:
+        for source in step.inputs:
+            readers[source] += 1
+
+    steps = []
+    moved = {}
+    for index, step in enumerate(plan.steps):
+        if step.op in IN_PLACE and readers[step.inputs[0]] == 1:
+            target = moved[step.inputs[0]]
+            head = steps[target]
+            stages = head.params['stages'] if head.op == 'fused' else [[head.op, head.params]]
+            steps[target] = head._replace(op='fused', params={'stages': stages + [[step.op, step.params]]})
+            moved[index] = target
+        else:
+            steps.append(step._replace(inputs=tuple(moved[source] for source in step.inputs)))
+            moved[index] = len(steps) - 1
+    return plan._replace(steps=tuple(steps))
+
+
+def execute(plan, trace=None):
+    """Run a plan's steps in order and return the last step's buffer
+
+    If trace is a list, (step index, samples) is appended for every buffer
+    a step allocates. While a synth.profiling profiler is active each step
+    runs in a frame of its own.
+    """
+    profiler = _profiler()
+    last_use = {}
+    for index, step in enumerate(plan.steps):
+        for source in step.inputs:
+            last_use[source] = index
+
+    buffers = [None] * len(plan.steps)
+    for index, step in enumerate(plan.steps):
+        inputs = [buffers[source] for source in step.inputs]
+        if profiler is None:
+            buffers[index] = OPS[step.op](step.params, inputs, plan.sample_rate)
+        else:
+            buffers[index] = profiler.call(_label(step), OPS[step.op], step.params, inputs, plan.sample_rate)
+        if trace is not None:
+            trace.append((index, len(buffers[index])))
+        for source in step.inputs:
+            if last_use[source] == index:
+                buffers[source] = None
+    return buffers[-1]
+
+
+def _label(step):
+    """Short name of a step for profiles: its op, or its fused stages"""
+    if step.op != 'fused':
+        return step.op
+    return 'fused[' + '+'.join(op for op, _ in step.params['stages']) + ']'
+
+
+def _describe(step):
+    """One-line summary of a step: its operation chain and parameters"""
+    stages = step.params['stages'] if step.op == 'fused' else [[step.op, step.params]]
+    described = []
+    for op, params in stages:
+        shown = ', '.join(f'{k}={v}' for k, v in params.items() if k != 'tracks' and v is not None)
+        described.append(f'{op}({shown})')
+    return ' > '.join(described)
+
+
+def format_plan(plan, trace=None):
+    """Printable listing of a plan's steps, with the buffers each allocated when a trace is given"""
+    sizes = dict(trace or ())
+    lines = [f'{plan.theme}.{plan.hook} -> {plan.output} ({plan.sample_rate} Hz, {len(plan.steps)} steps)']
+    for index, step in enumerate(plan.steps):
+        inputs = ' '.join(f'#{source}' for source in step.inputs)
+        allocation = f'  [{sizes[index]} samples, {sizes[index] * 8 / 1024:.1f} KB]' if index in sizes else ''
+        lines.append(f'  #{index:<3d} {_describe(step)}' + (f' <- {inputs}' if inputs else '') + allocation)
+    if trace is not None:
+        total = sum(samples for _, samples in trace)
+        lines.append(f'  {len(trace)} buffers allocated, {total * 8 / 1024:.1f} KB')
+    return '\n'.join(lines)
@@ -0,0 +1,149 @@
+"""
+Envelopes
+Gain curves computed once, cached, and applied with a single vector multiply
+
+Curves are cached by (shape, length, sample_rate, parameters); every hook
+that fades or decays a buffer of the same length with the same settings
+reuses the same read-only array. The *_gain functions evaluate a curve at
+arbitrary sample indices for the block-streaming path.
+"""
+
+import functools
+
+import numpy as np
+
+
+def fade_lengths(fade_in_ms, fade_out_ms, sample_rate=44100):
+    """Convert fade times in milliseconds to sample counts"""
+    return int(sample_rate * fade_in_ms / 1000), int(sample_rate * fade_out_ms / 1000)
+
+
+def fade_gain(i, length, fade_in_samples, fade_out_samples, shape='linear'):
+    """Fade in/out gain at sample indices i of a buffer of the given length"""
+    gain = np.ones(len(i))
+    if fade_in_samples > 0:
+        ramp = np.minimum(i / fade_in_samples, 1.0)
+        if shape == 'equal_power':
+            ramp = np.sin(0.5 * np.pi * ramp)
+        gain = np.where(i < fade_in_samples, ramp, gain)
+    if fade_out_samples > 0:
+        start = length - fade_out_samples
+        ramp = np.clip(1.0 - (i - start) / fade_out_samples, 0.0, 1.0)
+        if shape == 'equal_power':
+            ramp = np.sin(0.5 * np.pi * ramp)
+        gain = np.where(i >= start, gain * ramp, gain)
+    return gain
+
+
+def decay_gain(i, decay=0.97, step=100.0):
+    """Exponential decay gain at sample indices i"""
+    return np.power(decay, i / step)
+
+
+def falloff_gain(i, length, rate=8.0):
+    """Exponential falloff gain exp(-rate * i / length) at sample indices i"""
+    return np.exp(-rate * i / length)
+
+
+def tremolo_gain(i, rate, depth, offset=None, sample_rate=44100):
+    """Sinusoidal gain offset + depth * sin(2 pi rate t); offset defaults to 1 - depth"""
+    if offset is None:
+        offset = 1.0 - depth
+    return offset + depth * np.sin(2 * np.pi * rate * i / sample_rate)
+
+
+def adsr_gain(i, length, attack, decay, sustain_level, release):
+    """ADSR gain at sample indices i; attack/decay/release are sample counts
+
+    Attack rises linearly to 1, decay falls linearly to sustain_level, which
+    holds until the release ramps linearly to 0 at the end of the buffer.
+    """
+    release_start = length - release
+    gain = np.full(len(i), float(sustain_level))
+    if decay > 0:
+        in_decay = (i >= attack) & (i < attack + decay)
+        gain = np.where(in_decay, 1.0 - (1.0 - sustain_level) * (i - attack) / decay, gain)
+    if attack > 0:
+        gain = np.where(i < attack, i / attack, gain)
+    if release > 0:
+        tail = np.clip(1.0 - (i - release_start) / release, 0.0, 1.0)
+        gain = np.where(i >= release_start, gain * tail, gain)
+    return gain
+
+
+_CURVES = {
+    'linear_fade': lambda i, n, p: fade_gain(i, n, p[0], p[1], 'linear'),
+    'equal_power_fade': lambda i, n, p: fade_gain(i, n, p[0], p[1], 'equal_power'),
+    'exp_decay': lambda i, n, p: decay_gain(i, p[0], p[1]),
+    'adsr': lambda i, n, p: adsr_gain(i, n, *p),
+    'falloff': lambda i, n, p: falloff_gain(i, n, p[0]),
+    'tremolo': lambda i, n, p: tremolo_gain(i, *p),
+}
+
+
+@functools.lru_cache(maxsize=256)
+def envelope_curve(shape, length, sample_rate=44100, params=()):
+    """Compute (or fetch from cache) a read-only gain curve of the given shape"""
+    i = np.arange(length, dtype=np.float64)
+    curve = _CURVES[shape](i, length, params)
+    curve.flags.writeable = False
+    return curve
+
+
+def fade_curve(length, fade_in_ms=50, fade_out_ms=200, sample_rate=44100, shape='linear'):
+    """Cached fade in/out curve; shape is 'linear' or 'equal_power'"""
+    params = fade_lengths(fade_in_ms, fade_out_ms, sample_rate)
+    return envelope_curve(shape + '_fade', length, sample_rate, params)
+
+
+def decay_curve(length, decay=0.97, step=100.0, sample_rate=44100):
+    """Cached exponential decay curve: gain = decay ** (i / step)"""
+    return envelope_curve('exp_decay', length, sample_rate, (decay, step))
+
+
+def adsr_curve(length, attack_ms=10, decay_ms=50, sustain_level=0.7, release_ms=100, sample_rate=44100):
+    """Cached ADSR curve spanning the whole buffer"""
+    attack, release = fade_lengths(attack_ms, release_ms, sample_rate)
+    decay = int(sample_rate * decay_ms / 1000)
+    return envelope_curve('adsr', length, sample_rate, (attack, decay, sustain_level, release))
+
+
+def falloff_curve(length, rate=8.0):
+    """Cached exponential falloff curve reaching exp(-rate) at the end of the buffer"""
+    return envelope_curve('falloff', length, params=(rate,))
+
+
+def tremolo_curve(length, rate, depth, offset=None, sample_rate=44100):
+    """Cached tremolo (slow sine LFO) gain curve"""
+    return envelope_curve('tremolo', length, sample_rate, (rate, depth, offset, sample_rate))
+
+
+def apply_envelope(samples, curve):
+    """Multiply a buffer by a gain curve of the same length"""
+    return np.asarray(samples, dtype=np.float64) * curve
+
+
+def apply_fade(samples, fade_in_ms=50, fade_out_ms=200, sample_rate=44100, shape='linear'):
+    """Apply fade in/out to prevent clicks"""
+    return apply_envelope(samples, fade_curve(len(samples), fade_in_ms, fade_out_ms, sample_rate, shape))
+
+
+def apply_decay(samples, decay=0.97, step=100.0):
+    """Apply exponential decay: gain = decay ** (i / step)"""
+    return apply_envelope(samples, decay_curve(len(samples), decay, step))
+
+
+def apply_adsr(samples, attack_ms=10, decay_ms=50, sustain_level=0.7, release_ms=100, sample_rate=44100):
+    """Shape a buffer with an ADSR envelope"""
+    curve = adsr_curve(len(samples), attack_ms, decay_ms, sustain_level, release_ms, sample_rate)
+    return apply_envelope(samples, curve)
+
+
+def apply_falloff(samples, rate=8.0):
+    """Shape a buffer with an exponential falloff from full level to exp(-rate)"""
+    return apply_envelope(samples, falloff_curve(len(samples), rate))
+
+
+def apply_tremolo(samples, rate, depth, offset=None, sample_rate=44100):
+    """Modulate a buffer's level with a slow sine LFO"""
+    return apply_envelope(samples, tremolo_curve(len(samples), rate, depth, offset, sample_rate))
@@ -0,0 +1,86 @@
+"""
+Export
+Write one float render to several sample rates and file formats
+
+An export target is a sample rate plus a format: 16-bit, 24-bit or 32-bit
+float WAV, or FLAC / Ogg Vorbis when the optional soundfile package is
+installed. A hook is rendered once at the theme's internal rate; each
+distinct target rate is produced from that buffer by the polyphase
+resampler, and each target is written straight to its final path. The
+first target is the suite's primary file (<output_dir>/<hook>.<ext>); any
+others go to a <rate>-<format> subdirectory next to it.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from .profiling import frame
+from .resample import resample
+from .wavio import SAMPLE_FORMATS, save_wav
+
+try:
+    import soundfile
+except ImportError:  # FLAC/Ogg export is optional
+    soundfile = None
+
+# soundfile (format, subtype) for the compressed formats
+COMPRESSED_FORMATS = {'flac': ('FLAC', 'PCM_16'), 'ogg': ('OGG', 'VORBIS')}
+
+EXTENSIONS = dict({name: '.wav' for name in SAMPLE_FORMATS}, flac='.flac', ogg='.ogg')
+
+Target = namedtuple('Target', ['sample_rate', 'format'])
+
+
+def parse_target(text):
+    """Parse RATE or RATE:FORMAT (e.g. '22050', '48000:float32', '44100:flac')"""
+    rate, _, fmt = text.partition(':')
+    fmt = fmt or 'pcm16'
+    try:
+        rate = int(rate)
+    except ValueError:
+        raise ValueError(f'bad sample rate in export target: {text}')
+    if rate <= 0:
+        raise ValueError(f'bad sample rate in export target: {text}')
+    if fmt not in EXTENSIONS:
+        raise ValueError(f"unknown export format {fmt!r} (choose from {', '.join(EXTENSIONS)})")
+    if fmt in COMPRESSED_FORMATS and soundfile is None:
+        raise ValueError(f'{fmt} export needs the soundfile package (pip install soundfile)')
+    return Target(rate, fmt)
+
+
+def target_path(output_dir, hook, target, primary=False):
+    """Where a hook's file for target is written"""
+    name = hook + EXTENSIONS[target.format]
+    if primary:
+        return os.path.join(output_dir, name)
+    return os.path.join(output_dir, f'{target.sample_rate}-{target.format}', name)
+
+
+def target_paths(output_dir, hook, targets):
+    """Paths of every file written for a hook, primary target first"""
+    return [target_path(output_dir, hook, target, i == 0) for i, target in enumerate(targets)]
+
+
+def write(path, samples, sample_rate, fmt='pcm16'):
+    """Write samples to path in one of the export formats"""
+    if fmt in COMPRESSED_FORMATS:
+        container, subtype = COMPRESSED_FORMATS[fmt]
+        soundfile.write(path, np.clip(samples, -1.0, 1.0), sample_rate, format=container, subtype=subtype)
+    else:
+        save_wav(path, samples, sample_rate, fmt)
+
+
+def export(samples, sample_rate, targets, output_dir, hook):
+    """Resample a render once per target rate and write every target, returning the paths"""
+    converted = {sample_rate: samples}
+    paths = target_paths(output_dir, hook, targets)
+    for target, path in zip(targets, paths):
+        if target.sample_rate not in converted:
+            with frame('resample'):
+                converted[target.sample_rate] = resample(samples, sample_rate, target.sample_rate)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with frame('write.' + target.format):
+            write(path, converted[target.sample_rate], target.sample_rate, target.format)
+    return paths
@@ -0,0 +1,181 @@
+"""
+Filters
+Recursive (IIR) filters that process whole blocks and carry state between them
+
+Every filter is a set of transfer-function coefficients run through
+scipy.signal.lfilter when SciPy is installed. Without SciPy the filter's
+impulse response is computed once, truncated below double precision, and
+applied with np.convolve, which gives the same output to within ~1e-12.
+Either way a filter object keeps its state, so feeding a signal block by
+block produces the same samples as filtering it in one call. A filter made
+with channels=N filters N signals at once, given as the rows of a 2-D block.
+"""
+
+import functools
+import math
+
+import numpy as np
+
+try:
+    from scipy.signal import lfilter as _lfilter
+except ImportError:  # SciPy is optional
+    _lfilter = None
+
+# Impulse responses longer than this are cut off in the NumPy fallback
+MAX_IMPULSE_LENGTH = 1 << 16
+
+
+@functools.lru_cache(maxsize=64)
+def _impulse_response(b, a):
+    """Impulse response of b/a, truncated once it has decayed below double precision"""
+    order = len(a) - 1
+    response = []
+    for n in range(MAX_IMPULSE_LENGTH):
+        value = b[n] if n < len(b) else 0.0
+        for k in range(1, min(n, order) + 1):
+            value -= a[k] * response[n - k]
+        response.append(value)
+        if n >= len(b) + order and all(abs(v) < 1e-16 for v in response[-order - 1:]):
+            break
+    return np.array(response)
+
+
+class IIRFilter:
+    """Linear recursive filter y = b/a applied block by block"""
+
+    def __init__(self, b, a, channels=None):
+        a0 = float(a[0])
+        self.b = tuple(float(c) / a0 for c in b)
+        self.a = tuple(float(c) / a0 for c in a)
+        self.channels = channels
+        self.reset()
+
+    def reset(self):
+        """Clear the filter state"""
+        rows = () if self.channels is None else (self.channels,)
+        if _lfilter is not None:
+            self._state = np.zeros(rows + (max(len(self.a), len(self.b)) - 1,))
+        else:
+            self._history = np.zeros(rows + (0,))
+
+    def process(self, block):
+        """Filter one block, continuing from the state left by the previous block"""
+        block = np.asarray(block, dtype=np.float64)
+        if _lfilter is not None:
+            filtered, self._state = _lfilter(self.b, self.a, block, axis=-1, zi=self._state)
+            return filtered
+
+        impulse = _impulse_response(self.b, self.a)
+        extended = np.concatenate([self._history, block], axis=-1)
+        start, stop = self._history.shape[-1], extended.shape[-1]
+        if extended.ndim == 1:
+            filtered = np.convolve(extended, impulse)[start:stop]
+        else:
+            filtered = np.stack([np.convolve(row, impulse)[start:stop] for row in extended])
+        self._history = extended[..., max(0, stop - (len(impulse) - 1)):]
+        return filtered
+
+
+class OnePole(IIRFilter):
+    """One-pole lowpass: y[n] = y[n-1] + cutoff_ratio * (x[n] - y[n-1])"""
+
+    def __init__(self, cutoff_ratio=0.1, channels=None):
+        self.cutoff_ratio = cutoff_ratio
+        super().__init__([cutoff_ratio], [1.0, cutoff_ratio - 1.0], channels)
+
+
+class Biquad(IIRFilter):
+    """Second-order section with RBJ cookbook low/high/band-pass designs"""
+
+    @staticmethod
+    def _design(cutoff, q, sample_rate):
+        w0 = 2 * math.pi * cutoff / sample_rate
+        return math.cos(w0), math.sin(w0) / (2 * q)
+
+    @classmethod
+    def lowpass(cls, cutoff, q=0.7071, sample_rate=44100):
+        cos_w0, alpha = cls._design(cutoff, q, sample_rate)
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+        return cls(b, [1 + alpha, -2 * cos_w0, 1 - alpha])
+
+    @classmethod
+    def highpass(cls, cutoff, q=0.7071, sample_rate=44100):
+        cos_w0, alpha = cls._design(cutoff, q, sample_rate)
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+        return cls(b, [1 + alpha, -2 * cos_w0, 1 - alpha])
+
+    @classmethod
+    def bandpass(cls, center, q=1.0, sample_rate=44100):
+        """Constant 0 dB peak gain band-pass"""
+        cos_w0, alpha = cls._design(center, q, sample_rate)
+        return cls([alpha, 0.0, -alpha], [1 + alpha, -2 * cos_w0, 1 - alpha])
+
+    @classmethod
+    def highshelf(cls, cutoff, gain_db, q=0.7071, sample_rate=44100):
+        """Boost (or cut) everything above cutoff by gain_db"""
+        cos_w0, alpha = cls._design(cutoff, q, sample_rate)
+        a = 10 ** (gain_db / 40)
+        root = 2 * math.sqrt(a) * alpha
+        b = [a * ((a + 1) + (a - 1) * cos_w0 + root),
+             -2 * a * ((a - 1) + (a + 1) * cos_w0),
+             a * ((a + 1) + (a - 1) * cos_w0 - root)]
+        return cls(b, [(a + 1) - (a - 1) * cos_w0 + root,
+                       2 * ((a - 1) - (a + 1) * cos_w0),
+                       (a + 1) - (a - 1) * cos_w0 - root])
+
+
+class StateVariable:
+    """Trapezoidal state-variable filter with simultaneous low/band/high outputs
+
+    The linear SVF is equivalent to a bilinear-transformed second-order
+    section, so each output runs as one IIR pass sharing the same poles.
+    """
+
+    MODES = ('lowpass', 'bandpass', 'highpass')
+
+    def __init__(self, cutoff, q=0.7071, sample_rate=44100):
+        g = math.tan(math.pi * cutoff / sample_rate)
+        k = 1.0 / q
+        a = [1 + k * g + g * g, 2 * (g * g - 1), 1 - k * g + g * g]
+        self.outputs = {
+            'lowpass': IIRFilter([g * g, 2 * g * g, g * g], a),
+            'bandpass': IIRFilter([g, 0.0, -g], a),
+            'highpass': IIRFilter([1.0, -2.0, 1.0], a),
+        }
+
+    def reset(self):
+        for output in self.outputs.values():
+            output.reset()
+
+    def process(self, block, mode='lowpass'):
+        """Filter one block, returning the output for mode"""
+        return self.outputs[mode].process(block)
+
+    def process_all(self, block):
+        """Filter one block, returning (lowpass, bandpass, highpass)"""
+        return tuple(self.outputs[mode].process(block) for mode in self.MODES)
+
+
+def one_pole_lowpass(samples, cutoff_ratio=0.1):
+    """One-pole lowpass of a whole buffer"""
+    samples = np.asarray(samples, dtype=np.float64)
+    if cutoff_ratio >= 1.0:
+        return samples.copy()
+    if cutoff_ratio <= 0.0:
+        return np.zeros_like(samples)
+    return OnePole(cutoff_ratio).process(samples)
+
+
+def lowpass(samples, cutoff, q=0.7071, sample_rate=44100):
+    """Biquad lowpass of a whole buffer"""
+    return Biquad.lowpass(cutoff, q, sample_rate).process(samples)
+
+
+def highpass(samples, cutoff, q=0.7071, sample_rate=44100):
+    """Biquad highpass of a whole buffer"""
+    return Biquad.highpass(cutoff, q, sample_rate).process(samples)
+
+
+def bandpass(samples, center, q=1.0, sample_rate=44100):
+    """Biquad band-pass of a whole buffer"""
+    return Biquad.bandpass(center, q, sample_rate).process(samples)
@@ -0,0 +1,201 @@
+"""
+Golden Files
+Regression check of every rendered hook against stored reference renders
+
+Every hook of every theme is rendered in memory with the fixed default
+seed (see synth.sounds) and compared with its reference in
+tests/golden/<theme>.npz, stored as float32. A hook passes when its length
+matches, no sample differs by more than the sample tolerance, the RMS of
+the difference stays below the reference's RMS by the given margin, and
+the magnitude spectrum agrees within each frequency band. Spectra are
+averaged Hann-windowed frames: the frames of every hook, rendered and
+reference, are transformed in a single batched FFT, and each band's
+distance is the RMS of the dB difference over its bins (ignoring bins far
+below the reference's loudest). A failure names the hook and the band that
+drifted most. --update re-renders the references after an intended change.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from . import sounds
+from .noise import DEFAULT_SEED
+from .spec import load_spec
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'golden')
+
+# Largest allowed difference of any sample (references are float32)
+SAMPLE_TOLERANCE = 1e-5
+
+# The difference must be at least this far below the reference's RMS, in dB
+RMS_TOLERANCE_DB = -80.0
+
+# Largest allowed RMS dB difference between spectra within a band
+SPECTRUM_TOLERANCE_DB = 0.5
+
+# Bins further than this below the reference's loudest bin are clamped to it
+SPECTRUM_RANGE_DB = 80.0
+
+FRAME_SIZE = 2048
+
+# Upper edges of the comparison bands in Hz; the last band runs to Nyquist
+BAND_EDGES = (125, 250, 500, 1000, 2000, 4000, 8000)
+
+# band is (low_hz, high_hz) of the band with the largest spectral distance
+Comparison = namedtuple('Comparison', ['theme', 'hook', 'max_error', 'rms_db', 'band', 'band_db', 'problem'])
+
+
+def reference_path(theme, directory=GOLDEN_DIR):
+    return os.path.join(directory, theme + '.npz')
+
+
+def render_theme(theme, seed=DEFAULT_SEED):
+    """{hook: samples} of every hook of a theme"""
+    return {hook: sounds.render_samples(theme, hook, seed) for hook in sounds.hooks(theme)}
+
+
+def save_references(theme, rendered, directory=GOLDEN_DIR):
+    """Store a theme's renders as its references"""
+    os.makedirs(directory, exist_ok=True)
+    np.savez_compressed(reference_path(theme, directory),
+                        **{hook: samples.astype(np.float32) for hook, samples in rendered.items()})
+
+
+def load_references(theme, directory=GOLDEN_DIR):
+    """{hook: samples} stored for a theme, empty when it has no references"""
+    try:
+        with np.load(reference_path(theme, directory)) as stored:
+            return {hook: stored[hook].astype(np.float64) for hook in stored.files}
+    except FileNotFoundError:
+        return {}
+
+
+def bands(sample_rate):
+    """(low, high) of every comparison band at a sample rate"""
+    edges = [0] + [edge for edge in BAND_EDGES if edge < sample_rate / 2] + [sample_rate // 2]
+    return list(zip(edges, edges[1:]))
+
+
+def _frames(samples):
+    padded = np.zeros(max(FRAME_SIZE, -(-len(samples) // FRAME_SIZE) * FRAME_SIZE) + FRAME_SIZE // 2)
+    padded[:len(samples)] = samples
+    return np.lib.stride_tricks.sliding_window_view(padded, FRAME_SIZE)[::FRAME_SIZE // 2]
+
+
+def spectra(signals):
+    """Averaged magnitude spectrum in dB of each signal, all frames in one FFT; shape (signals, bins)"""
+    frames = [_frames(signal) for signal in signals]
+    counts = np.array([len(f) for f in frames])
+    power = np.abs(np.fft.rfft(np.concatenate(frames) * np.hanning(FRAME_SIZE), axis=1)) ** 2
+    mean = np.add.reduceat(power, np.concatenate([[0], np.cumsum(counts)[:-1]]), axis=0) / counts[:, None]
+    return 10 * np.log10(np.maximum(mean, 1e-30))
+
+
+def band_distances(rendered_db, reference_db, sample_rate):
+    """RMS dB difference between two spectra within each band"""
+    floor = reference_db.max() - SPECTRUM_RANGE_DB
+    difference = np.maximum(rendered_db, floor) - np.maximum(reference_db, floor)
+    frequencies = np.fft.rfftfreq(FRAME_SIZE, 1 / sample_rate)
+    return [float(np.sqrt(np.mean(difference[(frequencies >= low) & (frequencies < high)] ** 2)))
+            for low, high in bands(sample_rate)]
+
+
+def _rms_db(difference, reference):
+    power = np.mean(reference ** 2)
+    error = np.mean(difference ** 2)
+    if error == 0:
+        return -np.inf
+    return 10 * np.log10(error / power) if power > 0 else np.inf
+
+
+def compare_theme(theme, rendered, references, sample_rate):
+    """Comparison of each rendered hook with its reference; problem is None when it passes"""
+    results = []
+    matched = [hook for hook in rendered if hook in references and len(rendered[hook]) == len(references[hook])]
+    computed = spectra([rendered[h] for h in matched] + [references[h] for h in matched]) if matched else None
+    for hook, samples in rendered.items():
+        if hook not in references:
+            results.append(Comparison(theme, hook, np.inf, np.inf, None, np.inf, 'no reference'))
+            continue
+        reference = references[hook]
+        if len(samples) != len(reference):
+            results.append(Comparison(theme, hook, np.inf, np.inf, None, np.inf,
+                                      f'length {len(samples)} != reference {len(reference)}'))
+            continue
+        difference = samples - reference
+        max_error = float(np.max(np.abs(difference))) if len(samples) else 0.0
+        rms_db = _rms_db(difference, reference)
+        index = matched.index(hook)
+        distances = band_distances(computed[index], computed[len(matched) + index], sample_rate)
+        worst = int(np.argmax(distances))
+        band, band_db = bands(sample_rate)[worst], distances[worst]
+
+        problem = None
+        if band_db > SPECTRUM_TOLERANCE_DB:
+            problem = f'spectrum drifted {band_db:.2f} dB in {band[0]}-{band[1]} Hz'
+        elif rms_db > RMS_TOLERANCE_DB:
+            problem = f'difference {rms_db:.1f} dB relative to the reference RMS'
+        elif max_error > SAMPLE_TOLERANCE:
+            problem = f'sample error {max_error:.2e}'
+        results.append(Comparison(theme, hook, max_error, rms_db, band, band_db, problem))
+    return results
+
+
+def check(themes=None, seed=DEFAULT_SEED, directory=GOLDEN_DIR):
+    """Render every hook of the given themes (default: all) and compare it with its reference"""
+    results = []
+    for theme in themes or sounds.themes():
+        sample_rate = load_spec(sounds.theme_path(theme))['sample_rate']
+        results += compare_theme(theme, render_theme(theme, seed), load_references(theme, directory), sample_rate)
+    return results
+
+
+def format_row(result):
+    """One line of a comparison report"""
+    name = f'{result.theme}.{result.hook}'
+    if result.band is None:
+        return f'✗ {name:32} {result.problem}'
+    line = (f'{"✗" if result.problem else "✓"} {name:32} max {result.max_error:8.1e}  '
+            f'rms {result.rms_db:7.1f} dB  worst band {result.band[0]}-{result.band[1]} Hz {result.band_db:5.2f} dB')
+    return line + (f'  - {result.problem}' if result.problem else '')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare every rendered hook with its golden reference')
+    parser.add_argument('--theme', action='append', dest='themes', metavar='NAME',
+                        help='only check this theme (repeatable)')
+    parser.add_argument('--update', action='store_true',
+                        help='re-render the references instead of comparing against them')
+    parser.add_argument('--dir', default=GOLDEN_DIR, help=f'reference directory (default: {GOLDEN_DIR})')
+    args = parser.parse_args(argv)
+
+    themes = args.themes or sounds.themes()
+    unknown = set(themes) - set(sounds.themes())
+    if unknown:
+        parser.error('unknown theme(s): ' + ', '.join(sorted(unknown)))
+
+    if args.update:
+        for theme in themes:
+            rendered = render_theme(theme)
+            save_references(theme, rendered, args.dir)
+            print(f"✓ Stored {len(rendered)} references in {reference_path(theme, args.dir)}")
+        return 0
+
+    start = time.perf_counter()
+    results = check(themes, directory=args.dir)
+    for result in results:
+        print(format_row(result))
+    failed = [r for r in results if r.problem]
+    print()
+    print(f"{'✗' if failed else '✓'} {len(results) - len(failed)}/{len(results)} hooks match their references "
+          f"({time.perf_counter() - start:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Mixing
+Combine buffers on a timeline, by summing or by concatenating
+
+A Timeline holds tracks placed at sample offsets with a per-track gain and
+renders them by summing into one preallocated buffer. Rendering can keep a
+headroom ceiling: if the summed peak would exceed it, the whole mix is
+scaled down instead of being clipped by the writer. add_into() and
+soft_clip() are the in-place building blocks, shared with the real-time
+block mixer in synth.mixer.
+"""
+
+import numbers
+
+import numpy as np
+
+
+class Timeline:
+    """Tracks placed at offsets with gain, summed into a single buffer"""
+
+    def __init__(self, sample_rate=44100):
+        self.sample_rate = sample_rate
+        self.tracks = []
+        self.length = 0
+
+    def offset(self, seconds):
+        """Sample offset for a time in seconds"""
+        return int(round(self.sample_rate * seconds))
+
+    def add(self, samples, at=0.0, gain=1.0):
+        """Place a buffer starting at `at` seconds"""
+        return self.add_at_sample(samples, self.offset(at), gain)
+
+    def add_at_sample(self, samples, offset, gain=1.0):
+        """Place a buffer starting at a sample offset"""
+        samples = np.asarray(samples, dtype=np.float64)
+        self.tracks.append((offset, samples, gain))
+        self.length = max(self.length, offset + len(samples))
+        return self
+
+    def sequence(self, *parts, at=None, gain=1.0):
+        """Place buffers one after another; numbers in parts are gaps in seconds
+
+        The sequence starts at `at` seconds, or at the current end of the
+        timeline when at is None.
+        """
+        position = self.length if at is None else self.offset(at)
+        for part in parts:
+            if isinstance(part, numbers.Number):
+                position += int(self.sample_rate * part)
+            else:
+                self.add_at_sample(part, position, gain)
+                position += len(part)
+        self.length = max(self.length, position)
+        return self
+
+    def render(self, ceiling=1.0):
+        """Sum every track; scale the mix down if its peak exceeds ceiling (None disables)"""
+        result = np.zeros(self.length)
+        for offset, samples, gain in self.tracks:
+            add_into(result[offset:offset + len(samples)], samples, gain)
+        if ceiling is not None and len(result):
+            peak = np.max(np.abs(result))
+            if peak > ceiling:
+                result *= ceiling / peak
+        return result
+
+
+def add_into(target, samples, gain=1.0, scratch=None):
+    """Add gain * samples into target in place; scratch (at least len(samples)) avoids a temporary"""
+    if gain == 1.0:
+        target += samples
+    elif scratch is None:
+        target += gain * samples
+    else:
+        scaled = scratch[:len(samples)]
+        np.multiply(samples, gain, out=scaled)
+        target += scaled
+
+
+def soft_clip(samples, knee=0.8, scratch=None, scratch2=None):
+    """Compress peaks above knee smoothly towards 1.0 (tanh), in place
+
+    Samples within +-knee are untouched. scratch and scratch2 are optional
+    float buffers of at least len(samples) that make the call allocation-free.
+    """
+    n = len(samples)
+    if not n or np.max(np.abs(samples)) <= knee:
+        return samples
+    excess = np.empty(n) if scratch is None else scratch[:n]
+    work = np.empty(n) if scratch2 is None else scratch2[:n]
+    room = 1.0 - knee
+    np.abs(samples, out=excess)
+    np.subtract(excess, knee, out=excess)
+    np.maximum(excess, 0.0, out=excess)
+    np.divide(excess, room, out=work)
+    np.tanh(work, out=work)
+    work *= room
+    excess -= work
+    np.sign(samples, out=work)
+    excess *= work
+    samples -= excess
+    return samples
+
+
+def mix(*tracks):
+    """Mix tracks together, scaling each by 1/len(tracks)"""
+    timeline = Timeline()
+    for track in tracks:
+        timeline.add_at_sample(track, 0, gain=1.0 / len(tracks))
+    return timeline.render(ceiling=None)
+
+
+def concat(*tracks):
+    """Concatenate tracks end to end"""
+    return np.concatenate([np.asarray(t, dtype=np.float64) for t in tracks])
@@ -0,0 +1,38 @@
+"""
+Oscillators
+Basic periodic waveforms rendered as whole buffers
+"""
+
+import numpy as np
+
+
+def sample_times(duration, sample_rate=44100):
+    """Return the sample index array for a buffer of the given duration"""
+    return np.arange(int(sample_rate * duration), dtype=np.float64)
+
+
+def silence(duration, sample_rate=44100):
+    """Generate a buffer of silence"""
+    return np.zeros(int(sample_rate * duration))
+
+
+def sine_wave(frequency, duration, sample_rate=44100, amplitude=0.5):
+    """Generate a sine wave at the specified frequency"""
+    i = sample_times(duration, sample_rate)
+    return amplitude * np.sin(2 * np.pi * frequency * i / sample_rate)
+
+
+def square_wave(frequency, duration, sample_rate=44100, amplitude=0.3):
+    """Generate a naive square wave from the sign of a sine"""
+    i = sample_times(duration, sample_rate)
+    phase = np.sin(2 * np.pi * frequency * i / sample_rate)
+    return np.where(phase > 0, amplitude, -amplitude)
+
+
+def partials(frequency, duration, ratios, weights, sample_rate=44100, amplitude=0.5):
+    """Sum of sines at frequency * ratio, each scaled by amplitude * weight"""
+    i = sample_times(duration, sample_rate)
+    total = np.zeros(len(i))
+    for ratio, weight in zip(ratios, weights):
+        total += amplitude * weight * np.sin(2 * np.pi * frequency * ratio * i / sample_rate)
+    return total
@@ -0,0 +1,56 @@
+"""
+Paths
+Where the suites, hooks and theme specs of the repository live
+
+Names shared by the build, the sound bank, the daemon and the quick player.
+Like synth.play, this module needs nothing but os, so light entry points
+can use it without pulling in NumPy or the synthesis modules.
+"""
+
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Suite name -> directory relative to the repository root
+SUITES = {
+    'default': '.',
+    'prompt3style': 'prompt3style',
+    'retro': 'retro-terminal',
+    'drift': 'drift',
+    'void': 'void',
+}
+
+# Hook files every suite provides, in the order the scripts render them
+HOOK_NAMES = (
+    'session_start',
+    'session_end',
+    'tool_start',
+    'tool_complete',
+    'prompt_submit',
+    'response_start',
+    'response_end',
+    'subagent_done',
+    'precompact_warning',
+    'notification',
+)
+
+# Subdirectory of a suite holding the variants of its hooks (see synth.variation)
+VARIATIONS_DIR = 'variations'
+
+# Directory holding theme specs, relative to the repository root
+SPEC_DIR = 'themes'
+
+SPEC_EXTENSIONS = ('.json', '.toml')
+
+THEMES_DIR = os.path.join(ROOT, SPEC_DIR)
+
+
+def theme_path(theme):
+    """Spec file of a theme given by name or path"""
+    if os.path.splitext(theme)[1] in SPEC_EXTENSIONS:
+        return os.path.abspath(theme)
+    for extension in SPEC_EXTENSIONS:
+        path = os.path.join(THEMES_DIR, theme + extension)
+        if os.path.exists(path):
+            return path
+    raise ValueError(f'no theme spec named {theme!r} in {THEMES_DIR}')
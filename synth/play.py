@@ -0,0 +1,156 @@
+"""
+Quick Player
+Plays a hook's pre-rendered WAV from a hook command with as little startup as possible
+
+Hook commands run on every tool call, so this entry point imports nothing
+beyond what the interpreter has already loaded (os and sys): no NumPy, no
+synthesis modules, not even argparse or subprocess, whose imports alone
+cost more than the rest of a run. It finds <suite>/<hook>.wav, or a copy
+rendered earlier into the per-user cache, and hands the file to the first
+available command-line player with posix_spawnp, without waiting for it -
+just like the "aplay file.wav &" it replaces. Only when neither file exists
+does it import synth.sounds, render the hook from its theme spec, and keep
+the WAV in the cache for next time, keyed by the spec's modification time
+and size so an edited spec is rendered afresh. synth.startup measures the
+cold start of this module against the player alone.
+"""
+
+import os
+import sys
+
+from .paths import ROOT, SUITES, theme_path
+
+# Players tried in order, each given the WAV path as its last argument
+PLAYERS = {
+    'afplay': ['afplay'],
+    'paplay': ['paplay'],
+    'pw-play': ['pw-play'],
+    'aplay': ['aplay', '-q'],
+}
+
+# Rate of sounds rendered on demand, matching the shipped suites
+RENDER_SAMPLE_RATE = 22050
+
+USAGE = f"usage: play_sound.py HOOK [SUITE] [--player {'|'.join(PLAYERS)}] [--dry-run] [--wait]"
+
+
+def cache_dir():
+    """Per-user directory for sounds rendered on demand"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'claude-sounds')
+
+
+def suite_dir(suite):
+    """Directory of a suite given by name or path"""
+    if suite in SUITES:
+        return os.path.join(ROOT, SUITES[suite])
+    return suite
+
+
+def render(theme, hook, path):
+    """Render a hook of a spec theme to path (this is the only place the synth stack is imported)"""
+    from . import sounds
+
+    data = sounds.render_wav(theme, hook, sample_rate=RENDER_SAMPLE_RATE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f'{path}.{os.getpid()}.tmp'
+    with open(partial, 'wb') as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def path_key(path):
+    """Stable 64-bit FNV-1a hash of a path, in hex (hashlib would cost more to import than a run)"""
+    key = 0xcbf29ce484222325
+    for byte in os.fsencode(path):
+        key = ((key ^ byte) * 0x100000001b3) & 0xffffffffffffffff
+    return f'{key:016x}'
+
+
+def find_sound(hook, suite='default'):
+    """Path of a hook's WAV, rendering it into the cache when no pre-rendered file exists
+
+    Cached renders are kept per resolved suite directory, and each is named
+    by its spec's modification time and size, so it is rendered again (and
+    the stale copy removed) once the spec changes.
+    """
+    path = os.path.join(suite_dir(suite), hook + '.wav')
+    if os.path.exists(path):
+        return path
+    try:
+        spec = theme_path(suite)
+        stat = os.stat(spec)
+    except (ValueError, FileNotFoundError) as e:
+        raise FileNotFoundError(f'no {path} and no way to render it: {e}') from None
+    resolved = os.path.realpath(suite_dir(suite))
+    directory = os.path.join(cache_dir(), f'{os.path.basename(resolved)}-{path_key(resolved)}')
+    name = f'{hook}.{stat.st_mtime_ns:x}-{stat.st_size:x}.wav'
+    cached = os.path.join(directory, name)
+    if os.path.exists(cached):
+        return cached
+    try:
+        render(spec, hook, cached)
+    except ValueError as e:
+        raise FileNotFoundError(f'no {path} and no way to render it: {e}') from None
+    for stale in os.listdir(directory):
+        if stale.startswith(hook + '.') and stale.endswith('.wav') and stale != name:
+            os.remove(os.path.join(directory, stale))
+    return cached
+
+
+def spawn(path, players=tuple(PLAYERS), wait=False):
+    """Start the first player that exists on path; returns (player, exit status if waited for)"""
+    for player in players:
+        try:
+            pid = os.posix_spawnp(PLAYERS[player][0], PLAYERS[player] + [path], os.environ)
+        except FileNotFoundError:
+            continue
+        return player, os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) if wait else None
+    raise FileNotFoundError('no audio player found (tried ' + ', '.join(players) + ')')
+
+
+def parse_args(argv):
+    """(hook, suite, player or None, dry_run, wait) from the command line
+
+    A hand-rolled parser: importing argparse would double the startup time.
+    """
+    positional, player, dry_run, wait = [], None, False, False
+    args = iter(argv)
+    for arg in args:
+        if arg == '--player':
+            player = next(args, None)
+            if player not in PLAYERS:
+                raise ValueError(f"--player must be one of {', '.join(PLAYERS)}")
+        elif arg == '--dry-run':
+            dry_run = True
+        elif arg == '--wait':
+            wait = True
+        elif arg.startswith('-') or len(positional) == 2:
+            raise ValueError(f'unexpected argument {arg!r}')
+        else:
+            positional.append(arg)
+    if not positional:
+        raise ValueError('missing HOOK')
+    return positional[0], positional[1] if len(positional) > 1 else 'default', player, dry_run, wait
+
+
+def main(argv=None):
+    try:
+        hook, suite, player, dry_run, wait = parse_args(sys.argv[1:] if argv is None else argv)
+    except ValueError as e:
+        print(f'{USAGE}\nplay_sound.py: error: {e}', file=sys.stderr)
+        return 2
+    try:
+        path = find_sound(hook, suite)
+        if dry_run:
+            print(path)
+            return 0
+        _, status = spawn(path, (player,) if player else tuple(PLAYERS), wait)
+    except OSError as e:
+        print(f'play_sound.py: {e}', file=sys.stderr)
+        return 1
+    return status or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
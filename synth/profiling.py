@@ -0,0 +1,152 @@
+"""
+Profiling
+Opt-in wall time, sample and output byte counts per render stage and per hook
+
+A Profiler keeps a stack of named frames - theme, hook, then the stages of
+a render (the engine's steps, loudness measurement, resampling, writing) -
+and records for every distinct stack how often it ran, its self time (wall
+time minus its children's), and the samples and bytes of the buffers
+counted against it. The engine counts each step's output buffer, so a
+step's bytes are the size of what it returned, not of every temporary it
+allocated on the way. Instrumented code calls frame() and count() at
+module level; with no profiler started, frame() hands back one shared null
+context and count() returns at once, and execute() checks for a profiler
+once per plan rather than once per step, so the disabled path costs
+nothing measurable. Results are written as collapsed stacks ("a;b;c
+microseconds" per line, the input format of flamegraph.pl, speedscope and
+inferno) and summarized per hook and per stage.
+"""
+
+import contextlib
+import time
+
+# Collapsed-stack file the build writes when --profile is given without a path
+DEFAULT_PATH = 'profile.folded'
+
+_active = None
+_NO_FRAME = contextlib.nullcontext()
+
+
+class Profiler:
+    """Per-stack call counts, self time, samples and bytes of a profiled run"""
+
+    def __init__(self):
+        # stack tuple -> [calls, self seconds, samples, bytes]
+        self.stats = {}
+        self._stack = []
+        self._children = [0.0]
+
+    def _entry(self, stack):
+        return self.stats.setdefault(stack, [0, 0.0, 0, 0])
+
+    @contextlib.contextmanager
+    def frame(self, name):
+        """Time a named frame nested in the current one"""
+        self._stack.append(name)
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self._entry(tuple(self._stack))
+            entry[0] += 1
+            entry[1] += elapsed - self._children.pop()
+            self._children[-1] += elapsed
+            self._stack.pop()
+
+    def count(self, samples, nbytes=0):
+        """Count samples and bytes against the current frame"""
+        entry = self._entry(tuple(self._stack))
+        entry[2] += samples
+        entry[3] += nbytes
+
+    def call(self, name, func, *args):
+        """Run func(*args) in a frame, counting the buffer it returns"""
+        with self.frame(name):
+            result = func(*args)
+            self.count(len(result), result.nbytes)
+        return result
+
+    def merge(self, stats):
+        """Add the stats of another profiler (e.g. one run in a worker process)"""
+        for stack, values in stats.items():
+            entry = self._entry(tuple(stack))
+            for i, value in enumerate(values):
+                entry[i] += value
+
+    def collapsed(self):
+        """Lines of the collapsed-stack format, self time in whole microseconds"""
+        return [f"{';'.join(stack)} {round(values[1] * 1e6)}"
+                for stack, values in sorted(self.stats.items()) if stack and round(values[1] * 1e6) > 0]
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            f.writelines(line + '\n' for line in self.collapsed())
+
+    def hooks(self):
+        """{(theme, hook): (seconds including every stage, samples)} for each profiled hook"""
+        totals = {}
+        for stack, (_, seconds, samples, _) in self.stats.items():
+            if len(stack) < 2:
+                continue
+            total = totals.setdefault(stack[:2], [0.0, 0])
+            total[0] += seconds
+            if len(stack) == 2:
+                total[1] += samples
+        return {key: tuple(value) for key, value in totals.items()}
+
+    def stages(self):
+        """{stage: [calls, self seconds, samples, bytes]} summed over every hook, slowest first"""
+        totals = {}
+        for stack, values in self.stats.items():
+            if len(stack) > 2:
+                entry = totals.setdefault(stack[-1], [0, 0.0, 0, 0])
+                for i, value in enumerate(values):
+                    entry[i] += value
+        return dict(sorted(totals.items(), key=lambda item: -item[1][1]))
+
+    def format_summary(self):
+        """Per-hook and per-stage tables"""
+        lines = [f"{'hook':40s} {'time':>10s} {'samples':>10s} {'samples/s':>11s}"]
+        for (theme, hook), (seconds, samples) in sorted(self.hooks().items(), key=lambda item: -item[1][0]):
+            rate = samples / seconds if seconds > 0 else 0.0
+            lines.append(f"{theme + '.' + hook:40s} {seconds * 1000:8.2f}ms {samples:10d} {rate:11.3e}")
+        total = sum(values[1] for values in self.stats.values()) or 1.0
+        lines.append('')
+        lines.append(f"{'stage':40s} {'calls':>6s} {'self time':>10s} {'share':>6s} {'samples':>10s} "
+                     f"{'output':>10s}")
+        for stage, (calls, seconds, samples, nbytes) in self.stages().items():
+            lines.append(f"{stage:40s} {calls:6d} {seconds * 1000:8.2f}ms {seconds / total:6.1%} {samples:10d} "
+                         f"{nbytes / 1024:8.0f}KB")
+        return '\n'.join(lines)
+
+
+def start():
+    """Make a new profiler the active one and return it"""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def stop():
+    """Deactivate and return the active profiler"""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def current():
+    """The active profiler, or None when profiling is off"""
+    return _active
+
+
+def frame(name):
+    """A frame of the active profiler, or a shared no-op context when profiling is off"""
+    return _NO_FRAME if _active is None else _active.frame(name)
+
+
+def count(samples, nbytes=0):
+    """Count samples and bytes against the active profiler's current frame, if any"""
+    if _active is not None:
+        _active.count(samples, nbytes)
@@ -0,0 +1,172 @@
+"""
+Reverb
+Rooms for the pads and drones: partitioned FFT convolution, or a feedback delay network
+
+A room's impulse response is generated from the noise and decay primitives:
+decaying noise that reaches -60 dB after rt60 seconds and darkens as it
+decays (damping blends in a lowpassed copy with a longer decay), after a
+short predelay. It is convolved in uniform partitions: the response is cut
+into block_size pieces whose spectra are computed once and cached, each
+input block is transformed once, and every output block is the inverse FFT
+of the input spectra delayed by k blocks times partition k, overlap-added.
+convolve() does this for a whole buffer in a few array operations;
+Convolver and convolve_blocks() do the same block by block for streams, with
+identical output. fdn() is the cheap algorithmic alternative: eight
+mutually prime delay lines fed back through a Householder matrix with a
+one-pole lowpass in each loop, computed a minimum-delay's worth of samples
+at a time.
+"""
+
+import functools
+import itertools
+import math
+
+import numpy as np
+
+from .envelopes import decay_curve
+from .filters import OnePole
+from .stream import rechunk
+
+# Samples per convolution partition
+PARTITION_SIZE = 1024
+
+METHODS = ('convolution', 'fdn')
+
+# Feedback delay network line lengths at 44.1 kHz (mutually prime)
+FDN_DELAYS = (1103, 1277, 1423, 1559, 1709, 1861, 2011, 2179)
+
+# Decay reaching -60 dB over rt60 seconds
+_SIXTY_DB = 0.001
+
+
+@functools.lru_cache(maxsize=16)
+def room_impulse(sample_rate=44100, rt60=1.2, damping=0.3, predelay_ms=10.0, seed=0):
+    """Impulse response of a generated room, scaled to unit energy (read-only)"""
+    length = int(rt60 * sample_rate)
+    predelay = int(sample_rate * predelay_ms / 1000)
+    noise = np.random.default_rng(seed).uniform(-1.0, 1.0, length)
+    bright = noise * decay_curve(length, _SIXTY_DB, rt60 * sample_rate * (1 - damping / 2))
+    dark = OnePole(0.1).process(noise) * decay_curve(length, _SIXTY_DB, rt60 * sample_rate)
+    response = np.concatenate([np.zeros(predelay), (1 - damping) * bright + damping * dark])
+    response /= math.sqrt(np.sum(response ** 2))
+    response.flags.writeable = False
+    return response
+
+
+def partition_spectra(response, block_size=PARTITION_SIZE):
+    """Spectra of an impulse response cut into block_size partitions, shape (partitions, block_size + 1)"""
+    partitions = -(-len(response) // block_size)
+    padded = np.zeros(partitions * block_size)
+    padded[:len(response)] = response
+    spectra = np.fft.rfft(padded.reshape(partitions, block_size), n=2 * block_size, axis=1)
+    spectra.flags.writeable = False
+    return spectra
+
+
+@functools.lru_cache(maxsize=16)
+def room_spectra(sample_rate=44100, rt60=1.2, damping=0.3, predelay_ms=10.0, block_size=PARTITION_SIZE):
+    """Cached partition spectra of room_impulse(), shared by every hook that uses the same room"""
+    return partition_spectra(room_impulse(sample_rate, rt60, damping, predelay_ms), block_size)
+
+
+def convolve(samples, spectra, length=None):
+    """Convolve a whole buffer with partitioned spectra; the result has length samples (default: the input's)"""
+    samples = np.asarray(samples, dtype=np.float64)
+    block_size = spectra.shape[1] - 1
+    length = len(samples) if length is None else length
+    blocks = -(-length // block_size)
+    padded = np.zeros(blocks * block_size)
+    used = min(len(samples), len(padded))
+    padded[:used] = samples[:used]
+    inputs = np.fft.rfft(padded.reshape(blocks, block_size), n=2 * block_size, axis=1)
+
+    outputs = np.zeros_like(inputs)
+    for k in range(min(len(spectra), blocks)):
+        outputs[k:] += spectra[k] * inputs[:blocks - k]
+    pieces = np.fft.irfft(outputs, n=2 * block_size, axis=1)
+
+    out = np.zeros((blocks + 1) * block_size)
+    out[:blocks * block_size] += pieces[:, :block_size].ravel()
+    out[block_size:] += pieces[:, block_size:].ravel()
+    return out[:length]
+
+
+class Convolver:
+    """Streaming uniform-partitioned convolution that carries its state between blocks
+
+    Feed blocks of exactly block_size samples (only the last may be shorter);
+    the output matches convolve() on the whole signal.
+    """
+
+    def __init__(self, spectra):
+        self.spectra = spectra
+        self.block_size = spectra.shape[1] - 1
+        self._inputs = np.zeros_like(spectra)
+        self._position = 0
+        self._overlap = np.zeros(self.block_size)
+
+    def process(self, block):
+        """Convolve the next block, returning as many samples as it holds"""
+        block = np.asarray(block, dtype=np.float64)
+        if len(block) > self.block_size:
+            raise ValueError(f'blocks must hold at most {self.block_size} samples, got {len(block)}')
+        partitions = len(self.spectra)
+        self._position = (self._position + 1) % partitions
+        self._inputs[self._position] = np.fft.rfft(block, n=2 * self.block_size)
+        order = (self._position - np.arange(partitions)) % partitions
+        piece = np.fft.irfft(np.einsum('kf,kf->f', self.spectra, self._inputs[order]), n=2 * self.block_size)
+        out = piece[:self.block_size] + self._overlap
+        self._overlap = piece[self.block_size:]
+        return out[:len(block)]
+
+
+def convolve_blocks(blocks, spectra, tail=0):
+    """Stream a signal through partitioned convolution, followed by tail samples of reverberation"""
+    convolver = Convolver(spectra)
+    for block in rechunk(itertools.chain(blocks, [np.zeros(tail)]), convolver.block_size):
+        yield convolver.process(block)
+
+
+def fdn(samples, sample_rate=44100, rt60=1.2, damping=0.3, length=None):
+    """Reverberation of a buffer from an eight-line feedback delay network, roughly unit energy gain"""
+    samples = np.asarray(samples, dtype=np.float64)
+    length = len(samples) if length is None else length
+    delays = np.array([max(1, round(d * sample_rate / 44100)) for d in FDN_DELAYS])
+    lines = len(delays)
+    gains = _SIXTY_DB ** (delays / (rt60 * sample_rate))
+    feedback = np.eye(lines) - 2.0 / lines
+    signs = np.where(np.arange(lines) % 2, -1.0, 1.0) / math.sqrt(lines)
+    absorber = OnePole(1.0 - 0.9 * damping, channels=lines)
+
+    longest = int(delays.max())
+    written = np.zeros((lines, longest + length))
+    source = np.zeros(length)
+    source[:min(len(samples), length)] = samples[:length]
+    out = np.zeros(length)
+    step = int(delays.min())
+    rows = np.arange(lines)[:, None]
+    for start in range(0, length, step):
+        stop = min(start + step, length)
+        # Every line's output in this span was written at least one delay earlier
+        taps = written[rows, longest + start - delays[:, None] + np.arange(stop - start)]
+        out[start:stop] = signs @ taps
+        written[:, longest + start:longest + stop] = (source[start:stop]
+                                                      + gains[:, None] * (feedback @ absorber.process(taps)))
+    return out * math.sqrt(1.0 - np.mean(gains) ** 2)
+
+
+def reverb(samples, sample_rate=44100, wet=0.25, rt60=1.2, damping=0.3, predelay_ms=10.0, tail=0.0,
+           method='convolution'):
+    """Blend a buffer with its reverberation in a generated room, extended by tail seconds"""
+    if method not in METHODS:
+        raise ValueError(f"unknown reverb method {method!r} (choose from {', '.join(METHODS)})")
+    samples = np.asarray(samples, dtype=np.float64)
+    length = len(samples) + int(tail * sample_rate)
+    if method == 'convolution':
+        room = convolve(samples, room_spectra(sample_rate, rt60, damping, predelay_ms), length)
+    else:
+        predelay = int(sample_rate * predelay_ms / 1000)
+        room = np.concatenate([np.zeros(predelay), fdn(samples, sample_rate, rt60, damping, length)])[:length]
+    out = wet * room
+    out[:len(samples)] += (1 - wet) * samples
+    return out
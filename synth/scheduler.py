@@ -0,0 +1,138 @@
+"""
+Hook Scheduler
+Coalescing, voice limits and priorities in front of playback
+
+Bursty hooks - an agent firing tools back to back - would otherwise stack
+up one voice per event. The scheduler decides, for each requested hook,
+whether it plays, and at what gain:
+
+- a repeat of a hook less than `window` seconds after it last started is
+  merged into that voice, as long as it is still sounding;
+- at most `max_voices` voices sound at once; when full, the lowest-priority
+  oldest voice is evicted for a more important hook, or the new hook is
+  dropped;
+- with policy 'duck', a voice sounds at `duck_gain` while a
+  higher-priority one is active, and back at full gain once none is; with
+  'drop', lower-priority voices are cut (and new ones refused) instead;
+  with 'none', priorities only decide evictions.
+
+Every outcome is counted so the settings can be tuned under real load.
+The clock is injectable so behaviour is deterministic in tests and in the
+offline mixer.
+"""
+
+import time
+
+DEFAULT_WINDOW = 0.15
+DEFAULT_MAX_VOICES = 4
+DEFAULT_DUCK_GAIN = 0.3
+
+POLICIES = ('none', 'duck', 'drop')
+
+# Higher numbers win; tool chatter is the least important
+PRIORITIES = {
+    'tool_start': 0,
+    'tool_complete': 0,
+    'prompt_submit': 1,
+    'response_start': 1,
+    'response_end': 1,
+    'subagent_done': 1,
+    'session_start': 2,
+    'session_end': 2,
+    'notification': 3,
+    'precompact_warning': 3,
+}
+
+
+class Voice:
+    """One scheduled sound: its time span, priority and current gain"""
+
+    def __init__(self, hook, start, duration, priority, gain=1.0):
+        self.hook = hook
+        self.start = start
+        self.end = start + duration
+        self.priority = priority
+        self.gain = gain
+        self.cancelled = False
+
+    def __repr__(self):
+        return f'Voice({self.hook!r}, start={self.start:.3f}, gain={self.gain:g})'
+
+
+class Scheduler:
+    """Decides which requested hooks become voices; durations maps hook -> seconds"""
+
+    def __init__(self, durations, window=DEFAULT_WINDOW, max_voices=DEFAULT_MAX_VOICES, policy='duck',
+                 duck_gain=DEFAULT_DUCK_GAIN, priorities=None, clock=time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy {policy!r} (choose from {', '.join(POLICIES)})")
+        if max_voices < 1:
+            raise ValueError('max_voices must be at least 1')
+        self.durations = durations
+        self.window = window
+        self.max_voices = max_voices
+        self.policy = policy
+        self.duck_gain = duck_gain
+        self.priorities = dict(PRIORITIES, **(priorities or {}))
+        self.clock = clock
+        self.voices = []
+        self.counters = dict.fromkeys(('requested', 'scheduled', 'merged', 'dropped', 'evicted', 'ducked'), 0)
+
+    def active(self, now=None):
+        """Voices still sounding at now"""
+        now = self.clock() if now is None else now
+        self.voices = [v for v in self.voices if v.end > now and not v.cancelled]
+        if self.policy == 'duck':
+            self._duck()
+        return self.voices
+
+    def submit(self, hook, now=None, duration=None):
+        """Schedule a request for hook; returns the new Voice, or None if it was merged or dropped
+
+        duration is the length in seconds of the sound that will play (e.g. a
+        variant of the hook); it defaults to durations[hook].
+        """
+        now = self.clock() if now is None else now
+        self.counters['requested'] += 1
+        active = self.active(now)
+        priority = self.priorities.get(hook, 0)
+
+        if any(v.hook == hook and now - v.start < self.window for v in active):
+            self.counters['merged'] += 1
+            return None
+
+        louder = any(v.priority > priority for v in active)
+        if louder and self.policy == 'drop':
+            self.counters['dropped'] += 1
+            return None
+
+        if len(active) >= self.max_voices:
+            victim = min(active, key=lambda v: (v.priority, v.start))
+            if victim.priority >= priority:
+                self.counters['dropped'] += 1
+                return None
+            self._cancel(victim, 'evicted')
+
+        if self.policy == 'drop':
+            for other in [v for v in self.active(now) if v.priority < priority]:
+                self._cancel(other, 'dropped')
+        voice = Voice(hook, now, self.durations[hook] if duration is None else duration, priority)
+        self.voices.append(voice)
+        if self.policy == 'duck':
+            self._duck()
+        self.counters['scheduled'] += 1
+        return voice
+
+    def _duck(self):
+        """Set each voice's gain from whether a higher-priority voice is sounding"""
+        top = max((v.priority for v in self.voices), default=0)
+        for voice in self.voices:
+            gain = self.duck_gain if voice.priority < top else 1.0
+            if gain < voice.gain:
+                self.counters['ducked'] += 1
+            voice.gain = gain
+
+    def _cancel(self, voice, counter):
+        voice.cancelled = True
+        self.voices.remove(voice)
+        self.counters[counter] += 1
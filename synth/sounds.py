@@ -0,0 +1,59 @@
+"""
+Sound API
+Render hook sounds in memory for embedding in a long-running process
+
+A theme is named like its spec file in themes/ ('void', 'drift', ...) or
+given as a path to a spec. Every call renders from the theme's compiled,
+fused plan (cached after the first use) with the same per-hook noise seed
+as the build, and returns float samples, raw PCM bytes or a complete WAV
+file - nothing is written to disk or printed. The build and the
+generate_*_sounds.py scripts write these same renders to files.
+"""
+
+import functools
+import os
+
+from .engine import execute, fuse
+from .noise import DEFAULT_SEED, seed_noise
+from .paths import SPEC_EXTENSIONS, THEMES_DIR, theme_path
+from .resample import resample
+from .spec import compile_hook, load_spec
+from .wavio import to_pcm, wav_bytes
+
+
+def themes():
+    """Names of the themes in the themes directory"""
+    names = {os.path.splitext(f)[0] for f in os.listdir(THEMES_DIR) if f.endswith(SPEC_EXTENSIONS)}
+    return sorted(names)
+
+
+def hooks(theme):
+    """Hooks a theme defines"""
+    return tuple(load_spec(theme_path(theme))['hooks'])
+
+
+@functools.lru_cache(maxsize=128)
+def _plan(path, hook):
+    return fuse(compile_hook(load_spec(path), hook))
+
+
+def render_samples(theme, hook, seed=DEFAULT_SEED, sample_rate=None):
+    """Float samples of a hook, at the theme's own sample rate unless one is given"""
+    plan = _plan(theme_path(theme), hook)
+    seed_noise(seed, plan.noise_key, hook)
+    samples = execute(plan)
+    if sample_rate and sample_rate != plan.sample_rate:
+        return resample(samples, plan.sample_rate, sample_rate)
+    return samples
+
+
+def render_pcm(theme, hook, seed=DEFAULT_SEED, sample_rate=None, sample_format='pcm16'):
+    """Raw mono little-endian sample bytes of a hook, as a memoryview"""
+    return to_pcm(render_samples(theme, hook, seed, sample_rate), sample_format)
+
+
+def render_wav(theme, hook, seed=DEFAULT_SEED, sample_rate=None, sample_format='pcm16'):
+    """A complete mono WAV file of a hook, as bytes"""
+    plan = _plan(theme_path(theme), hook)
+    samples = render_samples(theme, hook, seed, sample_rate)
+    return wav_bytes(samples, sample_rate or plan.sample_rate, sample_format)
@@ -0,0 +1,234 @@
+"""
+Theme Specs
+Declarative theme files compiled into render plans for the engine
+
+A spec (JSON, or TOML where tomllib is available) names a suite's output
+directory and describes each hook as a graph of nodes - oscillators, noise,
+filters, envelopes, mixes and sequences - whose numeric parameters may name
+the spec's constants. Voices are reusable sub-graphs with their own
+parameters, and per-node-type defaults set the theme's house style.
+compile_hook() expands voices, fills defaults, resolves names and flattens
+a hook's graph into a plan of steps; synth.engine fuses its elementwise
+chains and executes it. An optional "export" list of RATE[:FORMAT] targets
+sets the rates and formats the build writes (see synth.export). Noise is
+seeded per hook from the theme's "noise_key", which defaults to its name;
+the shipped themes keep the names of the scripts they replaced, so they
+render the same noise as before.
+"""
+
+import functools
+import json
+import numbers
+import os
+from collections import namedtuple
+
+from .engine import NODE_TYPES, STRING_PARAMS, execute, format_plan, fuse
+from .export import Target, parse_target
+from .noise import DEFAULT_SEED, seed_noise
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON specs only
+    tomllib = None
+
+# Voices may use other voices, but not this deeply (catches recursive voices)
+MAX_VOICE_DEPTH = 32
+
+# Keys of a node that hold its input nodes rather than parameters
+_INPUT_KEYS = ('input', 'inputs', 'parts', 'tracks')
+
+Step = namedtuple('Step', ['op', 'params', 'inputs'])
+# noise_key selects the hook's noise stream (see synth.noise.seed_noise)
+Plan = namedtuple('Plan', ['theme', 'hook', 'sample_rate', 'steps', 'output', 'message', 'noise_key'],
+                  defaults=(None,))
+
+
+@functools.lru_cache(maxsize=32)
+def load_spec(path):
+    """Read and check a theme spec; the theme name defaults to the file name"""
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError(f'{path}: TOML specs need Python 3.11+ (tomllib)')
+        with open(path, 'rb') as f:
+            spec = tomllib.load(f)
+    else:
+        with open(path) as f:
+            spec = json.load(f)
+
+    spec.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    spec.setdefault('noise_key', spec['name'])
+    for key in ('output_dir', 'hooks'):
+        if key not in spec:
+            raise ValueError(f'{path}: missing "{key}"')
+    spec.setdefault('sample_rate', 44100)
+    for key in ('constants', 'defaults', 'voices'):
+        spec.setdefault(key, {})
+    try:
+        spec['export'] = [parse_target(str(t)) for t in spec.get('export', ())]
+    except ValueError as e:
+        raise ValueError(f'{path}: {e}')
+    for kind in spec['defaults']:
+        if kind not in NODE_TYPES:
+            raise ValueError(f'{path}: defaults for unknown node type {kind!r}')
+    for name in spec['voices']:
+        if name in NODE_TYPES:
+            raise ValueError(f'{path}: voice {name!r} shadows a node type')
+    return spec
+
+
+class _Compiler:
+    """Flattens one hook's node graph into plan steps"""
+
+    def __init__(self, spec, hook, overrides=None):
+        self.spec = spec
+        self.where = f"{spec['name']}.{hook}"
+        self.constants = dict(spec['constants'])
+        for name, value in (overrides or {}).items():
+            if name not in self.constants:
+                raise self.error(f'cannot override unknown constant {name!r}')
+            self.constants[name] = value
+        self.steps = []
+
+    def error(self, message):
+        return ValueError(f'{self.where}: {message}')
+
+    def resolve(self, value, scope):
+        """Replace names (strings) in a parameter value with the numbers they stand for"""
+        if isinstance(value, str) and value in scope:
+            return scope[value]
+        if isinstance(value, list):
+            return [self.resolve(v, scope) for v in value]
+        return value
+
+    def node(self, node, scope, depth=0):
+        """Compile a node and everything it depends on; return its step index"""
+        if isinstance(node, numbers.Number) or not isinstance(node, dict) or 'type' not in node:
+            raise self.error(f'expected a node with a "type", got {node!r}')
+        kind = node['type']
+        args = {k: self.resolve(v, scope) for k, v in node.items() if k != 'type' and k not in _INPUT_KEYS}
+        if kind in self.spec['voices']:
+            return self.voice(kind, node, args, depth)
+        if kind not in NODE_TYPES:
+            raise self.error(f'unknown node type {kind!r}')
+
+        node_type = NODE_TYPES[kind]
+        params = dict(node_type.params)
+        defaults = self.spec['defaults'].get(kind, {})
+        params.update({k: self.resolve(v, self.constants) for k, v in defaults.items()})
+        params.update(args)
+        self.check_params(kind, node_type, params)
+
+        if node_type.inputs == 'input':
+            if 'input' not in node:
+                raise self.error(f'{kind} needs an "input" node')
+            inputs = [self.node(node['input'], scope, depth)]
+        elif node_type.inputs == 'inputs':
+            if not node.get('inputs'):
+                raise self.error(f'{kind} needs a non-empty "inputs" list')
+            inputs = [self.node(n, scope, depth) for n in node['inputs']]
+        elif node_type.inputs == 'parts':
+            inputs = []
+            track = self.track({'parts': node.get('parts', [])}, scope, depth, inputs)
+            return self.add('timeline', {'ceiling': 1.0, 'tracks': [track]}, inputs)
+        elif node_type.inputs == 'tracks':
+            inputs = []
+            params['tracks'] = [self.track(t, scope, depth, inputs) for t in node.get('tracks', [])]
+        else:
+            inputs = []
+        return self.add(kind, params, inputs)
+
+    def check_params(self, kind, node_type, params):
+        known = set(node_type.params) | set(node_type.required)
+        unknown = sorted(set(params) - known)
+        if unknown:
+            raise self.error(f'{kind} has no parameter(s) {", ".join(unknown)}')
+        missing = [name for name in node_type.required if name not in params]
+        if missing:
+            raise self.error(f'{kind} needs {", ".join(missing)}')
+        for name, value in params.items():
+            if name not in STRING_PARAMS and _has_string(value):
+                raise self.error(f'{kind}.{name}: unknown name in {value!r}')
+
+    def track(self, track, scope, depth, inputs):
+        """Compile a timeline track: a sequence of nodes and gaps (seconds)"""
+        if 'input' in track:
+            parts = [track['input']]
+        else:
+            parts = track.get('sequence', track.get('parts', []))
+        compiled = []
+        for part in parts:
+            part = self.resolve(part, scope)
+            if isinstance(part, numbers.Number):
+                compiled.append(['gap', part])
+            else:
+                inputs.append(self.node(part, scope, depth))
+                compiled.append(['input', len(inputs) - 1])
+        at = self.resolve(track.get('at', 'end'), scope)
+        return {
+            'at': None if at == 'end' else at,
+            'gain': self.resolve(track.get('gain', 1.0), scope),
+            'parts': compiled,
+        }
+
+    def voice(self, name, node, args, depth):
+        """Expand a voice: compile its graph with the call's arguments in scope"""
+        if depth >= MAX_VOICE_DEPTH:
+            raise self.error(f'voice {name!r} nests more than {MAX_VOICE_DEPTH} deep')
+        voice = self.spec['voices'][name]
+        accepted = set(voice.get('params', {})) | set(voice.get('required', ()))
+        unknown = sorted(set(args) - accepted)
+        if unknown:
+            raise self.error(f'voice {name!r} has no parameter(s) {", ".join(unknown)}')
+        missing = [p for p in voice.get('required', ()) if p not in args]
+        if missing:
+            raise self.error(f'voice {name!r} needs {", ".join(missing)}')
+        scope = dict(self.constants)
+        scope.update({k: self.resolve(v, self.constants) for k, v in voice.get('params', {}).items()})
+        scope.update(args)
+        return self.node(voice['graph'], scope, depth + 1)
+
+    def add(self, op, params, inputs):
+        self.steps.append(Step(op, params, tuple(inputs)))
+        return len(self.steps) - 1
+
+
+def _has_string(value):
+    if isinstance(value, str):
+        return True
+    if isinstance(value, (list, tuple)):
+        return any(_has_string(v) for v in value)
+    return False
+
+
+def compile_hook(spec, hook, overrides=None):
+    """Compile one hook of a loaded spec into a render plan; overrides replaces constant values"""
+    if hook not in spec['hooks']:
+        raise ValueError(f"{spec['name']}: no hook {hook!r}")
+    entry = spec['hooks'][hook]
+    compiler = _Compiler(spec, hook, overrides)
+    compiler.node(entry.get('graph'), compiler.constants)
+    output = os.path.join(spec['output_dir'], hook + '.wav')
+    return Plan(spec['name'], hook, spec['sample_rate'], tuple(compiler.steps), output, entry.get('message'),
+                spec.get('noise_key', spec['name']))
+
+
+def render(spec, hook):
+    """Compile and execute a hook, returning its samples"""
+    return execute(fuse(compile_hook(spec, hook)))
+
+
+def default_targets(spec):
+    """Export targets used when none are given: the spec's own, else 16-bit WAV at its sample rate"""
+    return spec['export'] or [Target(spec['sample_rate'], 'pcm16')]
+
+
+def explain_hook(spec, hook, seed=DEFAULT_SEED):
+    """Print-ready listing of a hook's plan before and after fusion, with the buffers each allocates"""
+    plan = compile_hook(spec, hook)
+    listings = []
+    for title, candidate in (('compiled', plan), ('fused', fuse(plan))):
+        trace = []
+        seed_noise(seed, plan.noise_key, hook)
+        execute(candidate, trace)
+        listings.append(f'{title}: ' + format_plan(candidate, trace))
+    return '\n\n'.join(listings)
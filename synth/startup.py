@@ -0,0 +1,87 @@
+"""
+Startup
+Cold-start cost of the quick hook player against running the audio player alone
+
+Each command is run as a fresh process several times and its best and
+median wall time reported: an empty interpreter, play_sound.py resolving
+a hook without playing it, and - when a command-line player is installed -
+the player on the hook's WAV next to play_sound.py playing the same file
+to completion. The import breakdown comes from python -X importtime, with
+every module play_sound.py imports listed by cumulative time.
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from .paths import ROOT
+from .play import PLAYERS, find_sound
+
+SCRIPT = os.path.join(ROOT, 'play_sound.py')
+DEFAULT_RUNS = 20
+
+
+def cold_start(command, runs=DEFAULT_RUNS):
+    """Wall time in seconds of each of runs fresh executions of a command"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def parse_importtime(text):
+    """(module, self µs, cumulative µs, depth) for each line of python -X importtime output"""
+    imports = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(own), int(cumulative), (len(name) - len(name.lstrip()) - 1) // 2))
+    return imports
+
+
+def import_times(command):
+    """parse_importtime() of a Python command run with -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + command, capture_output=True, text=True)
+    return parse_importtime(result.stderr)
+
+
+def commands(hook, suite='default', player=None):
+    """{label: command} to compare; the player is the first one installed unless given"""
+    if player is None:
+        player = next((name for name in PLAYERS if shutil.which(PLAYERS[name][0])), None)
+    compared = {
+        'python -c pass': [sys.executable, '-c', 'pass'],
+        'play_sound.py --dry-run': [sys.executable, SCRIPT, hook, suite, '--dry-run'],
+    }
+    if player is not None:
+        compared[f'{player} (alone)'] = PLAYERS[player] + [find_sound(hook, suite)]
+        compared[f'play_sound.py --wait ({player})'] = [sys.executable, SCRIPT, hook, suite, '--player', player,
+                                                        '--wait']
+    return compared
+
+
+def report(hook='tool_complete', suite='default', player=None, runs=DEFAULT_RUNS):
+    """Printable cold-start table and import breakdown"""
+    lines = [f"{'command':40s} {'best':>9s} {'median':>9s}"]
+    for label, command in commands(hook, suite, player).items():
+        times = cold_start(command, runs)
+        lines.append(f"{label:40s} {min(times) * 1000:7.1f}ms {statistics.median(times) * 1000:7.1f}ms")
+    if len(lines) == 3:
+        lines.append('(no command-line audio player installed; ' + ', '.join(PLAYERS) + ' were tried)')
+
+    imports = import_times([SCRIPT, hook, suite, '--dry-run'])
+    lines.append('')
+    lines.append(f"{'module imported by play_sound.py':40s} {'self':>9s} {'cumulative':>11s}")
+    for name, own, cumulative, depth in sorted(imports, key=lambda item: -item[2])[:12]:
+        lines.append(f"{'  ' * depth + name:40s} {own / 1000:7.2f}ms {cumulative / 1000:9.2f}ms")
+    total = sum(cumulative for _, _, cumulative, depth in imports if depth == 0)
+    heavy = sorted({name.split('.')[0] for name, *_ in imports} & {'numpy', 'scipy', 'argparse', 'subprocess'})
+    lines.append(f"{len(imports)} modules, {total / 1000:.2f}ms in imports; "
+                 + (f"heavy imports: {', '.join(heavy)}" if heavy else 'no NumPy, SciPy, argparse or subprocess'))
+    return '\n'.join(lines)
@@ -0,0 +1,165 @@
+"""
+Streaming
+Generator-based versions of the oscillators and effects
+
+Each function yields float64 blocks of at most block_size samples, so a
+render can be written with save_wav_stream without ever holding the whole
+signal. Effects track their position in the stream, producing the same
+samples as their whole-buffer counterparts. The render engine runs every
+fused chain of elementwise stages (synth.engine) through these generators.
+"""
+
+import itertools
+
+import numpy as np
+
+from .envelopes import decay_gain, fade_gain, fade_lengths
+from .filters import OnePole
+from .noise import uniform
+
+BLOCK_SIZE = 4096
+
+
+def indexed_blocks(kernel, num_samples, block_size=BLOCK_SIZE):
+    """Yield kernel(i) for consecutive ranges of sample indices i"""
+    for start in range(0, num_samples, block_size):
+        stop = min(start + block_size, num_samples)
+        yield kernel(np.arange(start, stop, dtype=np.float64))
+
+
+def buffer_blocks(samples, block_size=BLOCK_SIZE):
+    """Yield consecutive views of an existing buffer"""
+    samples = np.asarray(samples, dtype=np.float64)
+    for start in range(0, len(samples), block_size):
+        yield samples[start:start + block_size]
+
+
+def sine_blocks(frequency, duration, sample_rate=44100, amplitude=0.5, block_size=BLOCK_SIZE):
+    """Stream a sine wave"""
+    def kernel(i):
+        return amplitude * np.sin(2 * np.pi * frequency * i / sample_rate)
+    return indexed_blocks(kernel, int(sample_rate * duration), block_size)
+
+
+def silence_blocks(duration, sample_rate=44100, block_size=BLOCK_SIZE):
+    """Stream silence"""
+    return indexed_blocks(np.zeros_like, int(sample_rate * duration), block_size)
+
+
+def noise_blocks(duration, sample_rate=44100, amplitude=0.15, block_size=BLOCK_SIZE):
+    """Stream uniform white noise"""
+    def kernel(i):
+        return uniform(-amplitude, amplitude, len(i))
+    return indexed_blocks(kernel, int(sample_rate * duration), block_size)
+
+
+def rechunk(blocks, block_size=BLOCK_SIZE):
+    """Regroup a stream of arbitrary-sized blocks into block_size blocks"""
+    pending = []
+    pending_len = 0
+    for block in blocks:
+        if not pending_len and len(block) == block_size:
+            yield block
+            continue
+        pending.append(block)
+        pending_len += len(block)
+        if pending_len < block_size:
+            continue
+        joined = np.concatenate(pending)
+        full = len(joined) - len(joined) % block_size
+        for start in range(0, full, block_size):
+            yield joined[start:start + block_size]
+        pending = [joined[full:]]
+        pending_len = len(pending[0])
+    if pending_len:
+        yield np.concatenate(pending)
+
+
+def concat_blocks(*streams, block_size=BLOCK_SIZE):
+    """Stream several streams end to end"""
+    return rechunk(itertools.chain(*streams), block_size)
+
+
+def mix_blocks(*streams, block_size=BLOCK_SIZE):
+    """Mix streams, scaling each by 1/len(streams) and padding shorter ones with silence"""
+    chunked = [rechunk(s, block_size) for s in streams]
+    for blocks in itertools.zip_longest(*chunked):
+        length = max(len(b) for b in blocks if b is not None)
+        mixed = np.zeros(length)
+        gain = 1.0 / len(streams)
+        for block in blocks:
+            if block is not None:
+                mixed[:len(block)] += gain * block
+        yield mixed
+
+
+def sum_blocks(*streams, block_size=BLOCK_SIZE):
+    """Add streams of equal length"""
+    chunked = [rechunk(s, block_size) for s in streams]
+    for blocks in zip(*chunked):
+        total = blocks[0].copy()
+        for block in blocks[1:]:
+            total += block
+        yield total
+
+
+def gain_blocks(blocks, gain):
+    """Scale every block by a constant gain"""
+    for block in blocks:
+        yield block * gain
+
+
+def clamp_blocks(blocks, limit=1.0):
+    """Clip every block to [-limit, limit]"""
+    for block in blocks:
+        yield np.clip(block, -limit, limit)
+
+
+def envelope_blocks(blocks, curve):
+    """Multiply a stream by a gain curve spanning its whole length (see synth.envelopes)"""
+    position = 0
+    for block in blocks:
+        yield block * curve[position:position + len(block)]
+        position += len(block)
+
+
+def fade_blocks(blocks, num_samples, fade_in_ms=50, fade_out_ms=200, sample_rate=44100, shape='linear'):
+    """Apply a fade in/out to a stream of known total length"""
+    fade_in_samples, fade_out_samples = fade_lengths(fade_in_ms, fade_out_ms, sample_rate)
+    position = 0
+    for block in blocks:
+        i = np.arange(position, position + len(block), dtype=np.float64)
+        position += len(block)
+        yield block * fade_gain(i, num_samples, fade_in_samples, fade_out_samples, shape)
+
+
+def decay_blocks(blocks, decay=0.97, step=100.0):
+    """Apply exponential decay to a stream"""
+    position = 0
+    for block in blocks:
+        i = np.arange(position, position + len(block), dtype=np.float64)
+        position += len(block)
+        yield block * decay_gain(i, decay, step)
+
+
+def filter_blocks(blocks, filt):
+    """Run a stream through a filter object, which carries its state between blocks"""
+    for block in blocks:
+        yield filt.process(block)
+
+
+def lowpass_blocks(blocks, cutoff_ratio=0.1):
+    """One-pole lowpass a stream"""
+    return filter_blocks(blocks, OnePole(cutoff_ratio))
+
+
+def collect(blocks, out=None):
+    """Materialize a stream into one buffer, or into out when given"""
+    if out is not None:
+        position = 0
+        for block in blocks:
+            out[position:position + len(block)] = block
+            position += len(block)
+        return out
+    parts = list(blocks)
+    return np.concatenate(parts) if parts else np.zeros(0)
@@ -0,0 +1,169 @@
+"""
+Variations
+Pools of seeded variants of a hook, rendered ahead of time
+
+A spec hook may declare "variations": {"count": N, "ranges": {NAME: [LOW,
+HIGH], ...}}. Each name is one of the spec's constants - a detune ratio,
+the gap between two drops, a shimmer rate - and variant i draws a value in
+each range from a generator seeded by (seed, theme, hook, i), compiles the
+hook with those constants in place and renders it with its own noise
+stream. The range "pitch" is an offset in semitones applied to the rendered
+sound by resampling, which shifts its length with it like tape speed.
+Variant 0 is always the hook's canonical sound; the build writes the rest
+to <output_dir>/variations/<hook>-NN.wav, and a Selector hands out a pool's
+members in turn or at random at playback.
+"""
+
+import glob
+import os
+import re
+import zlib
+from fractions import Fraction
+
+import numpy as np
+
+from .engine import execute, fuse
+from .noise import DEFAULT_SEED, seed_noise
+from .paths import VARIATIONS_DIR
+from .resample import resample
+from .spec import compile_hook, load_spec
+
+# Variants per hook (the canonical sound included) when a hook's "count" is omitted
+DEFAULT_POOL_SIZE = 8
+
+# Range name for a pitch offset in semitones
+PITCH = 'pitch'
+
+# Largest denominator of the rational pitch ratio (bounds the resampling filter)
+MAX_PITCH_DENOMINATOR = 64
+
+SELECT_MODES = ('round-robin', 'random')
+
+
+def variations(spec, hook):
+    """A hook's (count, ranges), or None when it has no variations"""
+    declared = spec['hooks'][hook].get('variations')
+    if declared is None:
+        return None
+    where = f"{spec['name']}.{hook}"
+    count = declared.get('count', DEFAULT_POOL_SIZE)
+    if not isinstance(count, int) or count < 1:
+        raise ValueError(f'{where}: variation count must be a positive integer, got {count!r}')
+    ranges = {}
+    for name, bounds in declared.get('ranges', {}).items():
+        if name != PITCH and name not in spec['constants']:
+            raise ValueError(f'{where}: variation range for unknown constant {name!r}')
+        if len(bounds) != 2 or bounds[0] > bounds[1]:
+            raise ValueError(f'{where}: range {name!r} must be [LOW, HIGH], got {bounds!r}')
+        ranges[name] = (float(bounds[0]), float(bounds[1]))
+    return count, ranges
+
+
+def pool_size(spec, hook, size=None):
+    """Sounds in a hook's pool: 1 without variations, else its count (or size, when given)"""
+    declared = variations(spec, hook)
+    if declared is None:
+        return 1
+    return size or declared[0]
+
+
+def draw(spec, hook, index, seed=DEFAULT_SEED):
+    """Parameter values of one variant; variant 0 is the canonical sound and draws nothing"""
+    declared = variations(spec, hook)
+    if index == 0 or declared is None:
+        return {}
+    entropy = [seed, zlib.crc32(spec['name'].encode()), zlib.crc32(hook.encode()), index]
+    rng = np.random.default_rng(np.random.SeedSequence(entropy))
+    return {name: float(rng.uniform(low, high)) for name, (low, high) in sorted(declared[1].items())}
+
+
+def compile_variant(spec, hook, index, seed=DEFAULT_SEED):
+    """(plan, pitch offset in semitones) of one variant"""
+    overrides = draw(spec, hook, index, seed)
+    pitch = overrides.pop(PITCH, 0.0)
+    return compile_hook(spec, hook, overrides), pitch
+
+
+def pitch_shift(samples, semitones):
+    """Raise or lower a sound by resampling it; the length scales by the inverse ratio"""
+    if not semitones:
+        return samples
+    ratio = Fraction(2 ** (semitones / 12)).limit_denominator(MAX_PITCH_DENOMINATOR)
+    return resample(samples, ratio.numerator, ratio.denominator)
+
+
+def render_variant(path, hook, index, seed=DEFAULT_SEED, sample_rate=None):
+    """Float samples of variant index of a hook of the spec at path"""
+    spec = load_spec(path)
+    plan, pitch = compile_variant(spec, hook, index, seed)
+    seed_noise(seed, plan.noise_key, hook if index == 0 else f'{hook}#{index}')
+    samples = pitch_shift(execute(fuse(plan)), pitch)
+    if sample_rate and sample_rate != plan.sample_rate:
+        return resample(samples, plan.sample_rate, sample_rate)
+    return samples
+
+
+def variant_name(hook, index):
+    return f'{hook}-{index:02d}'
+
+
+def variant_path(output_dir, hook, index):
+    """Where the build writes variant index of a hook"""
+    return os.path.join(output_dir, VARIATIONS_DIR, variant_name(hook, index) + '.wav')
+
+
+def variant_names(names, hook):
+    """{index: name} of the variants of a hook among sound names (e.g. the entries of a sound bank)"""
+    pattern = re.compile(re.escape(hook) + r'-(\d+)$')
+    found = {}
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            found[int(match.group(1))] = name
+    return dict(sorted(found.items()))
+
+
+def variant_files(output_dir, hook):
+    """{index: path} of the variant WAVs of a hook present in a suite directory"""
+    paths = glob.glob(os.path.join(glob.escape(output_dir), VARIATIONS_DIR, glob.escape(hook) + '-*.wav'))
+    stems = {os.path.splitext(os.path.basename(path))[0]: path for path in paths}
+    return {index: stems[name] for index, name in variant_names(stems, hook).items()}
+
+
+class Selector:
+    """Picks the pool member to play for each request of a hook
+
+    pools maps hook -> list of sounds (any objects). 'round-robin' cycles
+    through a pool; 'random' picks uniformly but never the member just played.
+    """
+
+    def __init__(self, pools, mode='round-robin', seed=None):
+        if mode not in SELECT_MODES:
+            raise ValueError(f"unknown selection mode {mode!r} (choose from {', '.join(SELECT_MODES)})")
+        self.pools = pools
+        self.mode = mode
+        self._rng = np.random.default_rng(seed)
+        self._last = {}
+
+    def choose(self, hook):
+        pool = self.pools[hook]
+        last = self._last.get(hook, -1)
+        if len(pool) == 1:
+            index = 0
+        elif self.mode == 'round-robin':
+            index = (last + 1) % len(pool)
+        else:
+            index = int(self._rng.integers(len(pool) - (last >= 0)))
+            if 0 <= last <= index:
+                index += 1
+        self._last[hook] = index
+        return pool[index]
+
+    def replace(self, pools):
+        """Hand out members of other pools (e.g. another suite's), each starting afresh"""
+        self.pools = pools
+        self._last = {}
+
+    def sizes(self):
+        """Pool size of each hook"""
+        return {hook: len(pool) for hook, pool in self.pools.items()}
@@ -0,0 +1,214 @@
+"""
+WAV I/O
+Conversion to 16/24-bit PCM or 32-bit float and incremental WAV file writing
+
+The writers take a filename or an open binary file object, so wav_bytes()
+can build a complete WAV file in memory. read_wav() decodes mono or
+multichannel 8/16/24/32-bit PCM and 32/64-bit float files back to floats.
+"""
+
+import io
+import struct
+import wave
+
+import numpy as np
+
+# Samples per block when a whole buffer is written through the stream writer
+WRITE_BLOCK_SIZE = 4096
+
+# Sample formats the writer supports, with their bytes per sample
+SAMPLE_FORMATS = {'pcm16': 2, 'pcm24': 3, 'float32': 4}
+
+_WAVE_FORMAT_IEEE_FLOAT = 3
+
+
+def to_pcm16(samples, out=None, scratch=None):
+    """Convert float samples (-1.0..1.0) to clamped little-endian int16
+
+    out and scratch are optional preallocated int16 and float64 buffers of at
+    least len(samples); passing them makes the conversion allocation-free.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    n = len(samples)
+    scaled = np.empty(n) if scratch is None else scratch[:n]
+    np.multiply(samples, 32767, out=scaled)
+    np.trunc(scaled, out=scaled)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    pcm = np.empty(n, dtype='<i2') if out is None else out[:n]
+    pcm[:] = scaled
+    return pcm
+
+
+def to_pcm24(samples):
+    """Convert float samples (-1.0..1.0) to clamped little-endian 24-bit PCM bytes"""
+    scaled = np.trunc(np.asarray(samples, dtype=np.float64) * 8388607)
+    np.clip(scaled, -8388608, 8388607, out=scaled)
+    return scaled.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+
+
+def to_float32(samples):
+    """Convert float samples to clamped little-endian 32-bit float"""
+    return np.clip(samples, -1.0, 1.0).astype('<f4')
+
+
+def to_pcm(samples, sample_format='pcm16'):
+    """Raw little-endian sample bytes of a buffer in one of SAMPLE_FORMATS, as a memoryview"""
+    if sample_format == 'pcm24':
+        return memoryview(to_pcm24(samples))
+    if sample_format == 'float32':
+        return memoryview(to_float32(samples)).cast('B')
+    if sample_format == 'pcm16':
+        return memoryview(to_pcm16(samples)).cast('B')
+    raise ValueError(f'unknown sample format: {sample_format}')
+
+
+class _FloatWave:
+    """Minimal mono IEEE-float WAV writer with the wave.Wave_write methods the stream writer uses"""
+
+    def __init__(self, file, sample_rate):
+        self._owned = isinstance(file, str)
+        self._file = open(file, 'wb') if self._owned else file
+        self._start = self._file.tell()
+        self._sample_rate = sample_rate
+        self._data_bytes = 0
+        self._write_header()
+
+    def _write_header(self):
+        frames = self._data_bytes // 4
+        self._file.write(b'RIFF' + struct.pack('<I', 50 + self._data_bytes) + b'WAVE')
+        self._file.write(b'fmt ' + struct.pack('<IHHIIHHH', 18, _WAVE_FORMAT_IEEE_FLOAT, 1,
+                                               self._sample_rate, self._sample_rate * 4, 4, 32, 0))
+        self._file.write(b'fact' + struct.pack('<II', 4, frames))
+        self._file.write(b'data' + struct.pack('<I', self._data_bytes))
+
+    def writeframes(self, data):
+        self._file.write(data)
+        self._data_bytes += len(data)
+
+    def close(self):
+        end = self._file.tell()
+        self._file.seek(self._start)
+        self._write_header()
+        self._file.seek(end)
+        if self._owned:
+            self._file.close()
+
+
+class WavStreamWriter:
+    """Write a mono WAV file one block at a time
+
+    filename may also be an open binary file object, which is left open.
+    sample_format is 'pcm16' (the default), 'pcm24' or 'float32'. Each block
+    is clamped and converted on its own - 16-bit blocks into reusable scratch
+    buffers - so peak memory is bounded by the largest block rather than the
+    whole signal.
+    """
+
+    def __init__(self, filename, sample_rate=44100, sample_format='pcm16'):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f'unknown sample format: {sample_format}')
+        self.sample_format = sample_format
+        self.frames_written = 0
+        self._scratch = np.empty(0)
+        self._pcm = np.empty(0, dtype='<i2')
+        if sample_format == 'float32':
+            self._wav = _FloatWave(filename, sample_rate)
+        else:
+            self._wav = wave.open(filename, 'w')
+            self._wav.setnchannels(1)  # Mono
+            self._wav.setsampwidth(SAMPLE_FORMATS[sample_format])
+            self._wav.setframerate(sample_rate)
+
+    def write(self, block):
+        """Convert one block of float samples and append it to the file"""
+        n = len(block)
+        if self.sample_format == 'pcm24':
+            self._wav.writeframes(to_pcm24(block))
+        elif self.sample_format == 'float32':
+            self._wav.writeframes(memoryview(to_float32(block)).cast('B'))
+        else:
+            if n > len(self._scratch):
+                self._scratch = np.empty(n)
+                self._pcm = np.empty(n, dtype='<i2')
+            pcm = to_pcm16(block, out=self._pcm, scratch=self._scratch)
+            self._wav.writeframes(memoryview(pcm).cast('B'))
+        self.frames_written += n
+
+    def close(self):
+        self._wav.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save_wav_stream(filename, blocks, sample_rate=44100, sample_format='pcm16'):
+    """Save an iterable of sample blocks to a WAV file, returning the frame count"""
+    with WavStreamWriter(filename, sample_rate, sample_format) as writer:
+        for block in blocks:
+            writer.write(block)
+    return writer.frames_written
+
+
+def save_wav(filename, samples, sample_rate=44100, sample_format='pcm16'):
+    """Save a sample buffer to a mono WAV file (16-bit unless sample_format says otherwise)"""
+    samples = np.asarray(samples, dtype=np.float64)
+    blocks = (samples[i:i + WRITE_BLOCK_SIZE] for i in range(0, len(samples), WRITE_BLOCK_SIZE))
+    save_wav_stream(filename, blocks, sample_rate, sample_format)
+
+
+def wav_bytes(samples, sample_rate=44100, sample_format='pcm16'):
+    """A complete mono WAV file of a sample buffer, built in memory"""
+    buffer = io.BytesIO()
+    save_wav(buffer, samples, sample_rate, sample_format)
+    return buffer.getvalue()
+
+
+def _wav_chunks(data):
+    """(id, payload memoryview) for each chunk of a RIFF/WAVE file"""
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError('not a RIFF/WAVE file')
+    view = memoryview(data)
+    position = 12
+    while position + 8 <= len(data):
+        chunk_id = bytes(view[position:position + 4])
+        (size,) = struct.unpack_from('<I', data, position + 4)
+        yield chunk_id, view[position + 8:position + 8 + size]
+        position += 8 + size + (size & 1)
+
+
+def decode_wav(data):
+    """Decode WAV file bytes to (float64 samples, sample rate), mixing multichannel files down to mono"""
+    fmt = samples = None
+    for chunk_id, payload in _wav_chunks(data):
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack_from('<HHIIHH', payload)
+        elif chunk_id == b'data':
+            samples = payload
+    if fmt is None or samples is None:
+        raise ValueError('WAV file has no fmt or data chunk')
+    tag, channels, sample_rate, _, _, bits = fmt
+    width = bits // 8
+    if tag == _WAVE_FORMAT_IEEE_FLOAT and width in (4, 8):
+        decoded = np.frombuffer(samples, dtype=f'<f{width}', count=len(samples) // width).astype(np.float64)
+    elif tag in (1, 0xFFFE) and width in (1, 2, 3, 4):
+        raw = np.frombuffer(samples, dtype=np.uint8, count=len(samples) // width * width).reshape(-1, width)
+        if width == 1:
+            decoded = (raw[:, 0].astype(np.float64) - 128) / 128
+        else:
+            padded = np.zeros((len(raw), 4), dtype=np.uint8)
+            padded[:, 4 - width:] = raw
+            decoded = padded.view('<i4')[:, 0] / 2.0 ** 31
+    else:
+        raise ValueError(f'unsupported WAV encoding (format {tag}, {bits} bits)')
+    if channels > 1:
+        decoded = decoded[:len(decoded) // channels * channels].reshape(-1, channels).mean(axis=1)
+    return decoded, sample_rate
+
+
+def read_wav(filename):
+    """Read a WAV file into (float64 samples, sample rate)"""
+    with open(filename, 'rb') as f:
+        return decode_wav(f.read())
@@ -0,0 +1,44 @@
+"""Tests for the batched partial bank and FM operators"""
+
+import numpy as np
+import pytest
+
+from synth.additive import fm, partial_bank
+from synth.oscillators import partials
+
+
+def test_partial_bank_matches_summed_sines():
+    ratios, weights = np.arange(1, 25) * 1.001, 1 / np.arange(1, 25)
+    expected = partials(55, 0.7, ratios, weights, 22050)
+    assert np.allclose(partial_bank(55, 0.7, ratios, weights, 22050), expected, atol=1e-11)
+    assert len(partial_bank(55, 0.0, ratios, weights)) == 0
+
+
+def test_partials_decay_on_their_own_times():
+    out = partial_bank(100, 1.0, [1, 7], [1, 1], 8000, amplitude=1.0, decays=[0, 0.25])
+    spectrum = lambda x: np.abs(np.fft.rfft(x))
+    early, late = spectrum(out[:2000]), spectrum(out[-2000:])
+    assert late[175] / early[175] < 1e-3
+    assert late[25] / early[25] == pytest.approx(1.0, rel=0.01)
+
+    with pytest.raises(ValueError, match='decay times'):
+        partial_bank(100, 0.1, [1, 2], [1, 1], decays=[0.5])
+
+
+def test_fm_matches_the_direct_formula():
+    sample_rate, n = 8000, np.arange(10000)
+    out = fm(220, 1.25, [1, 3.5], [1, 0.5], [2, 0], [1.5, 0.3], sample_rate, amplitude=1.0,
+             mod_hz=[0, 6], decays=[0, 0.5], index_decays=[0.3, 0])
+    rate = lambda seconds: np.log(1000) / (seconds * sample_rate)
+    expected = (np.sin(2 * np.pi * 220 * n / sample_rate
+                       + 1.5 * np.exp(-rate(0.3) * n) * np.sin(2 * np.pi * 440 * n / sample_rate))
+                + 0.5 * np.exp(-rate(0.5) * n) * np.sin(2 * np.pi * 770 * n / sample_rate
+                                                        + 0.3 * np.sin(2 * np.pi * 6 * n / sample_rate)))
+    assert np.allclose(out, expected, atol=1e-9)
+
+
+def test_fm_without_modulation_is_additive():
+    plain = fm(330, 0.2, [1, 2], [1, 0.5], [1, 1], [0, 0])
+    assert np.allclose(plain, partial_bank(330, 0.2, [1, 2], [1, 0.5]), atol=1e-10)
+    with pytest.raises(ValueError, match='indices'):
+        fm(330, 0.2, [1, 2], [1, 0.5], [1, 1], [0])
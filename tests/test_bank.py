@@ -0,0 +1,112 @@
+"""Tests for the packed sound bank"""
+
+import functools
+
+import numpy as np
+import pytest
+
+from synth import daemon
+from synth.bank import ALIGNMENT, SoundBank, suite_sounds, write_bank
+from synth.daemon import NullBackend, Player, SoundServer, load_bank, load_bank_pools
+from synth.variation import Selector
+from synth.wavio import read_wav, save_wav
+
+
+@pytest.fixture
+def bank_path(tmp_path):
+    for suite, level in (('calm', 0.25), ('loud', -0.5)):
+        directory = tmp_path / suite
+        directory.mkdir()
+        save_wav(str(directory / 'tool_start.wav'), np.full(100, level), 22050)
+        save_wav(str(directory / 'notification.wav'), np.linspace(-1, 1, 333), 22050)
+    path = str(tmp_path / 'sounds.bank')
+    write_bank(path, suite_sounds({'calm': str(tmp_path / 'calm'), 'loud': str(tmp_path / 'loud')}))
+    return path
+
+
+def test_bank_round_trips_wav_samples_exactly(tmp_path, bank_path):
+    with SoundBank(bank_path) as bank:
+        assert bank.suites() == ['calm', 'loud']
+        assert bank.hooks('calm') == ['tool_start', 'notification']
+        expected, _ = read_wav(str(tmp_path / 'loud' / 'notification.wav'))
+        samples = bank.samples('loud', 'notification')
+        assert samples.dtype == np.int16 and not samples.flags.writeable
+        assert np.array_equal(samples * bank.scale('loud', 'notification'), expected)
+        del samples
+
+
+def test_sounds_are_aligned_zero_copy_views(bank_path):
+    with SoundBank(bank_path) as bank:
+        for suite, hook in bank.entries:
+            assert bank.entry(suite, hook).offset % ALIGNMENT == 0
+        pcm = bank.pcm('calm', 'tool_start')
+        assert isinstance(pcm, memoryview) and len(pcm) == 200
+        assert pcm.readonly
+        pcm.release()
+
+
+def test_float_banks(tmp_path):
+    path = str(tmp_path / 'float.bank')
+    write_bank(path, [('s', 'tool_start', np.linspace(-0.5, 0.5, 7), 48000)], 'float32')
+    with SoundBank(path) as bank:
+        assert bank.entry('s', 'tool_start').sample_rate == 48000
+        assert np.allclose(bank.samples('s', 'tool_start'), np.linspace(-0.5, 0.5, 7))
+
+
+def test_player_switches_suites_from_one_bank(bank_path):
+    bank = SoundBank(bank_path)
+    player = Player(load_bank(bank, 'calm', 22050), NullBackend(22050))
+    assert player.sounds['tool_start'].samples.base is not None
+    player.switch(load_bank(bank, 'loud', 22050))
+    assert abs(player.sounds['tool_start'].samples[0] * player.sounds['tool_start'].gain + 0.5) < 1e-4
+    with pytest.raises(ValueError):
+        load_bank(bank, 'missing', 22050)
+    player.close()
+
+
+def test_offline_bank_mix_matches_the_wav_suite_mix(tmp_path, bank_path):
+    events = ['0:notification', '0.005:tool_start']
+    common = ['--rate', '22050', '--select', 'none', '--offline'] + events
+    assert daemon.main(['--bank', bank_path, '--suite', 'calm', '--output', str(tmp_path / 'bank.wav')] + common) == 0
+    assert daemon.main(['--suite', str(tmp_path / 'calm'), '--output', str(tmp_path / 'wav.wav')] + common) == 0
+    from_bank, _ = read_wav(str(tmp_path / 'bank.wav'))
+    from_wavs, _ = read_wav(str(tmp_path / 'wav.wav'))
+    assert len(from_bank) == len(from_wavs)
+    assert np.allclose(from_bank, from_wavs, atol=1e-4)
+    assert np.max(np.abs(from_bank)) < 1.0
+
+
+def test_variation_pools_are_packed_and_follow_suite_switches(tmp_path):
+    for suite in ('calm', 'loud'):
+        (tmp_path / suite).mkdir()
+        save_wav(str(tmp_path / suite / 'tool_start.wav'), np.full(100, 0.25), 22050)
+    (tmp_path / 'calm' / 'variations').mkdir()
+    save_wav(str(tmp_path / 'calm' / 'variations' / 'tool_start-01.wav'), np.full(50, 0.5), 22050)
+    path = str(tmp_path / 'pools.bank')
+    write_bank(path, suite_sounds({'calm': str(tmp_path / 'calm'), 'loud': str(tmp_path / 'loud')}))
+
+    bank = SoundBank(path)
+    assert bank.hooks('calm') == ['tool_start', 'tool_start-01']
+    sounds = load_bank(bank, 'calm', 22050)
+    assert list(sounds) == ['tool_start']
+    pools = load_bank_pools(bank, 'calm', sounds, 22050)
+    assert [len(sound.samples) for sound in pools['tool_start']] == [100, 50]
+
+    player = Player(sounds, NullBackend(22050), selector=Selector(pools))
+    server = SoundServer(str(tmp_path / 'daemon.sock'), player,
+                         functools.partial(daemon._load_bank_suite, bank, 22050, True))
+    assert server.dispatch(['switch', 'loud'], 0.0) == 'ok'
+    assert player.selector.pools == {}
+    assert server.dispatch(['switch', 'calm'], 0.0) == 'ok'
+    assert player.selector.sizes() == {'tool_start': 2}
+    server.server_close()
+    player.close()
+
+
+def test_bad_banks(tmp_path):
+    path = tmp_path / 'not.bank'
+    path.write_bytes(b'RIFF' + bytes(60))
+    with pytest.raises(ValueError):
+        SoundBank(str(path))
+    with pytest.raises(ValueError):
+        write_bank(str(tmp_path / 'dup.bank'), [('s', 'h', np.zeros(4), 8000)] * 2)
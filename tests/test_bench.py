@@ -0,0 +1,19 @@
+"""Tests for the benchmark suite"""
+
+from synth.bench import Result, compare, cost_per_second, primitive_cases, run_benchmarks, to_json
+
+
+def test_primitive_cases_report_samples_rendered(tmp_path):
+    cases = primitive_cases(durations=(0.01,), sample_rates=(22050,), scratch_dir=str(tmp_path))
+    results = run_benchmarks(cases, repeat=1, match='noise')
+    assert [r.name for r in results] == ['primitive:white_noise@22050Hz/0.01s']
+    for result in results:
+        assert result.samples == 220
+        assert result.seconds > 0 and result.peak_bytes > 0
+        assert cost_per_second(result) == result.seconds * 1000 / 0.01
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = to_json([Result('a', 1.0, 10, 10.0, 0), Result('b', 1.0, 10, 10.0, 0)])
+    results = [Result('a', 1.2, 10, 8.0, 0), Result('b', 1.5, 10, 6.0, 0), Result('new', 9.0, 10, 1.0, 0)]
+    assert compare(results, baseline, threshold=0.25) == [('b', 1.0, 1.5, 1.5)]
@@ -0,0 +1,50 @@
+"""Tests for suite discovery and parallel rendering in the builder"""
+
+import json
+import os
+
+from synth.build import Theme, build, discover_themes
+from synth.paths import HOOK_NAMES
+
+SPEC = {
+    'name': 'parallel',
+    'sample_rate': 8000,
+    'hooks': {
+        'tool_start': {'graph': {'type': 'fade', 'input': {'type': 'sine', 'frequency': 440, 'duration': 0.05}}},
+        'notification': {'graph': {'type': 'mix', 'inputs': [
+            {'type': 'noise', 'duration': 0.03}, {'type': 'sine', 'frequency': 880, 'duration': 0.03}]}},
+        'session_end': {'graph': {'type': 'noise', 'duration': 0.04}},
+    },
+}
+
+
+def test_discover_themes_finds_every_generator():
+    themes = {theme.name: theme for theme in discover_themes()}
+    assert set(themes) == {'retro', 'drift', 'void'}
+    assert themes['retro'].output_dir == 'retro-terminal'
+    for theme in themes.values():
+        assert theme.hooks == HOOK_NAMES
+
+
+def _theme(tmp_path, name):
+    output_dir = str(tmp_path / name)
+    path = tmp_path / f'{name}.json'
+    path.write_text(json.dumps(dict(SPEC, output_dir=output_dir)))
+    return Theme('parallel', None, output_dir, tuple(SPEC['hooks']), str(path))
+
+
+def test_parallel_build_matches_serial_build(tmp_path):
+    serial = _theme(tmp_path, 'serial')
+    parallel = _theme(tmp_path, 'parallel')
+    serial_results = build([serial], jobs=1)
+    parallel_results = build([parallel], jobs=2)
+    order = [(r.theme, r.hook, r.variant, r.cached) for r in serial_results]
+    assert [(r.theme, r.hook, r.variant, r.cached) for r in parallel_results] == order
+    assert [r.hook for r in serial_results] == list(SPEC['hooks'])
+    files = sorted(name for name in os.listdir(serial.output_dir) if name.endswith('.wav'))
+    assert files == sorted(f'{hook}.wav' for hook in SPEC['hooks'])
+    assert files == sorted(name for name in os.listdir(parallel.output_dir) if name.endswith('.wav'))
+    for name in files:
+        with open(os.path.join(serial.output_dir, name), 'rb') as a:
+            with open(os.path.join(parallel.output_dir, name), 'rb') as b:
+                assert a.read() == b.read(), name
@@ -0,0 +1,114 @@
+"""Tests for hook fingerprints and the build cache manifest"""
+
+import importlib.util
+import sys
+
+from synth.cache import BuildCache, hook_fingerprint, plan_fingerprint
+from synth.spec import compile_hook
+
+THEME_SOURCE = '''
+from synth import sine_wave, save_wav
+
+PITCH = {pitch}
+
+def tone():
+    return sine_wave(PITCH, 0.01)
+
+def generate_notification():
+    save_wav('notification.wav', tone())
+
+def generate_tool_start():
+    save_wav('tool_start.wav', sine_wave(220, 0.01))
+'''
+
+
+CLASS_THEME_SOURCE = '''
+from synth.fixture_chimes import Chime
+
+class Bell:
+    def render(self):
+        return Chime().render()
+
+def generate_notification():
+    Bell().render()
+'''
+
+CHIMES_SOURCE = '''
+from synth import sine_wave
+
+class Chime:
+    def render(self):
+        return sine_wave({pitch}, 0.01)
+'''
+
+
+def load_module(path, name, source):
+    path.write_text(source)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_theme(tmp_path, name, pitch):
+    return load_module(tmp_path / (name + '.py'), name, THEME_SOURCE.format(pitch=pitch))
+
+
+def test_fingerprint_tracks_helpers_and_constants(tmp_path):
+    a = load_theme(tmp_path, 'theme_a', 440)
+    b = load_theme(tmp_path, 'theme_b', 880)
+
+    # notification depends on PITCH through tone(); tool_start does not
+    assert hook_fingerprint(a, 'notification') != hook_fingerprint(b, 'notification')
+    assert hook_fingerprint(a, 'tool_start') == hook_fingerprint(b, 'tool_start')
+
+
+def test_fingerprint_tracks_classes_and_the_synth_modules_they_come_from(tmp_path, monkeypatch):
+    fingerprints = []
+    for pitch in (440, 880):
+        chimes = load_module(tmp_path / f'chimes_{pitch}.py', 'synth.fixture_chimes', CHIMES_SOURCE.format(pitch=pitch))
+        monkeypatch.setitem(sys.modules, 'synth.fixture_chimes', chimes)
+        theme = load_module(tmp_path / f'bells_{pitch}.py', f'bells_{pitch}', CLASS_THEME_SOURCE)
+        monkeypatch.setitem(sys.modules, theme.__name__, theme)
+        fingerprints.append(hook_fingerprint(theme, 'notification'))
+    assert fingerprints[0] != fingerprints[1]
+
+    edited = load_module(tmp_path / 'bells_edited.py', 'bells_edited',
+                         CLASS_THEME_SOURCE.replace('Chime().render()', 'Chime().render() * 0.5'))
+    monkeypatch.setitem(sys.modules, 'bells_edited', edited)
+    assert hook_fingerprint(edited, 'notification') != fingerprints[1]
+
+
+def test_fingerprint_includes_render_settings(tmp_path):
+    theme = load_theme(tmp_path, 'theme_c', 440)
+    base = hook_fingerprint(theme, 'notification')
+    assert base == hook_fingerprint(theme, 'notification')
+    assert base != hook_fingerprint(theme, 'notification', sample_rate=48000)
+    assert base != hook_fingerprint(theme, 'notification', seed=1)
+
+
+def test_build_cache_checks_file_contents(tmp_path):
+    wav = tmp_path / 'notification.wav'
+    wav.write_bytes(b'RIFF1')
+
+    cache = BuildCache(str(tmp_path))
+    assert not cache.is_fresh('notification', 'abc')
+    cache.record('notification', 'abc')
+    cache.save()
+
+    reloaded = BuildCache(str(tmp_path))
+    assert reloaded.is_fresh('notification', 'abc')
+    assert not reloaded.is_fresh('notification', 'def')
+
+    wav.write_bytes(b'RIFF2')
+    assert not reloaded.is_fresh('notification', 'abc')
+
+
+def test_plan_fingerprint_follows_the_compiled_plan():
+    spec = {'name': 't', 'output_dir': 't', 'sample_rate': 44100, 'constants': {'PITCH': 440},
+            'defaults': {}, 'voices': {},
+            'hooks': {'notification': {'graph': {'type': 'sine', 'frequency': 'PITCH', 'duration': 0.01}}}}
+    base = plan_fingerprint(compile_hook(spec, 'notification'))
+    assert base == plan_fingerprint(compile_hook(spec, 'notification'))
+    assert base != plan_fingerprint(compile_hook(spec, 'notification'), seed=1)
+    assert base != plan_fingerprint(compile_hook(dict(spec, constants={'PITCH': 441}), 'notification'))
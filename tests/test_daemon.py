@@ -0,0 +1,93 @@
+"""Tests for the resident sound daemon and its client"""
+
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from synth import client
+from synth.daemon import FileBackend, NullBackend, Player, SoundServer, load_suite, load_theme, open_backend
+from synth.scheduler import Scheduler
+from synth.wavio import read_wav, save_wav
+
+
+@pytest.fixture
+def suite(tmp_path):
+    directory = tmp_path / 'suite'
+    directory.mkdir()
+    for i, hook in enumerate(['tool_start', 'notification']):
+        save_wav(str(directory / f'{hook}.wav'), np.full(441 * (i + 1), 0.25), 44100)
+    return str(directory)
+
+
+@pytest.fixture
+def server(tmp_path, suite):
+    player = Player(load_suite(suite, 22050), NullBackend(22050))
+    server = SoundServer(str(tmp_path / 'sounds.sock'), player)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    player.close()
+
+
+def test_load_suite_resamples_to_the_output_rate(suite):
+    sounds = load_suite(suite, 22050)
+    assert sorted(sounds) == ['notification', 'tool_start']
+    assert len(sounds['tool_start'].samples) == 221
+
+
+def test_load_theme_renders_every_hook():
+    sounds = load_theme('retro', 22050)
+    assert len(sounds) == 10
+    assert all(len(sound.samples) for sound in sounds.values())
+
+
+def test_file_backend_records_what_was_played(tmp_path, suite):
+    path = str(tmp_path / 'played.wav')
+    player = Player(load_suite(suite, 22050), FileBackend(22050, path), block_size=256)
+    player.request('notification')
+    player.drain()
+    player.request('tool_start')
+    player.close()
+    samples, rate = read_wav(path)
+    assert rate == 22050 and len(samples) == 2 * 256 + 256
+    assert abs(samples[200] - 0.25) < 1e-3 and abs(samples[512 + 100] - 0.25) < 1e-3
+    assert player.stats()['played'] == 2
+
+
+def test_client_plays_through_the_socket(server):
+    assert client.request('ping', server.path) == 'ok'
+    assert client.play('tool_start', server.path) == 'ok'
+    assert client.play('bogus', server.path).startswith('error')
+    server.player.drain()
+    stats = json.loads(client.request('stats', server.path))
+    assert stats['played'] == 1 and stats['unknown'] == 1
+    assert stats['latency']['count'] == 1 and stats['end_to_end']['count'] == 1
+    assert stats['latency']['max_ms'] >= 0
+
+
+def test_scheduler_merges_and_ducks(tmp_path, suite):
+    path = str(tmp_path / 'played.wav')
+    sounds = load_suite(suite, 22050)
+    # Voices last as long as their sounds (20 and 10 ms); the player brings gains up to
+    # date on the scheduler's clock, so it follows the requests' stamps
+    scheduler = Scheduler({hook: 1.0 for hook in sounds}, window=0.5, duck_gain=0.5, clock=lambda: 10.008)
+    player = Player(sounds, FileBackend(22050, path), scheduler)
+    assert player.request('notification', received=10.0)
+    player.drain()
+    assert player.request('tool_start', received=10.005)
+    assert not player.request('tool_start', received=10.008)
+    player.close()
+    samples, _ = read_wav(path)
+    assert abs(samples[220] - 0.25) < 1e-3 and abs(samples[512 + 110] - 0.125) < 1e-3
+    assert player.stats()['scheduler']['merged'] == 1
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        open_backend('speakers', 22050)
+    with pytest.raises(ValueError):
+        open_backend('file', 22050)
@@ -0,0 +1,51 @@
+"""Tests for stage fusion in the render engine"""
+
+import glob
+import os
+
+import numpy as np
+
+from synth import seed_noise
+from synth.engine import execute, format_plan, fuse
+from synth.paths import ROOT, SPEC_DIR
+from synth.spec import compile_hook, load_spec
+
+CHAIN = {
+    'name': 'chain', 'output_dir': 'chain', 'sample_rate': 44100, 'constants': {}, 'defaults': {}, 'voices': {},
+    'hooks': {'notification': {'graph': {'type': 'fade', 'input': {'type': 'decay', 'input': {'type': 'mix', 'inputs': [
+        {'type': 'sine', 'frequency': 440, 'duration': 0.3},
+        {'type': 'lowpass', 'input': {'type': 'noise', 'duration': 0.2}},
+    ]}}}}},
+}
+
+
+def test_elementwise_chains_fuse_into_their_producer():
+    plan = compile_hook(CHAIN, 'notification')
+    fused = fuse(plan)
+    assert [step.op for step in plan.steps] == ['sine', 'noise', 'lowpass', 'mix', 'decay', 'fade']
+    assert [step.op for step in fused.steps] == ['sine', 'noise', 'lowpass', 'fused']
+    assert [stage[0] for stage in fused.steps[-1].params['stages']] == ['mix', 'decay', 'fade']
+    assert fused.steps[-1].inputs == (0, 2)
+
+
+def test_fused_plans_render_identical_audio():
+    paths = sorted(glob.glob(os.path.join(ROOT, SPEC_DIR, '*.json')))
+    specs = [CHAIN] + [load_spec(path) for path in paths]
+    for spec in specs:
+        for hook in spec['hooks']:
+            plan = compile_hook(spec, hook)
+            seed_noise(0, hook)
+            expected = execute(plan)
+            seed_noise(0, hook)
+            assert np.array_equal(execute(fuse(plan)), expected), (spec['name'], hook)
+
+
+def test_format_plan_lists_stages_and_allocations():
+    plan = fuse(compile_hook(CHAIN, 'notification'))
+    trace = []
+    execute(plan, trace)
+    listing = format_plan(plan, trace)
+    assert 'mix() > decay(' in listing
+    assert '#3   ' in listing and '<- #0 #2' in listing
+    assert [samples for _, samples in trace] == [13230, 8820, 8820, 13230]
+    assert '4 buffers allocated' in listing
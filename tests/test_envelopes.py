@@ -0,0 +1,50 @@
+"""Tests for cached envelope curves"""
+
+import math
+
+import numpy as np
+import pytest
+
+from synth import adsr_curve, apply_adsr, apply_fade, decay_curve, fade_curve
+
+
+def test_curves_are_cached_and_read_only():
+    curve = fade_curve(1000, 5, 10)
+    assert fade_curve(1000, 5, 10) is curve
+    assert fade_curve(1000, 5, 10, sample_rate=48000) is not curve
+    with pytest.raises(ValueError):
+        curve[0] = 1.0
+
+
+def test_linear_fade_matches_original_loops():
+    samples = list(np.random.default_rng(0).uniform(-1, 1, 5000))
+    expected = list(samples)
+    fade_in, fade_out = int(44100 * 20 / 1000), int(44100 * 30 / 1000)
+    for i in range(min(fade_in, len(expected))):
+        expected[i] *= i / fade_in
+    start = len(expected) - fade_out
+    for i in range(max(0, start), len(expected)):
+        expected[i] *= 1.0 - (i - start) / fade_out
+    assert np.allclose(apply_fade(samples, 20, 30), expected)
+
+
+def test_equal_power_fade_midpoint():
+    curve = fade_curve(44100, 100, 100, shape='equal_power')
+    assert math.isclose(curve[2205], math.sqrt(0.5), rel_tol=1e-12)
+    assert curve[-1] > 0.0 and curve[-1] < 0.01
+
+
+def test_decay_curve():
+    curve = decay_curve(401, decay=0.5, step=200.0)
+    assert math.isclose(curve[200], 0.5)
+    assert math.isclose(curve[400], 0.25)
+
+
+def test_adsr_stages():
+    curve = adsr_curve(44100, attack_ms=100, decay_ms=100, sustain_level=0.5, release_ms=100)
+    assert curve[0] == 0.0
+    assert math.isclose(curve[4410], 1.0)
+    assert math.isclose(curve[8820], 0.5)
+    assert curve[20000] == 0.5
+    assert curve[-1] < 0.001
+    assert np.allclose(apply_adsr(np.ones(44100), 100, 100, 0.5, 100), curve)
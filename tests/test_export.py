@@ -0,0 +1,87 @@
+"""Tests for resampling and multi-target export"""
+
+import os
+
+import numpy as np
+import pytest
+
+from synth import export, resample as resampling
+from synth.export import Target, parse_target
+from synth.resample import resample
+from synth.wavio import save_wav
+
+
+@pytest.mark.parametrize('source, target', [(44100, 22050), (44100, 48000), (48000, 44100), (22050, 44100)])
+@pytest.mark.parametrize('length', [0, 1, 5, 3000])
+def test_numpy_fallback_matches_scipy(source, target, length):
+    signal = pytest.importorskip('scipy.signal')
+    x = np.random.default_rng(length).uniform(-1, 1, length)
+    up, down = resampling.rate_ratio(source, target)
+    assert np.allclose(resampling._resample_numpy(x, up, down), signal.resample_poly(x, up, down), atol=1e-10)
+
+
+@pytest.mark.parametrize('target', [22050, 48000])
+def test_resampled_sine_keeps_its_frequency(target):
+    t = np.arange(44100) / 44100
+    out = resample(np.sin(2 * np.pi * 1000 * t), 44100, target)
+    assert len(out) == target
+    expected = np.sin(2 * np.pi * 1000 * np.arange(target) / target)
+    middle = slice(target // 10, -target // 10)
+    assert np.max(np.abs(out[middle] - expected[middle])) < 5e-3
+
+
+def test_same_rate_is_a_copy():
+    x = np.linspace(-1, 1, 100)
+    out = resample(x, 44100, 44100)
+    assert np.array_equal(out, x) and out is not x
+
+
+@pytest.mark.parametrize('fmt, dtype, tolerance', [('pcm24', np.int32, 2 ** -22), ('float32', np.float32, 1e-7)])
+def test_wav_formats_round_trip(tmp_path, fmt, dtype, tolerance):
+    wavfile = pytest.importorskip('scipy.io.wavfile')
+    x = np.sin(np.linspace(0, 40, 5000)) * 0.9
+    path = str(tmp_path / 'tone.wav')
+    save_wav(path, x, 48000, fmt)
+    rate, data = wavfile.read(path)
+    assert rate == 48000 and data.dtype == dtype
+    if fmt == 'pcm24':
+        data = data / 2.0 ** 31
+    assert np.max(np.abs(data - x)) < tolerance
+
+
+@pytest.mark.parametrize('text', ['', 'fast', '0', '44100:mp3'])
+def test_parse_target_rejects_bad_targets(text):
+    with pytest.raises(ValueError):
+        parse_target(text)
+
+
+def test_parse_target_defaults_to_pcm16():
+    assert parse_target('22050') == Target(22050, 'pcm16')
+    assert parse_target('48000:float32') == Target(48000, 'float32')
+
+
+def test_export_writes_every_target(tmp_path):
+    wavfile = pytest.importorskip('scipy.io.wavfile')
+    x = np.sin(np.linspace(0, 200, 44100)) * 0.5
+    targets = [Target(22050, 'pcm16'), Target(48000, 'float32'), Target(22050, 'pcm24')]
+    paths = export.export(x, 44100, targets, str(tmp_path), 'ping')
+    assert paths == [str(tmp_path / 'ping.wav'), str(tmp_path / '48000-float32' / 'ping.wav'),
+                     str(tmp_path / '22050-pcm24' / 'ping.wav')]
+    for path, target in zip(paths, targets):
+        rate, data = wavfile.read(path)
+        assert rate == target.sample_rate and len(data) == target.sample_rate
+
+
+def test_compressed_formats_need_soundfile(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, 'soundfile', None)
+    with pytest.raises(ValueError, match='soundfile'):
+        parse_target('44100:flac')
+
+
+def test_flac_export(tmp_path):
+    soundfile = pytest.importorskip('soundfile')
+    x = np.sin(np.linspace(0, 200, 4410)) * 0.5
+    (path,) = export.export(x, 44100, [Target(44100, 'flac')], str(tmp_path), 'ping')
+    data, rate = soundfile.read(path)
+    assert os.path.basename(path) == 'ping.flac' and rate == 44100
+    assert np.max(np.abs(data - x)) < 1e-4
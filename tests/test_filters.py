@@ -0,0 +1,71 @@
+"""Tests for the IIR filter engine"""
+
+import numpy as np
+import pytest
+
+from synth import filters
+from synth.filters import Biquad, OnePole, StateVariable
+
+
+def tone(frequency, duration=0.2, sample_rate=44100):
+    i = np.arange(int(sample_rate * duration))
+    return np.sin(2 * np.pi * frequency * i / sample_rate)
+
+
+def rms(x):
+    return float(np.sqrt(np.mean(x[len(x) // 2:] ** 2)))
+
+
+@pytest.fixture(params=['lfilter', 'convolution'])
+def backend(request, monkeypatch):
+    if request.param == 'convolution':
+        monkeypatch.setattr(filters, '_lfilter', None)
+    return request.param
+
+
+def test_one_pole_matches_recursion(backend):
+    x = np.random.default_rng(1).uniform(-1, 1, 2000)
+    expected = []
+    prev = 0.0
+    for sample in x:
+        prev = prev + 0.15 * (sample - prev)
+        expected.append(prev)
+    assert np.allclose(OnePole(0.15).process(x), expected, atol=1e-12)
+
+
+def test_block_processing_carries_state(backend):
+    x = np.random.default_rng(2).uniform(-1, 1, 5000)
+    whole = Biquad.bandpass(1200, q=4.0).process(x)
+    filt = Biquad.bandpass(1200, q=4.0)
+    blocks = np.concatenate([filt.process(x[i:i + 333]) for i in range(0, len(x), 333)])
+    assert np.allclose(blocks, whole, atol=1e-12)
+
+
+def test_biquad_responses():
+    assert rms(filters.lowpass(tone(100), 1000)) > 0.7 * rms(tone(100))
+    assert rms(filters.lowpass(tone(8000), 500)) < 0.01
+    assert rms(filters.highpass(tone(50), 2000)) < 0.01
+    assert rms(filters.bandpass(tone(1000), 1000, q=2.0)) > 0.69
+    assert rms(filters.bandpass(tone(100), 1000, q=2.0)) < 0.1
+
+
+def test_high_shelf_boosts_only_the_top():
+    shelf = Biquad.highshelf(1500, 4.0)
+    assert rms(shelf.process(tone(10000))) == pytest.approx(rms(tone(10000)) * 10 ** (4 / 20), rel=0.01)
+    assert rms(Biquad.highshelf(1500, 4.0).process(tone(50))) == pytest.approx(rms(tone(50)), rel=0.01)
+
+
+def test_state_variable_outputs_match_biquads():
+    x = np.random.default_rng(3).uniform(-1, 1, 3000)
+    low, band, high = StateVariable(800, q=0.7071).process_all(x)
+    assert np.allclose(low, Biquad.lowpass(800, q=0.7071).process(x), atol=1e-9)
+    assert np.allclose(high, Biquad.highpass(800, q=0.7071).process(x), atol=1e-9)
+    assert rms(StateVariable(1000, q=2.0).process(tone(1000), 'bandpass')) > 0.69 * 2.0 / 2.0
+
+
+def test_multichannel_filter_matches_each_row(backend):
+    x = np.random.default_rng(3).uniform(-1, 1, (3, 1500))
+    filt = OnePole(0.2, channels=3)
+    blocks = np.concatenate([filt.process(x[:, i:i + 400]) for i in range(0, 1500, 400)], axis=1)
+    for row, out in zip(x, blocks):
+        assert np.allclose(out, OnePole(0.2).process(row), atol=1e-12)
@@ -0,0 +1,47 @@
+"""Tests for the golden-file regression check"""
+
+import numpy as np
+
+from synth.golden import check, compare_theme, format_row, load_references, save_references, spectra
+
+
+def tone(frequency, length=8000, sample_rate=44100):
+    return 0.5 * np.sin(2 * np.pi * frequency * np.arange(length) / sample_rate)
+
+
+def test_every_hook_matches_its_reference():
+    results = check()
+    assert len(results) == 30
+    assert [format_row(r) for r in results if r.problem] == []
+
+
+def test_references_round_trip(tmp_path):
+    rendered = {'tool_start': tone(440)}
+    save_references('test', rendered, str(tmp_path))
+    loaded = load_references('test', str(tmp_path))
+    assert np.allclose(loaded['tool_start'], rendered['tool_start'], atol=1e-7)
+    assert load_references('missing', str(tmp_path)) == {}
+
+
+def test_drift_is_reported_with_its_band():
+    reference = tone(440)
+    drifted = reference + 0.01 * tone(3000)
+    [result] = compare_theme('test', {'tool_start': drifted}, {'tool_start': reference}, 44100)
+    assert result.band == (2000, 4000)
+    assert result.problem.startswith('spectrum drifted')
+
+    [quiet] = compare_theme('test', {'tool_start': reference + 1e-6}, {'tool_start': reference}, 44100)
+    assert quiet.band_db < 0.5 and quiet.rms_db < -80
+    assert quiet.problem is None
+
+
+def test_length_changes_and_missing_references_fail():
+    results = compare_theme('test', {'a': tone(440, 100), 'b': tone(440)}, {'a': tone(440, 120)}, 44100)
+    assert [r.problem for r in results] == ['length 100 != reference 120', 'no reference']
+
+
+def test_spectra_are_batched_per_signal():
+    db = spectra([tone(1000), tone(1000, 20000), np.zeros(10)])
+    assert db.shape == (3, 1025)
+    peak = int(np.argmax(db[0]))
+    assert abs(peak * 44100 / 2048 - 1000) < 30 and int(np.argmax(db[1])) == peak
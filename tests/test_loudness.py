@@ -0,0 +1,85 @@
+"""Tests for loudness measurement, normalization and the loudness cache"""
+
+import json
+
+import numpy as np
+import pytest
+
+from synth.build import Theme, build
+from synth.loudness import FLOOR_DB, LoudnessCache, analyze, measure, normalize
+from synth.wavio import save_wav
+
+
+def sine(amplitude, seconds=3.0, sample_rate=48000, frequency=997):
+    return amplitude * np.sin(2 * np.pi * frequency * np.arange(int(seconds * sample_rate)) / sample_rate)
+
+
+def test_sine_levels_match_the_reference():
+    level = measure(sine(0.1), 48000)
+    assert level.peak_db == pytest.approx(-20.0, abs=1e-6)
+    assert level.rms_db == pytest.approx(-23.01, abs=0.01)
+    assert level.lufs == pytest.approx(-23.0, abs=0.1)
+    assert level.clipped == 0
+
+
+def test_silence_is_gated_out():
+    assert measure(np.zeros(4800), 48000) == (FLOOR_DB, FLOOR_DB, FLOOR_DB, 0, 0.0)
+    with_tail = np.concatenate([sine(0.1, 1.0), np.zeros(96000)])
+    level = measure(with_tail, 48000)
+    assert level.lufs == pytest.approx(measure(sine(0.1, 1.0), 48000).lufs, abs=1.0)
+    assert level.rms_db < level.lufs - 3
+
+
+def test_short_sounds_are_one_block_and_clipping_is_counted():
+    burst = np.clip(sine(1.5, 0.1), -1.2, 1.2)
+    level = measure(burst, 48000)
+    assert level.lufs > FLOOR_DB
+    assert level.clipped == np.count_nonzero(np.abs(burst) >= 32767 / 32768)
+
+
+def test_normalize_reaches_the_target_under_the_ceiling():
+    quiet = sine(0.01)
+    scaled, gain_db = normalize(quiet, measure(quiet, 48000), -23.0)
+    assert measure(scaled, 48000).lufs == pytest.approx(-23.0, abs=1e-6)
+    assert gain_db == pytest.approx(20.0, abs=0.1)
+
+    spiky = sine(0.01)
+    spiky[100] = 0.9
+    scaled, _ = normalize(spiky, measure(spiky, 48000), -10.0, ceiling=-1.0)
+    assert measure(scaled, 48000).peak_db == pytest.approx(-1.0)
+
+
+def test_cache_follows_file_contents(tmp_path):
+    path = str(tmp_path / 'tone.wav')
+    save_wav(path, sine(0.1, 0.5, 22050), 22050)
+    cache = LoudnessCache(str(tmp_path))
+    first, cached = analyze(path, cache)
+    assert not cached
+    assert analyze(path, cache) == (first, True)
+    cache.save()
+    assert analyze(path, LoudnessCache(str(tmp_path)))[1]
+
+    save_wav(path, sine(0.2, 0.5, 22050), 22050)
+    level, cached = analyze(path, cache)
+    assert not cached and level.peak_db > first.peak_db
+
+
+def test_build_reports_hidden_clipping_and_normalizes(tmp_path):
+    spec = tmp_path / 'hot.json'
+    spec.write_text(json.dumps({
+        'output_dir': str(tmp_path / 'hot'),
+        'sample_rate': 8000,
+        'hooks': {'notification': {'graph': {'type': 'sine', 'frequency': 440, 'duration': 0.2, 'amplitude': 1.5}}},
+    }))
+    theme = Theme('hot', None, str(tmp_path / 'hot'), ('notification',), str(spec))
+
+    [result] = build([theme], jobs=1)
+    assert result.loudness.clipped > 0
+    [again] = build([theme], jobs=1)
+    assert again.cached and again.loudness == result.loudness
+
+    [normalized] = build([theme], jobs=1, normalize=-20.0)
+    assert not normalized.cached
+    assert normalized.loudness.clipped == 0
+    assert normalized.loudness.gain_db < 0
+    assert normalized.loudness.peak_db <= -1.0 + 1e-9
@@ -0,0 +1,76 @@
+"""Tests for the block mixer and its offline event renderer"""
+
+import numpy as np
+import pytest
+
+from synth.mixer import Mixer, default_scheduler, parse_event, render_events
+from synth.mixing import soft_clip
+from synth.variation import Selector
+
+SOUNDS = {'tool_start': np.full(300, 0.25), 'notification': np.full(1000, 0.5)}
+
+
+def test_overlapping_voices_are_summed_at_block_boundaries():
+    samples, mixer = render_events([(0.0, 'notification'), (0.003, 'tool_start')], SOUNDS, 10000, block_size=20)
+    assert len(samples) == 1000
+    assert np.allclose(samples[:20], 0.5)
+    assert np.allclose(samples[40:340], 0.75) and np.allclose(samples[340:], 0.5)
+    assert mixer.blocks == 50
+
+
+def test_render_is_deterministic():
+    events = [(0.0, 'tool_start'), (0.01, 'tool_start'), (0.02, 'notification')]
+    first, _ = render_events(events, SOUNDS, 10000, default_scheduler(SOUNDS, 10000, window=0.0))
+    second, _ = render_events(events, SOUNDS, 10000, default_scheduler(SOUNDS, 10000, window=0.0))
+    assert np.array_equal(first, second)
+
+
+def test_scheduler_ducks_running_voices():
+    scheduler = default_scheduler(SOUNDS, 10000, policy='duck', duck_gain=0.5)
+    samples, _ = render_events([(0.0, 'tool_start'), (0.01, 'notification')], SOUNDS, 10000, scheduler, 50)
+    assert np.allclose(samples[:100], 0.25)
+    assert np.allclose(samples[100:300], 0.5 + 0.125)
+    assert scheduler.counters['ducked'] == 1
+
+
+def test_ducked_voices_recover_after_the_louder_voice():
+    sounds = {'tool_start': np.full(1000, 0.25), 'notification': np.full(200, 0.5)}
+    scheduler = default_scheduler(sounds, 10000, policy='duck', duck_gain=0.5)
+    samples, _ = render_events([(0.0, 'tool_start'), (0.01, 'notification')], sounds, 10000, scheduler, 50)
+    assert np.allclose(samples[100:300], 0.5 + 0.125)
+    assert np.allclose(samples[300:1000], 0.25)
+
+
+def test_voices_last_as_long_as_the_variant_that_plays():
+    selector = Selector({'notification': [np.full(100, 0.5)]})
+    scheduler = default_scheduler(SOUNDS, 10000, policy='duck', duck_gain=0.5)
+    samples, _ = render_events([(0.0, 'notification'), (0.02, 'tool_start')], SOUNDS, 10000, scheduler, 50,
+                               selector=selector)
+    assert np.allclose(samples[:100], 0.5)
+    assert np.allclose(samples[200:500], 0.25)
+    assert scheduler.counters['ducked'] == 0
+
+
+def test_soft_clip_keeps_peaks_below_one():
+    mixer = Mixer(block_size=64, knee=0.8)
+    for _ in range(4):
+        mixer.add(np.full(64, 0.5))
+    block, started = mixer.render_block()
+    assert len(started) == 4
+    assert np.all(block < 1.0) and np.all(block > 0.99)
+    quiet = np.linspace(-0.8, 0.8, 9)
+    assert np.array_equal(soft_clip(quiet.copy()), quiet)
+
+
+def test_cancelled_voices_stop():
+    scheduler = default_scheduler(SOUNDS, 10000, policy='drop')
+    samples, _ = render_events([(0.0, 'tool_start'), (0.01, 'notification')], SOUNDS, 10000, scheduler, 50)
+    assert np.allclose(samples[100:], 0.5)
+
+
+def test_bad_events():
+    assert parse_event('0.5:tool_start') == (0.5, 'tool_start')
+    with pytest.raises(ValueError):
+        parse_event('soon:tool_start')
+    with pytest.raises(ValueError):
+        render_events([(0.0, 'bogus')], SOUNDS, 10000)
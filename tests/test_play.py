@@ -0,0 +1,103 @@
+"""Tests for the quick hook player and its startup measurement"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from synth import paths, play
+from synth.play import ROOT
+from synth.startup import parse_importtime
+
+
+def imported_after(statement):
+    code = f'import sys; {statement}; print(" ".join(sorted(sys.modules)))'
+    return set(subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.split())
+
+
+def test_light_modules_do_not_import_the_synth_stack():
+    assert not imported_after('import synth.play') & {'numpy', 'scipy', 'synth.engine', 'argparse', 'subprocess'}
+    assert not imported_after('import synth.client') & {'numpy', 'scipy', 'synth.engine'}
+    assert not imported_after('import synth.bank') & {'scipy', 'synth.build', 'synth.engine', 'synth.play'}
+
+
+def test_package_names_still_resolve_lazily():
+    import synth
+    assert synth.OnePole.__name__ == 'OnePole' and 'sine_wave' in dir(synth)
+    with pytest.raises(AttributeError):
+        synth.no_such_name
+
+
+def test_pre_rendered_files_are_used_directly(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert play.find_sound('tool_start', 'void') == os.path.join(ROOT, 'void', 'tool_start.wav')
+
+
+def test_missing_sounds_are_rendered_once_into_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    monkeypatch.setitem(play.SUITES, 'void', str(tmp_path / 'unbuilt'))
+    path = play.find_sound('tool_start', 'void')
+    assert os.path.dirname(os.path.dirname(path)) == str(tmp_path / 'claude-sounds')
+    assert os.path.basename(os.path.dirname(path)).startswith('unbuilt-')
+    assert os.path.basename(path).startswith('tool_start.')
+    with open(path, 'rb') as f:
+        assert f.read(4) == b'RIFF'
+    with pytest.raises(FileNotFoundError, match='no way to render'):
+        play.find_sound('tool_start', str(tmp_path / 'elsewhere'))
+
+    monkeypatch.setattr(play, 'render', None)
+    assert play.find_sound('tool_start', 'void') == path
+
+
+def test_cached_sounds_are_rendered_again_when_the_spec_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    monkeypatch.setitem(play.SUITES, 'void', str(tmp_path / 'unbuilt'))
+    monkeypatch.setattr(paths, 'THEMES_DIR', str(tmp_path))
+    spec = tmp_path / 'void.json'
+    with open(os.path.join(ROOT, paths.SPEC_DIR, 'void.json'), 'rb') as f:
+        spec.write_bytes(f.read())
+    first = play.find_sound('notification', 'void')
+
+    stat = os.stat(spec)
+    os.utime(spec, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    second = play.find_sound('notification', 'void')
+    assert second != first and os.path.exists(second) and not os.path.exists(first)
+    with open(second, 'rb') as f:
+        assert f.read(4) == b'RIFF'
+
+
+def test_suites_with_the_same_name_are_cached_apart(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    with open(os.path.join(ROOT, paths.SPEC_DIR, 'void.json'), 'rb') as f:
+        spec = f.read()
+    found = []
+    for parent in ('a', 'b'):
+        (tmp_path / parent).mkdir()
+        (tmp_path / parent / 'void.json').write_bytes(spec)
+        found.append(play.find_sound('tool_start', str(tmp_path / parent / 'void')))
+    assert os.path.dirname(found[0]) != os.path.dirname(found[1])
+    assert all(os.path.exists(path) for path in found)
+    assert play.path_key('/a/void') == play.path_key('/a/void') != play.path_key('/b/void')
+
+
+def test_command_line(tmp_path, capsys):
+    assert play.main(['tool_start', 'void', '--dry-run']) == 0
+    assert capsys.readouterr().out.strip().endswith(os.path.join('void', 'tool_start.wav'))
+    assert play.main(['tool_start', 'void', '--player', 'nope']) == 2
+    assert play.main([]) == 2
+    assert play.parse_args(['notification', '--wait', 'drift']) == ('notification', 'drift', None, False, True)
+
+
+def test_missing_player_is_reported(monkeypatch):
+    monkeypatch.setattr(play, 'PLAYERS', {'no-such-player-xyz': ['no-such-player-xyz']})
+    with pytest.raises(FileNotFoundError, match='no audio player'):
+        play.spawn('x.wav', ('no-such-player-xyz',))
+
+
+def test_parse_importtime():
+    text = ('import time: self [us] | cumulative | imported package\n'
+            'import time:       100 |        100 |   posix\n'
+            'import time:       250 |        350 | os\n')
+    assert parse_importtime(text) == [('posix', 100, 100, 1), ('os', 250, 350, 0)]
@@ -0,0 +1,74 @@
+"""Tests for the opt-in render profiler"""
+
+import json
+
+import numpy as np
+import pytest
+
+from synth import profiling
+from synth.build import Theme, build
+from synth.engine import execute
+from synth.spec import compile_hook
+
+SPEC = {
+    'name': 'profiled',
+    'sample_rate': 8000,
+    'hooks': {
+        'tool_start': {'graph': {'type': 'fade', 'input': {'type': 'sine', 'frequency': 440, 'duration': 0.05}}},
+        'notification': {'graph': {'type': 'mix', 'inputs': [
+            {'type': 'noise', 'duration': 0.02}, {'type': 'sine', 'frequency': 880, 'duration': 0.02}]}},
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def no_profiler():
+    yield
+    profiling.stop()
+
+
+def test_frames_record_self_time_and_counts():
+    profiler = profiling.Profiler()
+    with profiler.frame('hook'):
+        profiler.count(10)
+        with profiler.frame('stage'):
+            profiler.call('step', np.zeros, 100)
+        with profiler.frame('stage'):
+            pass
+    assert profiler.stats[('hook',)][0] == 1 and profiler.stats[('hook',)][2] == 10
+    assert profiler.stats[('hook', 'stage')][0] == 2
+    assert profiler.stats[('hook', 'stage', 'step')][2:] == [100, 800]
+    assert all(values[1] >= 0 for values in profiler.stats.values())
+    for line in profiler.collapsed():
+        stack, micros = line.rsplit(' ', 1)
+        assert stack.split(';')[0] == 'hook' and int(micros) > 0
+
+
+def test_disabled_profiling_is_a_no_op():
+    assert profiling.current() is None
+    assert profiling.frame('a') is profiling.frame('b')
+    profiling.count(5)
+    plan = compile_hook(dict(SPEC, output_dir='x', constants={}, defaults={}, voices={}, export=[]), 'tool_start')
+    assert len(execute(plan)) == 400
+
+
+def test_build_profiles_every_rendered_hook(tmp_path):
+    path = tmp_path / 'profiled.json'
+    path.write_text(json.dumps(dict(SPEC, output_dir=str(tmp_path / 'out'))))
+    theme = Theme('profiled', None, str(tmp_path / 'out'), ('tool_start', 'notification'), str(path))
+    profiler = profiling.Profiler()
+    build([theme], jobs=1, profiler=profiler)
+
+    assert profiler.hooks()[('profiled', 'tool_start')][1] == 400
+    assert set(profiler.hooks()) == {('profiled', 'tool_start'), ('profiled', 'notification')}
+    assert {'render', 'measure', 'write.pcm16', 'fused[sine+fade]', 'noise'} <= set(profiler.stages())
+    assert profiler.stats[('profiled', 'notification', 'render', 'sine')][2] == 160
+    assert profiling.current() is None
+
+    profiler.write(str(tmp_path / 'profile.folded'))
+    assert (tmp_path / 'profile.folded').read_text().splitlines() == profiler.collapsed()
+    assert 'tool_start' in profiler.format_summary()
+
+    cached = profiling.Profiler()
+    build([theme], jobs=1, profiler=cached)
+    assert cached.stats == {}
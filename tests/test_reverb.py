@@ -0,0 +1,74 @@
+"""Tests for partitioned convolution and the feedback delay network"""
+
+import numpy as np
+import pytest
+
+from synth.reverb import (Convolver, convolve, convolve_blocks, fdn, partition_spectra, reverb, room_impulse,
+                          room_spectra)
+from synth.spec import compile_hook, render
+
+
+def signal(length, seed=0):
+    return np.random.default_rng(seed).uniform(-1, 1, length)
+
+
+@pytest.mark.parametrize('length', [100, 1000, 5000])
+def test_partitioned_convolution_matches_direct(length):
+    response = signal(3000, seed=1)
+    x = signal(length)
+    expected = np.convolve(x, response)
+    spectra = partition_spectra(response, 256)
+    assert np.allclose(convolve(x, spectra), expected[:length], atol=1e-10)
+    assert np.allclose(convolve(x, spectra, length + 2999), expected, atol=1e-10)
+
+
+def test_streaming_matches_the_whole_buffer():
+    spectra = partition_spectra(signal(2000, seed=2), 128)
+    x = signal(3000)
+    blocks = (x[i:i + 333] for i in range(0, len(x), 333))
+    streamed = np.concatenate(list(convolve_blocks(blocks, spectra, tail=500)))
+    assert np.allclose(streamed, convolve(x, spectra, 3500), atol=1e-10)
+    with pytest.raises(ValueError, match='at most 128'):
+        Convolver(spectra).process(x[:129])
+
+
+def test_room_spectra_are_shared_between_hooks():
+    first = room_spectra(8000, 0.5, 0.3, 10.0, 256)
+    assert room_spectra(8000, 0.5, 0.3, 10.0, 256) is first
+    assert not first.flags.writeable
+    response = room_impulse(8000, 0.5, 0.3, 10.0)
+    assert np.isclose(np.sum(response ** 2), 1.0) and not response[:80].any()
+
+
+def test_fdn_decays_sixty_db_per_rt60():
+    sample_rate = 22050
+    impulse = np.zeros(sample_rate * 2)
+    impulse[0] = 1.0
+    out = fdn(impulse, sample_rate, rt60=0.5)
+    early = np.sqrt(np.mean(out[2000:4000] ** 2))
+    later = np.sqrt(np.mean(out[2000 + sample_rate // 2:4000 + sample_rate // 2] ** 2))
+    assert 50 < 20 * np.log10(early / later) < 75
+
+
+@pytest.mark.parametrize('method', ['convolution', 'fdn'])
+def test_reverb_blends_and_extends(method):
+    x = signal(4000)
+    out = reverb(x, 8000, wet=0.0, tail=0.25, method=method)
+    assert len(out) == 6000 and np.allclose(out[:4000], x) and not out[4000:].any()
+    wet = reverb(x, 8000, wet=0.5, tail=0.25, method=method)
+    assert np.abs(wet[4000:]).max() > 0.01
+
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError, match='unknown reverb method'):
+        reverb(signal(100), method='plate')
+
+
+def test_reverb_node_renders_from_a_spec():
+    spec = {'name': 'room', 'output_dir': 'room', 'sample_rate': 8000, 'constants': {}, 'voices': {},
+            'defaults': {'reverb': {'rt60': 0.3}}, 'export': [],
+            'hooks': {'tool_start': {'graph': {'type': 'reverb', 'tail': 0.1, 'method': 'fdn', 'input':
+                                               {'type': 'sine', 'frequency': 440, 'duration': 0.05}}}}}
+    plan = compile_hook(spec, 'tool_start')
+    assert any(step.op == 'reverb' for step in plan.steps)
+    assert len(render(spec, 'tool_start')) == 1200
@@ -0,0 +1,99 @@
+"""Tests for hook coalescing, voice limits and priorities"""
+
+import pytest
+
+from synth.scheduler import Scheduler
+
+DURATIONS = {'tool_start': 0.5, 'tool_complete': 0.5, 'response_end': 0.5, 'notification': 1.0}
+
+
+def test_repeats_within_the_window_are_merged():
+    scheduler = Scheduler(DURATIONS, window=0.1)
+    assert scheduler.submit('tool_start', now=0.0) is not None
+    assert scheduler.submit('tool_start', now=0.05) is None
+    assert scheduler.submit('tool_start', now=0.2) is not None
+    assert scheduler.counters['merged'] == 1 and scheduler.counters['scheduled'] == 2
+
+
+def test_repeats_of_an_evicted_or_cancelled_voice_play():
+    scheduler = Scheduler(DURATIONS, window=0.1, max_voices=1, policy='none')
+    tool = scheduler.submit('tool_start', now=0.0)
+    scheduler.submit('notification', now=0.01)
+    assert tool.cancelled
+    assert scheduler.submit('tool_start', now=0.02) is None
+    assert scheduler.counters['dropped'] == 1 and scheduler.counters['merged'] == 0
+
+    scheduler = Scheduler(DURATIONS, window=0.1)
+    scheduler.submit('tool_start', now=0.0).cancelled = True
+    assert scheduler.submit('tool_start', now=0.05) is not None
+    assert scheduler.counters['merged'] == 0
+
+
+def test_voice_cap_evicts_lower_priority_or_drops():
+    scheduler = Scheduler(DURATIONS, window=0.0, max_voices=2, policy='none')
+    first = scheduler.submit('tool_start', now=0.0)
+    scheduler.submit('tool_complete', now=0.01)
+    assert scheduler.submit('tool_start', now=0.02) is None
+    assert scheduler.counters['dropped'] == 1
+
+    assert scheduler.submit('notification', now=0.03) is not None
+    assert first.cancelled and scheduler.counters['evicted'] == 1
+    assert len(scheduler.active(0.04)) == 2
+    assert len(scheduler.active(0.6)) == 1
+
+
+def test_duck_policy_lowers_quieter_hooks():
+    scheduler = Scheduler(DURATIONS, policy='duck', duck_gain=0.25)
+    tool = scheduler.submit('tool_start', now=0.0)
+    alert = scheduler.submit('notification', now=0.1)
+    late = scheduler.submit('tool_complete', now=0.2)
+    assert (tool.gain, alert.gain, late.gain) == (0.25, 1.0, 0.25)
+    assert scheduler.counters['ducked'] == 2
+
+
+def test_ducked_voices_recover_when_the_louder_voice_ends():
+    scheduler = Scheduler({'tool_start': 2.0, 'notification': 0.5}, policy='duck', duck_gain=0.25)
+    tool = scheduler.submit('tool_start', now=0.0)
+    alert = scheduler.submit('notification', now=0.1)
+    assert tool.gain == 0.25
+    scheduler.active(0.3)
+    assert tool.gain == 0.25
+    scheduler.active(0.7)
+    assert tool.gain == 1.0 and alert not in scheduler.voices
+
+    alert = scheduler.submit('notification', now=1.0)
+    assert tool.gain == 0.25
+    alert.cancelled = True
+    scheduler.active(1.1)
+    assert tool.gain == 1.0
+    assert scheduler.counters['ducked'] == 2
+
+
+def test_submitted_durations_override_the_hook_length():
+    scheduler = Scheduler(DURATIONS)
+    voice = scheduler.submit('notification', now=0.0, duration=0.2)
+    assert voice.end == 0.2
+    assert scheduler.active(0.3) == []
+
+
+def test_drop_policy_cuts_quieter_hooks():
+    scheduler = Scheduler(DURATIONS, policy='drop')
+    tool = scheduler.submit('tool_start', now=0.0)
+    scheduler.submit('notification', now=0.1)
+    assert tool.cancelled
+    assert scheduler.submit('response_end', now=0.2) is None
+    assert scheduler.submit('response_end', now=1.2) is not None
+    assert scheduler.counters['dropped'] == 2
+
+
+def test_priorities_can_be_overridden():
+    scheduler = Scheduler(DURATIONS, policy='drop', priorities={'tool_start': 5})
+    scheduler.submit('tool_start', now=0.0)
+    assert scheduler.submit('notification', now=0.1) is None
+
+
+def test_bad_settings():
+    with pytest.raises(ValueError):
+        Scheduler(DURATIONS, policy='mute')
+    with pytest.raises(ValueError):
+        Scheduler(DURATIONS, max_voices=0)
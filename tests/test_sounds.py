@@ -0,0 +1,54 @@
+"""Tests for the in-memory sound API"""
+
+import io
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from synth import sounds
+from synth.build import discover_themes, render_hook
+
+
+def test_render_wav_is_a_complete_wav_file():
+    data = sounds.render_wav('void', 'notification', sample_rate=22050)
+    with wave.open(io.BytesIO(data)) as wav:
+        assert wav.getframerate() == 22050
+        assert wav.getnchannels() == 1 and wav.getsampwidth() == 2
+        pcm = wav.readframes(wav.getnframes())
+    assert bytes(sounds.render_pcm('void', 'notification', sample_rate=22050)) == pcm
+
+
+def test_renders_are_seeded_like_the_build():
+    first = sounds.render_samples('drift', 'tool_start', seed=3)
+    assert np.array_equal(first, sounds.render_samples('drift', 'tool_start', seed=3))
+    assert not np.array_equal(first, sounds.render_samples('drift', 'tool_start', seed=4))
+
+
+def test_render_has_no_side_effects(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    sounds.render_wav('retro', 'session_start')
+    assert os.listdir(tmp_path) == []
+    assert capsys.readouterr().out == ''
+
+
+def test_build_writes_the_same_bytes(tmp_path, monkeypatch):
+    theme = next(t for t in discover_themes() if t.name == 'void')
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(theme.output_dir)
+    render_hook(theme, 'tool_complete')
+    with open(os.path.join(theme.output_dir, 'tool_complete.wav'), 'rb') as f:
+        assert f.read() == sounds.render_wav('void', 'tool_complete', sample_rate=22050)
+
+
+def test_pcm_formats():
+    samples = sounds.render_samples('void', 'tool_start')
+    assert len(sounds.render_pcm('void', 'tool_start', sample_format='pcm24')) == 3 * len(samples)
+    assert len(sounds.render_pcm('void', 'tool_start', sample_format='float32')) == 4 * len(samples)
+
+
+def test_unknown_theme():
+    assert sounds.themes() == ['drift', 'retro', 'void']
+    with pytest.raises(ValueError):
+        sounds.render_wav('nope', 'notification')
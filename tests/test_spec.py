@@ -0,0 +1,106 @@
+"""Tests for theme specs, the plan compiler and the render engine"""
+
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from synth import OnePole, apply_decay, seed_noise, white_noise
+from synth.export import Target
+from synth.paths import ROOT, SPEC_DIR
+from synth.spec import compile_hook, default_targets, load_spec, render
+
+SPEC = {
+    'name': 'test',
+    'output_dir': 'test',
+    'sample_rate': 8000,
+    'constants': {'A4': 440.0},
+    'defaults': {'decay': {'step': 50}},
+    'voices': {
+        'drop': {
+            'params': {'amplitude': 0.25},
+            'required': ['duration'],
+            'graph': {'type': 'decay', 'decay': 0.9, 'input': {'type': 'lowpass', 'cutoff_ratio': 0.2, 'input':
+                      {'type': 'noise', 'duration': 'duration', 'amplitude': 'amplitude'}}},
+        },
+    },
+    'hooks': {
+        'tool_start': {'graph': {'type': 'drop', 'duration': 0.05}},
+        'notification': {'graph': {'type': 'sequence', 'parts': [
+            {'type': 'sine', 'frequency': 'A4', 'duration': 0.01}, 0.01,
+            {'type': 'sine', 'frequency': 'A4', 'ratio': 2, 'duration': 0.01},
+        ]}},
+    },
+}
+
+
+def spec_with(graph):
+    return dict(SPEC, hooks={'tool_start': {'graph': graph}})
+
+
+def test_voices_defaults_and_constants_are_folded_into_the_plan():
+    plan = compile_hook(SPEC, 'tool_start')
+    assert [step.op for step in plan.steps] == ['noise', 'lowpass', 'decay']
+    assert plan.steps[0].params == {'duration': 0.05, 'amplitude': 0.25}
+    assert plan.steps[2].params == {'decay': 0.9, 'step': 50}
+    assert plan.output == os.path.join('test', 'tool_start.wav')
+
+    seed_noise(3, 'spec')
+    samples = render(SPEC, 'tool_start')
+    seed_noise(3, 'spec')
+    expected = apply_decay(OnePole(0.2).process(white_noise(0.05, 8000, 0.25)), 0.9, 50)
+    assert np.array_equal(samples, expected)
+
+
+def test_sequence_places_parts_and_gaps():
+    samples = render(SPEC, 'notification')
+    assert len(samples) == 240
+    assert np.all(samples[80:160] == 0.0)
+    assert np.any(samples[160:] != 0.0)
+
+
+@pytest.mark.parametrize('graph, message', [
+    ({'type': 'sin', 'frequency': 440, 'duration': 0.1}, 'unknown node type'),
+    ({'type': 'sine', 'frequency': 'B9', 'duration': 0.1}, 'unknown name'),
+    ({'type': 'sine', 'duration': 0.1}, 'needs frequency'),
+    ({'type': 'sine', 'frequency': 440, 'duration': 0.1, 'detune': 2}, 'no parameter'),
+    ({'type': 'drop'}, 'needs duration'),
+    ({'type': 'fade'}, 'needs an "input"'),
+])
+def test_compile_errors_name_the_hook(graph, message):
+    with pytest.raises(ValueError, match=message) as error:
+        compile_hook(spec_with(graph), 'tool_start')
+    assert 'test.tool_start' in str(error.value)
+
+
+def test_shipped_specs_compile_and_render():
+    paths = sorted(glob.glob(os.path.join(ROOT, SPEC_DIR, '*.json')))
+    assert [os.path.basename(p) for p in paths] == ['drift.json', 'retro.json', 'void.json']
+    for path in paths:
+        spec = load_spec(path)
+        for hook in spec['hooks']:
+            samples = render(spec, hook)
+            assert len(samples) > 0
+            assert np.max(np.abs(samples)) <= 1.0
+
+
+def test_export_targets_come_from_the_spec(tmp_path):
+    path = tmp_path / 'exported.json'
+    path.write_text('{"output_dir": "x", "hooks": {}, "export": ["22050", "48000:pcm24"]}')
+    assert default_targets(load_spec(str(path))) == [Target(22050, 'pcm16'), Target(48000, 'pcm24')]
+    assert default_targets(dict(SPEC, export=[])) == [Target(8000, 'pcm16')]
+
+    path.write_text('{"output_dir": "x", "hooks": {}, "export": ["22050:mp3"]}')
+    with pytest.raises(ValueError, match='mp3'):
+        load_spec.__wrapped__(str(path))
+
+
+def test_noise_key_defaults_to_the_theme_name(tmp_path):
+    path = tmp_path / 'keyed.json'
+    path.write_text('{"output_dir": "x", "hooks": {}}')
+    assert load_spec(str(path))['noise_key'] == 'keyed'
+    assert compile_hook(SPEC, 'tool_start').noise_key == 'test'
+    keyed = compile_hook(dict(SPEC, noise_key='generate_test_sounds'), 'tool_start')
+    assert keyed.noise_key == 'generate_test_sounds'
+    assert load_spec(os.path.join(ROOT, SPEC_DIR, 'drift.json'))['noise_key'] == 'generate_drift_sounds'
@@ -0,0 +1,73 @@
+"""Tests for the block-streaming render path"""
+
+import tracemalloc
+import wave
+
+import numpy as np
+
+from synth import apply_decay, apply_fade, decay_curve, mix, one_pole_lowpass, save_wav_stream, sine_wave, to_pcm16
+from synth import stream
+
+
+def test_sine_blocks_match_whole_buffer():
+    streamed = stream.collect(stream.sine_blocks(440, 0.5, block_size=1000))
+    assert np.array_equal(streamed, sine_wave(440, 0.5))
+
+
+def test_rechunk_produces_fixed_blocks():
+    blocks = [np.ones(3), np.ones(5), np.ones(4)]
+    sizes = [len(b) for b in stream.rechunk(blocks, block_size=5)]
+    assert sizes == [5, 5, 2]
+
+
+def test_effects_match_whole_buffer_versions():
+    x = np.random.default_rng(3).uniform(-1, 1, 10000)
+    blocks = lambda: stream.buffer_blocks(x, block_size=777)  # noqa: E731
+
+    faded = stream.collect(stream.fade_blocks(blocks(), len(x), 30, 60))
+    assert np.allclose(faded, apply_fade(x, 30, 60))
+
+    decayed = stream.collect(stream.decay_blocks(blocks(), 0.99, 200.0))
+    assert np.allclose(decayed, apply_decay(x, 0.99, 200.0))
+
+    filtered = stream.collect(stream.lowpass_blocks(blocks(), 0.12))
+    assert np.allclose(filtered, one_pole_lowpass(x, 0.12), atol=1e-12)
+
+
+def test_engine_stages_match_whole_buffer_versions():
+    x = np.random.default_rng(5).uniform(-2, 2, 9000)
+    y = np.random.default_rng(6).uniform(-1, 1, 9000)
+    blocks = lambda samples: stream.buffer_blocks(samples, block_size=1000)  # noqa: E731
+
+    assert np.array_equal(stream.collect(stream.sum_blocks(blocks(x), blocks(y))), x + y)
+    assert np.array_equal(stream.collect(stream.clamp_blocks(blocks(x), 1.0)), np.clip(x, -1.0, 1.0))
+    curve = decay_curve(len(x), 0.99, 200.0)
+    out = np.empty(len(x))
+    assert stream.collect(stream.envelope_blocks(blocks(x), curve), out) is out
+    assert np.array_equal(out, apply_decay(x, 0.99, 200.0))
+
+
+def test_mix_blocks_pads_shorter_streams():
+    a = sine_wave(220, 0.2)
+    b = sine_wave(330, 0.1)
+    mixed = stream.collect(stream.mix_blocks(stream.buffer_blocks(a, 500), stream.buffer_blocks(b, 300)))
+    assert np.allclose(mixed, mix(a, b))
+
+
+def test_streamed_render_has_bounded_memory(tmp_path):
+    path = str(tmp_path / 'long.wav')
+    duration = 120.0
+    num_samples = int(44100 * duration)
+    blocks = stream.fade_blocks(stream.sine_blocks(110, duration), num_samples, 100, 500)
+
+    tracemalloc.start()
+    frames = save_wav_stream(path, blocks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert frames == num_samples
+    assert peak < 2 * 1024 * 1024  # the full signal would be ~42 MB of float64
+    with wave.open(path) as wav_file:
+        assert wav_file.getnframes() == num_samples
+        head = np.frombuffer(wav_file.readframes(4410), '<i2')
+    assert np.array_equal(head, to_pcm16(apply_fade(sine_wave(110, duration), 100, 500)[:4410]))
@@ -0,0 +1,123 @@
+"""Tests for the shared synthesis engine"""
+
+import math
+import wave
+
+import numpy as np
+
+from synth import (
+    sine_wave,
+    square_wave,
+    silence,
+    one_pole_lowpass,
+    apply_fade,
+    apply_decay,
+    mix,
+    Timeline,
+    concat,
+    save_wav,
+    to_pcm16,
+)
+
+
+def test_sine_wave_matches_scalar_formula():
+    samples = sine_wave(440, 0.01, amplitude=0.5)
+    assert len(samples) == 441
+    for i in (0, 17, 440):
+        assert math.isclose(samples[i], 0.5 * math.sin(2 * math.pi * 440 * i / 44100), abs_tol=1e-12)
+
+
+def test_square_wave_takes_sign_of_sine():
+    samples = square_wave(100, 0.01, amplitude=0.3)
+    assert set(np.unique(samples)) <= {0.3, -0.3}
+    assert samples[0] == -0.3  # sin(0) is not > 0
+
+
+def test_silence_length():
+    assert len(silence(0.1)) == 4410
+    assert not silence(0.1).any()
+
+
+def test_one_pole_lowpass_matches_recursion():
+    rng = np.random.default_rng(1)
+    x = rng.uniform(-1, 1, 2000)
+    expected = []
+    prev = 0.0
+    for sample in x:
+        prev = prev + 0.15 * (sample - prev)
+        expected.append(prev)
+    assert np.allclose(one_pole_lowpass(x, 0.15), expected, atol=1e-12)
+
+
+def test_apply_fade_ramps_and_does_not_mutate_input():
+    x = np.ones(44100)
+    faded = apply_fade(x, fade_in_ms=100, fade_out_ms=100)
+    assert x.min() == 1.0
+    assert faded[0] == 0.0
+    assert math.isclose(faded[2205], 0.5)
+    assert faded[22050] == 1.0
+    assert math.isclose(faded[-1], 1 / 4410)
+
+
+def test_apply_fade_longer_than_buffer():
+    faded = apply_fade(np.ones(10), fade_in_ms=100, fade_out_ms=100)
+    assert len(faded) == 10
+    assert np.all(faded < 1.0)
+
+
+def test_apply_decay():
+    decayed = apply_decay(np.ones(201), decay=0.5, step=100.0)
+    assert decayed[0] == 1.0
+    assert math.isclose(decayed[100], 0.5)
+    assert math.isclose(decayed[200], 0.25)
+
+
+def test_mix_pads_and_scales():
+    result = mix(np.ones(4), np.ones(2))
+    assert np.allclose(result, [1.0, 1.0, 0.5, 0.5])
+
+
+def test_concat():
+    assert np.array_equal(concat([1.0], np.zeros(2)), [1.0, 0.0, 0.0])
+
+
+def test_to_pcm16_clamps_and_truncates():
+    pcm = to_pcm16([0.0, 0.5, -0.5, 2.0, -2.0])
+    assert pcm.tolist() == [0, 16383, -16383, 32767, -32768]
+
+
+def test_save_wav_round_trip(tmp_path):
+    path = str(tmp_path / 'tone.wav')
+    samples = sine_wave(440, 0.05)
+    save_wav(path, samples)
+    with wave.open(path) as wav_file:
+        assert wav_file.getnchannels() == 1
+        assert wav_file.getsampwidth() == 2
+        assert wav_file.getframerate() == 44100
+        frames = np.frombuffer(wav_file.readframes(wav_file.getnframes()), '<i2')
+    assert np.array_equal(frames, to_pcm16(samples))
+
+
+def test_timeline_places_tracks_with_gain():
+    timeline = Timeline(sample_rate=10)
+    timeline.add(np.ones(3), gain=0.5)
+    timeline.add(np.ones(2), at=0.4)
+    assert np.allclose(timeline.render(), [0.5, 0.5, 0.5, 0.0, 1.0, 1.0])
+
+
+def test_timeline_sequence_gaps_and_cursor():
+    timeline = Timeline(sample_rate=10)
+    timeline.sequence(np.ones(2), 0.2, np.ones(1))
+    timeline.sequence(0.1)
+    timeline.sequence(np.full(1, 2.0), gain=0.5)
+    assert np.allclose(timeline.render(), [1, 1, 0, 0, 1, 0, 1])
+
+
+def test_timeline_headroom_scales_instead_of_clipping():
+    timeline = Timeline(sample_rate=10)
+    timeline.add(np.full(4, 0.8))
+    timeline.add(np.full(2, 0.8))
+    loud = timeline.render(ceiling=1.0)
+    assert np.isclose(loud.max(), 1.0)
+    assert np.isclose(loud[0] / loud[3], 2.0)
+    assert np.isclose(timeline.render(ceiling=None).max(), 1.6)
@@ -0,0 +1,122 @@
+"""Tests for variation pools: drawing, rendering, building and selecting variants"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from synth import sounds
+from synth.build import Theme, build
+from synth.daemon import load_pools, load_suite
+from synth.spec import compile_hook
+from synth.variation import Selector, compile_variant, draw, pitch_shift, render_variant, variant_files, variations
+
+SPEC = {
+    'name': 'varied',
+    'sample_rate': 8000,
+    'constants': {'PITCH': 440.0, 'GAP': 0.01},
+    'hooks': {
+        'tool_start': {
+            'variations': {'count': 4, 'ranges': {'PITCH': [400, 480], 'GAP': [0.005, 0.02], 'pitch': [-1, 1]}},
+            'graph': {'type': 'sequence', 'parts': [
+                {'type': 'sine', 'frequency': 'PITCH', 'duration': 0.02}, 'GAP',
+                {'type': 'noise', 'duration': 0.02, 'amplitude': 0.1},
+            ]},
+        },
+        'notification': {'graph': {'type': 'sine', 'frequency': 'PITCH', 'duration': 0.02}},
+    },
+}
+
+
+@pytest.fixture
+def theme(tmp_path):
+    output_dir = str(tmp_path / 'varied')
+    path = tmp_path / 'varied.json'
+    path.write_text(json.dumps(dict(SPEC, output_dir=output_dir)))
+    return Theme('varied', None, output_dir, ('tool_start', 'notification'), str(path))
+
+
+def spec():
+    return dict(SPEC, output_dir='varied', defaults={}, voices={}, export=[])
+
+
+def test_variant_zero_is_the_canonical_sound():
+    assert draw(spec(), 'tool_start', 0) == {}
+    assert draw(spec(), 'notification', 3) == {}
+    plan, pitch = compile_variant(spec(), 'tool_start', 0)
+    assert plan == compile_hook(spec(), 'tool_start') and pitch == 0.0
+
+
+def test_draws_are_seeded_and_within_range():
+    first = draw(spec(), 'tool_start', 1)
+    assert first == draw(spec(), 'tool_start', 1)
+    assert first != draw(spec(), 'tool_start', 2)
+    assert first != draw(spec(), 'tool_start', 1, seed=7)
+    for index in range(1, 20):
+        values = draw(spec(), 'tool_start', index)
+        assert 400 <= values['PITCH'] <= 480
+        assert 0.005 <= values['GAP'] <= 0.02
+        assert -1 <= values['pitch'] <= 1
+
+
+@pytest.mark.parametrize('declared, message', [
+    ({'ranges': {'NOPE': [0, 1]}}, 'unknown constant'),
+    ({'ranges': {'GAP': [1, 0]}}, 'LOW, HIGH'),
+    ({'count': 0}, 'positive integer'),
+])
+def test_bad_variations_are_rejected(declared, message):
+    bad = dict(spec(), hooks={'tool_start': dict(SPEC['hooks']['tool_start'], variations=declared)})
+    with pytest.raises(ValueError, match=message):
+        variations(bad, 'tool_start')
+
+
+def test_overrides_must_name_constants():
+    with pytest.raises(ValueError, match='unknown constant'):
+        compile_hook(spec(), 'tool_start', {'NOPE': 1})
+
+
+def test_pitch_shift_scales_the_length():
+    samples = np.sin(np.arange(8000) * 0.01)
+    assert len(pitch_shift(samples, 12)) == 4000
+    assert len(pitch_shift(samples, -12)) == 16000
+    assert pitch_shift(samples, 0) is samples
+
+
+def test_render_variant_zero_matches_the_sound_api():
+    canonical = sounds.render_samples('void', 'tool_complete')
+    assert np.array_equal(render_variant(sounds.theme_path('void'), 'tool_complete', 0), canonical)
+    variant = render_variant(sounds.theme_path('void'), 'tool_complete', 1)
+    assert len(variant) != len(canonical) or not np.allclose(variant, canonical)
+
+
+def test_build_renders_caches_and_prunes_pools(theme):
+    results = build([theme], jobs=1, variations=True)
+    assert [(r.hook, r.variant) for r in results] == [
+        ('tool_start', None), ('tool_start', 1), ('tool_start', 2), ('tool_start', 3), ('notification', None)]
+    assert list(variant_files(theme.output_dir, 'tool_start')) == [1, 2, 3]
+    assert all(r.cached for r in build([theme], jobs=1, variations=True))
+
+    build([theme], jobs=1, variations=True, pool_size=2)
+    assert list(variant_files(theme.output_dir, 'tool_start')) == [1]
+    assert not os.path.exists(os.path.join(theme.output_dir, 'variations', 'tool_start-02.wav'))
+
+
+def test_pools_load_and_select_in_turn(theme):
+    build([theme], jobs=1, variations=True)
+    loaded = load_suite(theme.output_dir, 8000)
+    pools = load_pools(theme.output_dir, loaded, 8000)
+    assert list(pools) == ['tool_start'] and len(pools['tool_start']) == 4
+    assert pools['tool_start'][0] is loaded['tool_start']
+
+    selector = Selector(pools)
+    assert [selector.choose('tool_start') for _ in range(5)] == pools['tool_start'] + pools['tool_start'][:1]
+
+
+def test_random_selection_never_repeats_back_to_back():
+    selector = Selector({'tool_start': list(range(3))}, 'random', seed=1)
+    picks = [selector.choose('tool_start') for _ in range(200)]
+    assert set(picks) == {0, 1, 2}
+    assert all(a != b for a, b in zip(picks, picks[1:]))
+    with pytest.raises(ValueError, match='selection mode'):
+        Selector({}, 'shuffle')
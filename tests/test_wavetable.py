@@ -0,0 +1,47 @@
+"""Tests for the wavetable oscillator bank"""
+
+import numpy as np
+import pytest
+
+from synth import Oscillator, sine_wave
+from synth.wavetable import harmonics_for, wavetable
+
+
+def test_sine_table_matches_direct_sine():
+    rendered = Oscillator('sine').render(440, 0.5, amplitude=0.5)
+    assert np.allclose(rendered, sine_wave(440, 0.5, amplitude=0.5), atol=1e-6)
+
+
+def test_consecutive_notes_are_phase_continuous():
+    osc = Oscillator('sine')
+    samples = osc.render_notes([(523.25, 0.15), (659.25, 0.15), (783.99, 0.15)])
+    # The largest sample-to-sample step stays that of the highest note alone
+    max_step = 0.5 * 2 * np.pi * 783.99 / 44100
+    assert np.max(np.abs(np.diff(samples))) <= max_step * 1.001
+
+
+def test_band_limited_square_has_no_aliased_partials():
+    sample_rate = 44100
+    samples = Oscillator('square', sample_rate).render(3000, 1.0, amplitude=1.0)
+    spectrum = np.abs(np.fft.rfft(samples))
+    freqs = np.fft.rfftfreq(len(samples), 1 / sample_rate)
+    harmonic = np.isclose(freqs % 3000, 0) | np.isclose(freqs % 3000, 3000)
+    assert spectrum[~harmonic].max() < 1e-3 * spectrum.max()
+
+
+def test_harmonics_for_stays_below_nyquist():
+    assert harmonics_for(3000) == 4
+    assert harmonics_for(20) == 1024
+    assert harmonics_for(30000) == 1
+
+
+@pytest.mark.parametrize('waveform', ['square', 'saw', 'triangle'])
+def test_tables_are_cached_and_bounded(waveform):
+    table = wavetable(waveform, 64)
+    assert wavetable(waveform, 64) is table
+    assert 0.9 < np.max(np.abs(table)) < 1.2
+
+
+def test_unknown_waveform():
+    with pytest.raises(ValueError):
+        Oscillator('pulse')